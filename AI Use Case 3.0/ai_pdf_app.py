@@ -5,15 +5,40 @@
 import os
 import sys
 import json
+import hashlib
+import io
+import time
 import textwrap
 import sqlite3
 import random
-from dataclasses import dataclass
+import bisect
+import math
+import re
+import threading
+import signal
+import multiprocessing
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from array import array
+from dataclasses import dataclass, field
 from typing import List, Optional, Dict, Tuple, Iterable, Set
 
 from dotenv import load_dotenv
 from pypdf import PdfReader
 
+try:
+    import tiktoken  # optional: exact token counts for the pruning report
+except ImportError:
+    tiktoken = None
+
+try:
+    import resource  # POSIX only: memory cap for PDF parse workers
+except ImportError:
+    resource = None
+
 load_dotenv()  # load .env
 
 DB_PATH = os.getenv("EMPLOYEE_DB_PATH", "employees.db")
@@ -47,14 +72,321 @@ def choose_pdf_file() -> str:
         return path
 
 def extract_text_from_pdf(path: str) -> str:
-    reader = PdfReader(path)
-    parts: List[str] = []
-    for page in reader.pages:
+    with open(path, "rb") as f:
+        return extract_pdf_text(f.read()).text
+
+# ===== PDF text cache =====
+# The same resumes and PRDs are uploaded again and again. Extracted page
+# texts are stored by SHA-256 of the file bytes (zlib-compressed JSON list
+# of pages), so a repeat upload skips pypdf entirely. Entries remember how
+# many pages were read; a request for more pages than stored re-extracts.
+# Past PDF_TEXT_CACHE_MAX_BYTES of compressed text, least recently used
+# entries are evicted. 0 disables the cache.
+PDF_TEXT_CACHE_MAX_BYTES = int(os.getenv("PDF_TEXT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+@dataclass
+class PdfText:
+    text: str
+    pages: int          # pages read
+    total_pages: int
+    extract_ms: float   # time pypdf took (when first extracted, for cached entries)
+    cached: bool = False
+    skipped_pages: List[Dict] = field(default_factory=list)  # [{"page": 1-based, "reason": ...}]
+
+class PdfTextCache:
+    def __init__(self, path: str, max_bytes: int = PDF_TEXT_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "extractMsSaved": 0.0}
+        if self.enabled:
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS PdfTextCache (
+                        sha256 TEXT PRIMARY KEY,
+                        pages INTEGER NOT NULL,
+                        total_pages INTEGER NOT NULL,
+                        text BLOB NOT NULL,
+                        size INTEGER NOT NULL,
+                        extract_ms REAL NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_access REAL NOT NULL
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_pdf_text_access ON PdfTextCache(last_access)")
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
         try:
-            parts.append(page.extract_text() or "")
-        except Exception:
-            parts.append("")
-    return "\n\n".join(parts).strip()
+            conn.execute("PRAGMA journal_mode = WAL")
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _count(self, name: str, n=1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def get(self, sha256: str, max_pages: Optional[int] = None) -> Optional[PdfText]:
+        if not self.enabled:
+            return None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT pages, total_pages, text, extract_ms FROM PdfTextCache WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+            wanted = 0 if row is None else (row[1] if max_pages is None else min(row[1], max_pages))
+            if row is None or row[0] < wanted:  # unseen, or stored with fewer pages than asked for
+                self._count("misses")
+                return None
+            conn.execute("UPDATE PdfTextCache SET last_access = ? WHERE sha256 = ?", (time.time(), sha256))
+        pages = json.loads(zlib.decompress(row[2]).decode("utf-8"))[:wanted]
+        self._count("hits")
+        self._count("extractMsSaved", row[3])
+        return PdfText(_join_pages(pages), len(pages), row[1], row[3], cached=True)
+
+    def put(self, sha256: str, pages: List[str], total_pages: int, extract_ms: float) -> None:
+        if not self.enabled:
+            return
+        blob = zlib.compress(json.dumps(pages, ensure_ascii=False).encode("utf-8"), 6)
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO PdfTextCache(sha256, pages, total_pages, text, size, extract_ms, created_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (sha256, len(pages), total_pages, blob, len(blob), extract_ms, now, now))
+            over = conn.execute("SELECT COALESCE(SUM(size), 0) FROM PdfTextCache").fetchone()[0] - self.max_bytes
+            evicted = []
+            for key, size in conn.execute("SELECT sha256, size FROM PdfTextCache ORDER BY last_access"):
+                if over <= 0:
+                    break
+                evicted.append((key,))
+                over -= size
+            conn.executemany("DELETE FROM PdfTextCache WHERE sha256 = ?", evicted)
+        self._count("stores")
+        self._count("evictions", len(evicted))
+
+    def stats(self) -> Dict:
+        entries, size = 0, 0
+        if self.enabled:
+            with self._connect() as conn:
+                entries, size = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM PdfTextCache"
+                ).fetchone()
+        with self._lock:
+            counters = dict(self._counters)
+        counters["extractMsSaved"] = round(counters["extractMsSaved"], 1)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "path": self.path,
+            "enabled": self.enabled,
+            "entries": entries,
+            "bytes": size,
+            "maxBytes": self.max_bytes,
+            "hitRate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+            **counters,
+        }
+
+def _join_pages(pages: List[str]) -> str:
+    return "\n\n".join(pages).strip()
+
+_PDF_TEXT_CACHE: Optional[PdfTextCache] = None
+_PDF_TEXT_CACHE_LOCK = threading.Lock()
+
+def get_pdf_text_cache() -> PdfTextCache:
+    """Process-wide cache; PDF_TEXT_CACHE_PATH defaults to pdf_text_cache.db next to the employee DB."""
+    global _PDF_TEXT_CACHE
+    with _PDF_TEXT_CACHE_LOCK:
+        if _PDF_TEXT_CACHE is None:
+            path = os.getenv("PDF_TEXT_CACHE_PATH") or os.path.join(
+                os.path.dirname(os.path.abspath(DB_PATH)), "pdf_text_cache.db")
+            _PDF_TEXT_CACHE = PdfTextCache(path)
+        return _PDF_TEXT_CACHE
+
+def pdf_text_cache_stats() -> Dict:
+    return get_pdf_text_cache().stats()
+
+# ===== PDF parse pool =====
+# pypdf can spin for a long time on a malformed or huge page. Parsing runs
+# in a dedicated process pool (so it never pins a Flask worker and uses all
+# cores on long documents); each worker parses a range of pages with a
+# per-page time limit and a memory cap, and the whole document has a
+# deadline. Pages that hit a limit are skipped and reported, the rest of
+# the text is still returned.
+PDF_PARSE_WORKERS = int(os.getenv("PDF_PARSE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGE_TIMEOUT = float(os.getenv("PDF_PAGE_TIMEOUT", "10"))
+PDF_DOC_TIMEOUT = float(os.getenv("PDF_DOC_TIMEOUT", "60"))
+PDF_WORKER_MEMORY_MB = int(os.getenv("PDF_WORKER_MEMORY_MB", "1024"))  # 0 = no cap
+PDF_MAX_TEXT_CHARS = int(os.getenv("PDF_MAX_TEXT_CHARS", "2000000"))  # per document
+
+class _PageTimeout(BaseException):
+    """BaseException so pypdf's own `except Exception` blocks can't swallow it."""
+
+@contextmanager
+def _time_limit(seconds: float):
+    """SIGALRM-based limit; only enforceable on the main thread of a POSIX process."""
+    if seconds <= 0 or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def _raise(signum, frame):
+        raise _PageTimeout()
+
+    previous = signal.signal(signal.SIGALRM, _raise)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def _skip_reason(e: BaseException) -> str:
+    if isinstance(e, _PageTimeout):
+        return "page timeout"
+    if isinstance(e, MemoryError):
+        return "memory limit"
+    return f"error: {e}"[:200]
+
+def _pdf_worker_init(memory_mb: int) -> None:
+    if resource is not None and memory_mb > 0:
+        limit = memory_mb * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass
+
+def _count_pdf_pages(data: bytes, timeout: float) -> int:
+    try:
+        with _time_limit(timeout):
+            return len(PdfReader(io.BytesIO(data)).pages)
+    except _PageTimeout:
+        raise RuntimeError("PDF parsing timed out") from None
+
+def _parse_pdf_pages(data: bytes, start: int, stop: int, page_timeout: float,
+                     deadline: float) -> List[Tuple[int, Optional[str], str]]:
+    """(page index, text or None, skip reason) for pages [start, stop)."""
+    try:
+        with _time_limit(page_timeout):
+            reader = PdfReader(io.BytesIO(data))
+    except (_PageTimeout, Exception) as e:
+        return [(i, None, _skip_reason(e)) for i in range(start, stop)]
+    out: List[Tuple[int, Optional[str], str]] = []
+    for i in range(start, stop):
+        if time.time() > deadline:
+            out.append((i, None, "document timeout"))
+            continue
+        try:
+            with _time_limit(page_timeout):
+                out.append((i, reader.pages[i].extract_text() or "", ""))
+        except (_PageTimeout, Exception) as e:
+            out.append((i, None, _skip_reason(e)))
+    return out
+
+_PDF_POOL: Optional[ProcessPoolExecutor] = None
+_PDF_POOL_LOCK = threading.Lock()
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is None:
+            here = os.path.dirname(os.path.abspath(__file__))
+            if here not in sys.path:
+                sys.path.append(here)  # spawned workers import this module by name
+            _PDF_POOL = ProcessPoolExecutor(
+                max_workers=max(1, PDF_PARSE_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),  # safe to start from a threaded server
+                initializer=_pdf_worker_init,
+                initargs=(PDF_WORKER_MEMORY_MB,),
+            )
+        return _PDF_POOL
+
+def _reset_pdf_pool(pool: ProcessPoolExecutor) -> None:
+    """Kill a pool with a stuck or crashed worker; the next call starts a fresh one."""
+    global _PDF_POOL
+    with _PDF_POOL_LOCK:
+        if _PDF_POOL is pool:
+            _PDF_POOL = None
+    for proc in list((getattr(pool, "_processes", None) or {}).values()):  # no public way to stop a busy worker
+        proc.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def _parse_pdf(data: bytes, max_pages: Optional[int], in_process: bool) -> Tuple[List[str], int, List[Dict]]:
+    deadline = time.time() + PDF_DOC_TIMEOUT
+    if in_process:
+        total = _count_pdf_pages(data, PDF_PAGE_TIMEOUT)
+        n = total if max_pages is None else min(total, max_pages)
+        results = _parse_pdf_pages(data, 0, n, PDF_PAGE_TIMEOUT, deadline)
+    else:
+        pool = _get_pdf_pool()
+        try:
+            total = pool.submit(_count_pdf_pages, data, PDF_PAGE_TIMEOUT).result(timeout=PDF_DOC_TIMEOUT)
+        except (TimeoutError, BrokenProcessPool):
+            _reset_pdf_pool(pool)
+            raise RuntimeError("PDF parsing timed out or crashed") from None
+        n = total if max_pages is None else min(total, max_pages)
+        step = max(1, -(-n // (max(1, PDF_PARSE_WORKERS) * 2)))
+        ranges = {
+            pool.submit(_parse_pdf_pages, data, lo, min(lo + step, n), PDF_PAGE_TIMEOUT, deadline): (lo, min(lo + step, n))
+            for lo in range(0, n, step)
+        }
+        # workers stop starting pages at the deadline; allow one page's time to report back
+        _done, pending = wait(ranges, timeout=max(0.0, deadline - time.time()) + PDF_PAGE_TIMEOUT)
+        broken = bool(pending)
+        results = []
+        for future, (lo, hi) in ranges.items():
+            if future in pending:
+                reason = "document timeout"
+            else:
+                try:
+                    results.extend(future.result())
+                    continue
+                except BrokenProcessPool:
+                    broken, reason = True, "parser crashed"
+                except Exception as e:
+                    reason = _skip_reason(e)
+            results.extend((i, None, reason) for i in range(lo, hi))
+        if broken:
+            _reset_pdf_pool(pool)
+
+    pages: List[str] = []
+    skipped: List[Dict] = []
+    chars = 0
+    for i, text, reason in sorted(results, key=lambda r: r[0]):
+        if text is not None and chars + len(text) > PDF_MAX_TEXT_CHARS:
+            text, reason = None, "text limit"
+        if text is None:
+            skipped.append({"page": i + 1, "reason": reason})
+            pages.append("")
+        else:
+            chars += len(text)
+            pages.append(text)
+    return pages, total, skipped
+
+def extract_pdf_text(data: bytes, max_pages: Optional[int] = None, in_process: bool = False) -> PdfText:
+    """
+    Text of the first max_pages pages (all by default), from the cache when this
+    file was seen before. Parsed on the PDF process pool unless in_process
+    (for callers that already run in a worker process of their own).
+    Results with skipped pages are returned but not cached.
+    """
+    sha256 = hashlib.sha256(data).hexdigest()
+    cache = get_pdf_text_cache()
+    hit = cache.get(sha256, max_pages)
+    if hit is not None:
+        return hit
+    t0 = time.perf_counter()
+    pages, total, skipped = _parse_pdf(data, max_pages, in_process)
+    extract_ms = (time.perf_counter() - t0) * 1000
+    if not skipped:
+        cache.put(sha256, pages, total, extract_ms)
+    return PdfText(_join_pages(pages), len(pages), total, extract_ms, skipped_pages=skipped)
 
 def clamp_text(s: str, max_chars: int = 120_000) -> str:
     if len(s) <= max_chars:
@@ -72,6 +404,49 @@ def _conn(db_path: str):
     conn.execute("PRAGMA foreign_keys = ON")
     return conn
 
+# ===== Data version =====
+# Every write that changes scoring inputs bumps one scope, inside the same
+# transaction. Caches key on these numbers so they never serve stale results.
+#   skills    -> EmployeeSkills, Skills, ManagerSkills
+#   employees -> Employees rows (department, name, title, email)
+#   projects  -> Projects, ProjectAssignment
+DATA_VERSION_SCOPES = ("skills", "employees", "projects")
+
+def _ensure_data_version(conn) -> None:
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS DataVersion (
+            scope TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    conn.executemany(
+        "INSERT OR IGNORE INTO DataVersion(scope, version) VALUES (?, 0)",
+        [(sc,) for sc in DATA_VERSION_SCOPES]
+    )
+
+def get_data_version(conn, scope: Optional[str] = None) -> int:
+    """
+    Version of one scope, or the sum over all scopes (which moves whenever
+    any scope does). Returns 0 on databases that predate the table.
+    """
+    try:
+        if scope:
+            row = conn.execute("SELECT version FROM DataVersion WHERE scope = ?", (scope,)).fetchone()
+        else:
+            row = conn.execute("SELECT COALESCE(SUM(version), 0) FROM DataVersion").fetchone()
+    except sqlite3.OperationalError:
+        return 0
+    return int(row[0]) if row else 0
+
+def bump_data_version(conn, *scopes: str) -> int:
+    """Bumps the given scopes in the caller's transaction (caller commits). Returns the new total."""
+    _ensure_data_version(conn)
+    for scope in scopes:
+        if scope not in DATA_VERSION_SCOPES:
+            raise ValueError(f"Unknown data version scope: {scope}")
+        conn.execute("UPDATE DataVersion SET version = version + 1 WHERE scope = ?", (scope,))
+    return get_data_version(conn)
+
 def init_db(db_path: str = DB_PATH) -> None:
     """
     Creates ALL tables you provided (Departments, SkillCategories, Skills, Teams, Managers,
@@ -201,6 +576,8 @@ def init_db(db_path: str = DB_PATH) -> None:
             )
         """)
 
+        _ensure_data_version(conn)
+
         conn.commit()
         print("✅ Database schema initialized.")
     finally:
@@ -453,6 +830,124 @@ def parse_top5_json(raw: str) -> List[dict]:
     return out
 
 
+# =========================
+# Catalog pruning
+# =========================
+# Ranks the skill catalog against the document with TF-IDF over hashed
+# character trigrams of skill names (typo/inflection tolerant: "dockerized"
+# still scores Docker). Only the top-N skills go into the prompt once the
+# catalog is larger than that; small catalogs are sent unchanged.
+CATALOG_PRUNE_TOP_N = int(os.getenv("CATALOG_PRUNE_TOP_N", "40"))
+_NGRAM_BUCKETS = 1 << 20
+_WORD_RE = re.compile(r"[a-z0-9+#]+")
+
+def _ngram_features(text: str) -> Dict[int, int]:
+    """Hashed counts of whole words and padded character trigrams."""
+    feats: Dict[int, int] = {}
+    for word in _WORD_RE.findall(text.lower()):
+        grams = [word] + [f" {word} "[i:i + 3] for i in range(len(word))]
+        for g in grams:
+            h = zlib.crc32(g.encode("utf-8")) % _NGRAM_BUCKETS
+            feats[h] = feats.get(h, 0) + 1
+    return feats
+
+class CatalogIndex:
+    """TF-IDF over hashed n-grams of skill names, with an inverted list per feature."""
+
+    def __init__(self, skills: List[SkillRow]):
+        self.skills = list(skills)
+        docs = [_ngram_features(s.skillName) for s in self.skills]
+        df: Dict[int, int] = {}
+        for d in docs:
+            for h in d:
+                df[h] = df.get(h, 0) + 1
+        n = len(docs)
+        self.idf = {h: math.log((1 + n) / (1 + c)) + 1.0 for h, c in df.items()}
+        self.postings: Dict[int, List[Tuple[int, float]]] = {}
+        for i, d in enumerate(docs):
+            vec = {h: (1.0 + math.log(c)) * self.idf[h] for h, c in d.items()}
+            norm = math.sqrt(sum(w * w for w in vec.values())) or 1.0
+            for h, w in vec.items():
+                self.postings.setdefault(h, []).append((i, w / norm))
+
+    def rank(self, text: str) -> List[Tuple[SkillRow, float]]:
+        """Every skill with its cosine score against text, best first (ties keep catalog order)."""
+        scores = [0.0] * len(self.skills)
+        for h, c in _ngram_features(text).items():
+            plist = self.postings.get(h)
+            if plist is None:
+                continue
+            q = (1.0 + math.log(c)) * self.idf[h]
+            for i, w in plist:
+                scores[i] += q * w
+        order = sorted(range(len(self.skills)), key=lambda i: -scores[i])
+        return [(self.skills[i], scores[i]) for i in order]
+
+_CATALOG_INDEXES: "OrderedDict[tuple, CatalogIndex]" = OrderedDict()
+_CATALOG_LOCK = threading.Lock()
+_PRUNE_TOTALS = {"requests": 0, "pruned": 0, "tokensFull": 0, "tokensSent": 0, "tokensSaved": 0}
+
+def get_catalog_index(skills: List[SkillRow]) -> CatalogIndex:
+    """Index for a catalog, reused while its IDs and names are unchanged."""
+    key = tuple((s.skillID, s.skillName) for s in skills)
+    with _CATALOG_LOCK:
+        index = _CATALOG_INDEXES.get(key)
+        if index is not None:
+            _CATALOG_INDEXES.move_to_end(key)
+            return index
+    index = CatalogIndex(skills)
+    with _CATALOG_LOCK:
+        _CATALOG_INDEXES[key] = index
+        while len(_CATALOG_INDEXES) > 32:
+            _CATALOG_INDEXES.popitem(last=False)
+    return index
+
+def estimate_tokens(text: str) -> int:
+    if tiktoken is not None:
+        try:
+            return len(tiktoken.get_encoding("cl100k_base").encode(text))
+        except Exception:
+            pass
+    return (len(text) + 3) // 4  # ~4 chars per token for English prose
+
+def prune_catalog(text: str, skills: List[SkillRow], top_n: int = CATALOG_PRUNE_TOP_N,
+                  keep_ids: Iterable[int] = ()) -> List[SkillRow]:
+    """
+    The top_n skills most relevant to text (plus keep_ids), in catalog order.
+    Returns the catalog unchanged when it already has top_n skills or fewer.
+    """
+    if top_n <= 0 or len(skills) <= top_n:
+        return list(skills)
+    keep = set(keep_ids)
+    for s, _score in get_catalog_index(skills).rank(text):
+        if len(keep) >= top_n:
+            break
+        keep.add(s.skillID)
+    return [s for s in skills if s.skillID in keep]
+
+def record_prune(full_prompt: str, sent_prompt: str, catalog_size: int, kept: int) -> Dict:
+    """Tokens saved by one pruned prompt; also added to the process totals."""
+    full, sent = estimate_tokens(full_prompt), estimate_tokens(sent_prompt)
+    report = {
+        "catalogSize": catalog_size,
+        "skillsSent": kept,
+        "promptTokensFull": full,
+        "promptTokensSent": sent,
+        "tokensSaved": full - sent,
+    }
+    with _CATALOG_LOCK:
+        _PRUNE_TOTALS["requests"] += 1
+        _PRUNE_TOTALS["pruned"] += kept < catalog_size
+        _PRUNE_TOTALS["tokensFull"] += full
+        _PRUNE_TOTALS["tokensSent"] += sent
+        _PRUNE_TOTALS["tokensSaved"] += full - sent
+    return report
+
+def catalog_prune_stats() -> Dict:
+    with _CATALOG_LOCK:
+        return {"topN": CATALOG_PRUNE_TOP_N, **_PRUNE_TOTALS}
+
+
 # =========================
 # AI calls (same interfaces)
 # =========================
@@ -465,6 +960,8 @@ def call_openai(prompt_text: str) -> str:
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY is not set")
     openai.api_key = api_key
+    if os.getenv("OPENAI_BASE_URL"):
+        openai.api_base = os.getenv("OPENAI_BASE_URL")  # e.g. the local stand-in
 
     model = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")  # pick one you have
 
@@ -510,6 +1007,327 @@ def call_gemini(prompt_text: str) -> str:
     return (getattr(resp, "text", "") or "").strip()
 
 
+# =========================
+# Skill postings index
+# =========================
+class SkillPostingsIndex:
+    """
+    In-process inverted index over EmployeeSkills:
+      skillID -> [(empID, profiencylevel), ...] sorted by empID
+
+    Scoring walks only the postings of the required skills, so the work is
+    proportional to how many people hold those skills rather than headcount.
+    Writers call set_employee_skills / refresh_employee / remove_employee /
+    remove_skill to keep it current.
+    """
+
+    def __init__(self):
+        self._postings: Dict[int, List[Tuple[int, int]]] = {}
+        self._by_emp: Dict[int, Dict[int, int]] = {}
+        self._lock = threading.RLock()
+        self.version = 0  # "skills" data version this index reflects
+
+    @classmethod
+    def build(cls, conn) -> "SkillPostingsIndex":
+        index = cls()
+        index.version = get_data_version(conn, "skills")
+        rows = conn.execute("""
+            SELECT empID, skillID, profiencylevel
+            FROM EmployeeSkills
+            ORDER BY skillID, empID
+        """)
+        for r in rows:
+            level = r["profiencylevel"] or 0
+            index._postings.setdefault(r["skillID"], []).append((r["empID"], level))
+            index._by_emp.setdefault(r["empID"], {})[r["skillID"]] = level
+        return index
+
+    def postings(self, skill_id: int) -> List[Tuple[int, int]]:
+        with self._lock:
+            return list(self._postings.get(skill_id, ()))
+
+    def employee_ids(self) -> List[int]:
+        """Everyone with at least one EmployeeSkills row."""
+        with self._lock:
+            return list(self._by_emp)
+
+    def _drop_posting(self, skill_id: int, emp_id: int) -> None:
+        plist = self._postings.get(skill_id)
+        if not plist:
+            return
+        i = bisect.bisect_left(plist, (emp_id, float("-inf")))
+        if i < len(plist) and plist[i][0] == emp_id:
+            del plist[i]
+        if not plist:
+            del self._postings[skill_id]
+
+    def set_employee_skills(self, emp_id: int, levels: Dict[int, int]) -> None:
+        """Replace one employee's postings with {skillID: level}."""
+        with self._lock:
+            for sid in self._by_emp.pop(emp_id, {}):
+                self._drop_posting(sid, emp_id)
+            if not levels:
+                return
+            self._by_emp[emp_id] = {}
+            for sid, level in levels.items():
+                level = level or 0
+                bisect.insort(self._postings.setdefault(sid, []), (emp_id, level))
+                self._by_emp[emp_id][sid] = level
+
+    def refresh_employee(self, conn, emp_id: int) -> None:
+        """Re-read one employee's skills after a write."""
+        rows = conn.execute(
+            "SELECT skillID, profiencylevel FROM EmployeeSkills WHERE empID = ?", (emp_id,)
+        ).fetchall()
+        self.set_employee_skills(emp_id, {r["skillID"]: r["profiencylevel"] for r in rows})
+
+    def remove_employee(self, emp_id: int) -> None:
+        self.set_employee_skills(emp_id, {})
+
+    def items(self) -> List[Tuple[int, List[Tuple[int, int]]]]:
+        """[(skillID, postings)] sorted by skillID; a copy taken under the lock."""
+        with self._lock:
+            return [(sid, list(plist)) for sid, plist in sorted(self._postings.items())]
+
+    def note_write(self, version: int) -> None:
+        """
+        Called after this process applied its own write incrementally. If no
+        other writer got in between, the index is current at `version`;
+        otherwise it stays behind and the next get_postings_index rebuilds it.
+        """
+        with self._lock:
+            if self.version == version - 1:
+                self.version = version
+
+    def remove_skill(self, skill_id: int) -> None:
+        with self._lock:
+            for emp_id, _lvl in self._postings.pop(skill_id, []):
+                skills = self._by_emp.get(emp_id)
+                if skills is not None:
+                    skills.pop(skill_id, None)
+                    if not skills:
+                        del self._by_emp[emp_id]
+
+
+_POSTINGS_INDEXES: Dict[str, SkillPostingsIndex] = {}
+_POSTINGS_LOCK = threading.Lock()
+
+def get_postings_index(db_path: str = DB_PATH, skills_version: Optional[int] = None) -> SkillPostingsIndex:
+    """
+    Process-wide index for one database file, built on first use and rebuilt
+    when `skills_version` shows another process changed skills since.
+    """
+    key = os.path.abspath(db_path)
+    with _POSTINGS_LOCK:
+        index = _POSTINGS_INDEXES.get(key)
+        if index is None or (skills_version is not None and index.version != skills_version):
+            conn = _conn(db_path)
+            try:
+                index = _POSTINGS_INDEXES[key] = SkillPostingsIndex.build(conn)
+            finally:
+                conn.close()
+        return index
+
+
+# =========================
+# Org snapshot
+# =========================
+# One immutable, array-backed view of everything the scorers read, shared by
+# the CLI (score_employees_for_skills / suggest_team) and the web app
+# (ai_helper). It is made of three parts, each tagged with the data version
+# of its scope; refreshing rebuilds only the parts whose scope moved and
+# shares the rest with the previous snapshot.
+
+@dataclass(frozen=True)
+class _EmployeeArrays:
+    version: int
+    emp_ids: array            # 'q', sorted
+    department: array         # 'q', 0 where NULL
+    firstname: Tuple[str, ...]
+    lastname: Tuple[str, ...]
+    title: Tuple[Optional[str], ...]
+    email: Tuple[Optional[str], ...]
+    row_of: Dict[int, int] = field(repr=False)
+    dept_rows: Dict[int, array] = field(repr=False)  # department -> 'l' row numbers, empID order
+
+@dataclass(frozen=True)
+class _SkillArrays:
+    version: int
+    skill_ids: array          # 'q', sorted
+    ptr: array                # 'q', postings of skill_ids[i] are [ptr[i], ptr[i+1])
+    post_emp: array           # 'q', empID, sorted within each skill
+    post_level: array         # 'h', profiencylevel (NULL -> 0)
+    skilled_emp_ids: array    # 'q', everyone with at least one EmployeeSkills row
+
+@dataclass(frozen=True)
+class _WorkloadArrays:
+    version: int
+    day: str                  # DATE('now') the active counts were taken on
+    emp_ids: array            # 'q', sorted
+    assigned: array           # 'l', all ProjectAssignment rows
+    active: array             # 'l', ACTIVE_STATUSES projects not yet ended
+
+
+def _load_employee_arrays(conn, version: int) -> _EmployeeArrays:
+    rows = conn.execute("""
+        SELECT empID, department, firstname, lastname, title, email
+        FROM Employees
+        ORDER BY empID
+    """).fetchall()
+    dept_rows: Dict[int, array] = {}
+    for i, r in enumerate(rows):
+        dept_rows.setdefault(r["department"] or 0, array("l")).append(i)
+    emp_ids = array("q", (r["empID"] for r in rows))
+    return _EmployeeArrays(
+        version=version,
+        emp_ids=emp_ids,
+        department=array("q", (r["department"] or 0 for r in rows)),
+        firstname=tuple(r["firstname"] for r in rows),
+        lastname=tuple(r["lastname"] for r in rows),
+        title=tuple(r["title"] for r in rows),
+        email=tuple(r["email"] for r in rows),
+        row_of={e: i for i, e in enumerate(emp_ids)},
+        dept_rows=dept_rows,
+    )
+
+def _load_skill_arrays(db_path: str, version: int) -> _SkillArrays:
+    # Built from the postings index, which writers keep current in place
+    index = get_postings_index(db_path, version)
+    skill_ids, ptr = array("q"), array("q", [0])
+    post_emp, post_level = array("q"), array("h")
+    for sid, plist in index.items():
+        skill_ids.append(sid)
+        for emp_id, level in plist:
+            post_emp.append(emp_id)
+            post_level.append(level)
+        ptr.append(len(post_emp))
+    return _SkillArrays(
+        version=index.version,  # a rebuild may have picked up a newer write
+        skill_ids=skill_ids,
+        ptr=ptr,
+        post_emp=post_emp,
+        post_level=post_level,
+        skilled_emp_ids=array("q", sorted(set(post_emp))),
+    )
+
+def _load_workload_arrays(conn, version: int) -> _WorkloadArrays:
+    if ACTIVE_STATUSES:
+        active_expr = """SUM(CASE WHEN p.status IN ({placeholders})
+                              AND (p.endDate IS NULL OR DATE(p.endDate) >= DATE('now'))
+                              THEN 1 ELSE 0 END)""".format(placeholders=",".join("?" * len(ACTIVE_STATUSES)))
+    else:
+        active_expr = "0"
+    rows = conn.execute(f"""
+        SELECT pa.empID, COUNT(*) AS assigned, {active_expr} AS active
+        FROM ProjectAssignment pa
+        JOIN Projects p ON p.projectID = pa.projectID
+        GROUP BY pa.empID
+        ORDER BY pa.empID
+    """, tuple(ACTIVE_STATUSES)).fetchall()
+    return _WorkloadArrays(
+        version=version,
+        day=conn.execute("SELECT DATE('now')").fetchone()[0],
+        emp_ids=array("q", (r["empID"] for r in rows)),
+        assigned=array("l", (r["assigned"] for r in rows)),
+        active=array("l", (r["active"] for r in rows)),
+    )
+
+
+@dataclass(frozen=True)
+class OrgSnapshot:
+    """
+    Read-only org data for scoring:
+      - employees: one row per Employees record (empID order)
+      - skills:    postings per skill, CSR-style (offsets into flat arrays)
+      - workload:  assignment counts (all, and active) per empID
+    Never mutated; get_org_snapshot swaps in a new one when data changes.
+    """
+    employees: _EmployeeArrays
+    skills: _SkillArrays
+    workload: _WorkloadArrays
+
+    @property
+    def versions(self) -> Tuple[int, int, int]:
+        return (self.skills.version, self.employees.version, self.workload.version)
+
+    # ---- skills ----
+    def postings(self, skill_id: int) -> Iterable[Tuple[int, int]]:
+        """(empID, level) for everyone holding skill_id, in empID order."""
+        sk = self.skills
+        i = bisect.bisect_left(sk.skill_ids, skill_id)
+        if i == len(sk.skill_ids) or sk.skill_ids[i] != skill_id:
+            return ()
+        lo, hi = sk.ptr[i], sk.ptr[i + 1]
+        return zip(sk.post_emp[lo:hi], sk.post_level[lo:hi])
+
+    def skilled_employee_ids(self) -> array:
+        return self.skills.skilled_emp_ids
+
+    # ---- employees ----
+    def department_rows(self, department_id: int) -> array:
+        return self.employees.dept_rows.get(department_id, array("l"))
+
+    def employee_row(self, emp_id: int) -> Optional[int]:
+        return self.employees.row_of.get(emp_id)
+
+    # ---- workload ----
+    def _workload_at(self, emp_id: int, counts: array) -> int:
+        wl = self.workload
+        i = bisect.bisect_left(wl.emp_ids, emp_id)
+        return counts[i] if i < len(wl.emp_ids) and wl.emp_ids[i] == emp_id else 0
+
+    def assignment_count(self, emp_id: int) -> int:
+        """All ProjectAssignment rows (what the web app's workload penalty uses)."""
+        return self._workload_at(emp_id, self.workload.assigned)
+
+    def active_count(self, emp_id: int) -> int:
+        """Active assignments, as _active_assignment_counts defines them."""
+        return self._workload_at(emp_id, self.workload.active)
+
+    def active_counts(self) -> Dict[int, int]:
+        wl = self.workload
+        return {e: c for e, c in zip(wl.emp_ids, wl.active) if c}
+
+
+_ORG_SNAPSHOTS: Dict[str, OrgSnapshot] = {}
+_SNAPSHOT_LOCK = threading.Lock()
+
+def get_org_snapshot(db_path: str = DB_PATH, conn=None) -> OrgSnapshot:
+    """
+    Current snapshot for one database file. Reads the three scope versions
+    (and today's date, which active counts depend on) and rebuilds only the
+    stale parts. Pass `conn` to reuse an open connection.
+    """
+    own = conn is None
+    if own:
+        conn = _conn(db_path)
+    try:
+        skills_v = get_data_version(conn, "skills")
+        employees_v = get_data_version(conn, "employees")
+        projects_v = get_data_version(conn, "projects")
+        today = conn.execute("SELECT DATE('now')").fetchone()[0]
+
+        key = os.path.abspath(db_path)
+        with _SNAPSHOT_LOCK:
+            old = _ORG_SNAPSHOTS.get(key)
+            if old is not None and old.versions == (skills_v, employees_v, projects_v) \
+                    and old.workload.day == today:
+                return old
+
+            employees = old.employees if old and old.employees.version == employees_v \
+                else _load_employee_arrays(conn, employees_v)
+            skills = old.skills if old and old.skills.version == skills_v \
+                else _load_skill_arrays(db_path, skills_v)
+            workload = old.workload if old and old.workload.version == projects_v and old.workload.day == today \
+                else _load_workload_arrays(conn, projects_v)
+
+            snapshot = _ORG_SNAPSHOTS[key] = OrgSnapshot(employees, skills, workload)
+            return snapshot
+    finally:
+        if own:
+            conn.close()
+
+
 # =========================
 # Recommendation + persistence
 # =========================
@@ -594,31 +1412,33 @@ def score_employees_for_skills(db_path: str, top5: List[dict]) -> List[Tuple[int
     Base Score = sum over required skills of (weight_by_rank * prof_level).
     Availability Penalty = PENALTY_PER_ACTIVE * active_assignment_count.
     Final Score = max(0, Base - Availability Penalty).
+
+    Only employees in the postings of a required skill are scored; everyone
+    else has Base 0 and therefore a Final Score of 0.
     """
-    conn = _conn(db_path)
-    try:
-        weights = _weights_for_top5(top5)  # skillID -> 5..1
-        profiles = _employee_skill_profile(conn)
-        active_counts = _active_assignment_counts(conn)
+    return _score_snapshot(get_org_snapshot(db_path), top5)
 
-        scores: List[Tuple[int, float]] = []
-        for emp_id, skill_map in profiles.items():
-            base = 0.0
-            for sid, w in weights.items():
-                base += w * skill_map.get(sid, 0)
+def _score_snapshot(snapshot: OrgSnapshot, top5: List[dict]) -> List[Tuple[int, float]]:
+    weights = _weights_for_top5(top5)  # skillID -> 5..1
 
-            penalty = PENALTY_PER_ACTIVE * active_counts.get(emp_id, 0)
-            final = base - penalty
-            if final < 0:
-                final = 0.0
+    base: Dict[int, float] = {}
+    for sid, w in weights.items():
+        for emp_id, level in snapshot.postings(sid):
+            base[emp_id] = base.get(emp_id, 0.0) + w * level
 
-            scores.append((emp_id, final))
+    scores: List[Tuple[int, float]] = []
+    for emp_id in snapshot.skilled_employee_ids():
+        if emp_id not in base:
+            scores.append((emp_id, 0.0))
+            continue
+        final = base[emp_id] - PENALTY_PER_ACTIVE * snapshot.active_count(emp_id)
+        if final < 0:
+            final = 0.0
+        scores.append((emp_id, final))
 
-        # sort by score desc, tie-breaker by empID asc
-        scores.sort(key=lambda x: (-x[1], x[0]))
-        return scores
-    finally:
-        conn.close()
+    # sort by score desc, tie-breaker by empID asc
+    scores.sort(key=lambda x: (-x[1], x[0]))
+    return scores
 
 def suggest_team(db_path: str, top5: List[dict], k: int = 4, exclude: Set[int] = None) -> List[int]:
     """
@@ -626,18 +1446,13 @@ def suggest_team(db_path: str, top5: List[dict], k: int = 4, exclude: Set[int] =
     Skips employees who already meet/exceed MAX_ACTIVE_ASSIGNMENTS on active projects.
     """
     exclude = exclude or set()
-    conn = _conn(db_path)
-    try:
-        active_counts = _active_assignment_counts(conn)
-    finally:
-        conn.close()
+    snapshot = get_org_snapshot(db_path)
 
-    ranked = score_employees_for_skills(db_path, top5)
     picked: List[int] = []
-    for emp_id, _score in ranked:
+    for emp_id, _score in _score_snapshot(snapshot, top5):
         if emp_id in exclude:
             continue
-        if _is_overallocated(active_counts, emp_id):
+        if snapshot.active_count(emp_id) >= MAX_ACTIVE_ASSIGNMENTS:
             continue
         picked.append(emp_id)
         if len(picked) >= k:
@@ -720,6 +1535,7 @@ def persist_project_with_team(db_path: str, project_name: str, team_emp_ids: Lis
                 VALUES (?, ?, ?)
             """, (project_id, eid, role))
 
+        bump_data_version(conn, "projects")
         conn.commit()
         print(f"💾 Saved project '{project_name}' with {len(team_emp_ids)} assignments (projectID={project_id}).")
         return project_id
@@ -758,8 +1574,13 @@ def main():
         print("Error: No skills found in the database. Add rows to Skills and try again.")
         sys.exit(1)
 
-    # 5) Build constrained prompt
-    prompt = build_constrained_prompt(clamp_text(pdf_text), skills)
+    # 5) Build constrained prompt (catalog pruned to the skills relevant to this PDF)
+    pdf_text = clamp_text(pdf_text)
+    kept = prune_catalog(pdf_text, skills)
+    prompt = build_constrained_prompt(pdf_text, kept)
+    if len(kept) < len(skills):
+        report = record_prune(build_constrained_prompt(pdf_text, skills), prompt, len(skills), len(kept))
+        print(f"Catalog pruned to {len(kept)}/{len(skills)} skills, ~{report['tokensSaved']} prompt tokens saved.")
 
     # 6) Provider choice
     print("\nChoose AI provider:")
@@ -0,0 +1,300 @@
+# bulk_resume_ingest.py
+#
+#   python bulk_resume_ingest.py resumes.zip mapping.csv [--workers 4] [--batch-size 4] [--report out.json]
+#
+# Bulk version of employee_skill_ingest.py for onboarding a whole team:
+#   - a zip of resume PDFs plus a CSV mapping each file to an existing employee
+#     (columns: file, and empID or email; the CSV may also live inside the zip)
+#   - PDF text is extracted on a process pool
+#   - resumes go to the LLM several per prompt, with a few prompts in flight;
+#     a resume missing from a batched reply is retried on its own
+#   - skill upserts (same rules as the CLI: max level wins, never downgrade)
+#     are committed every --commit-every employees instead of one by one
+#   - prints per-file results and throughput in resumes per minute
+import os
+import sys
+import csv
+import io
+import json
+import time
+import zipfile
+import textwrap
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Optional, Tuple
+
+from employee_skill_ingest import (
+    DB_PATH,
+    PdfReader,
+    SkillRow,
+    _conn,
+    build_resume_prompt,
+    call_openai_json,
+    clamp,
+    load_skills,
+    parse_skills_json,
+    upsert_employee_skills,
+)
+from ai_pdf_app import extract_pdf_text
+
+BATCH_RESUME_CHARS = 15_000
+
+@dataclass
+class FileResult:
+    file: str
+    empID: Optional[int] = None
+    status: str = "pending"      # ok | error
+    chars: int = 0
+    skills: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    error: Optional[str] = None
+
+# =========================
+# Inputs (zip + CSV mapping)
+# =========================
+def read_mapping(zip_path: str, csv_path: Optional[str]) -> List[Dict[str, str]]:
+    """Rows of the mapping CSV; without csv_path, the single .csv inside the zip is used."""
+    if csv_path:
+        with open(csv_path, newline="", encoding="utf-8-sig") as f:
+            return list(csv.DictReader(f))
+    with zipfile.ZipFile(zip_path) as zf:
+        csvs = [n for n in zf.namelist() if n.lower().endswith(".csv") and not n.startswith("__MACOSX/")]
+        if len(csvs) != 1:
+            raise RuntimeError("Pass the mapping CSV path (the zip must contain exactly one .csv otherwise).")
+        with zf.open(csvs[0]) as f:
+            return list(csv.DictReader(io.TextIOWrapper(f, encoding="utf-8-sig")))
+
+def resolve_employees(conn, mapping: List[Dict[str, str]], members: List[str]) -> Tuple[List[Tuple[str, int]], List[FileResult]]:
+    """[(zip member, empID)] for usable rows, plus error results for the rest."""
+    by_base = {}
+    for m in members:
+        by_base.setdefault(os.path.basename(m), m)
+    jobs, errors = [], []
+    for row in mapping:
+        row = {(k or "").strip().lower(): (v or "").strip() for k, v in row.items()}
+        name = row.get("file", "")
+        member = name if name in members else by_base.get(os.path.basename(name))
+        if not member:
+            errors.append(FileResult(name or "(blank)", status="error", error="file not found in archive"))
+            continue
+        emp = None
+        if row.get("empid"):
+            emp = conn.execute("SELECT empID FROM Employees WHERE empID = ?", (row["empid"],)).fetchone()
+        elif row.get("email"):
+            emp = conn.execute("SELECT empID FROM Employees WHERE email = ? COLLATE NOCASE", (row["email"],)).fetchone()
+        if not emp:
+            errors.append(FileResult(name, status="error", error="employee not found (need empID or email)"))
+            continue
+        jobs.append((member, int(emp["empID"])))
+    return jobs, errors
+
+# =========================
+# Text extraction (process pool worker)
+# =========================
+def _extract_member(zip_path: str, member: str) -> str:
+    if PdfReader is None:
+        raise RuntimeError("pypdf not installed. Install it with: python -m pip install pypdf")
+    with zipfile.ZipFile(zip_path) as zf:
+        data = zf.read(member)
+    # already in a worker process of our own: parse here (same page limits), no nested pool
+    return extract_pdf_text(data, in_process=True).text
+
+# =========================
+# Batched LLM analysis
+# =========================
+def build_batch_resume_prompt(resumes: List[Tuple[str, str]], allowed_skills: List[SkillRow]) -> str:
+    catalog = "\n".join(f"{s.skillID} | {s.skillName}" for s in allowed_skills)
+    blocks = "\n\n".join(
+        f"--- RESUME id={rid} START ---\n{clamp(text, BATCH_RESUME_CHARS)}\n--- RESUME id={rid} END ---"
+        for rid, text in resumes
+    )
+    return textwrap.dedent("""
+    You will extract skills from several candidate resumes and map them ONLY to the allowed skills catalog (ID|Name).
+    Analyze each resume independently. Output strict JSON with this schema, one entry per resume id:
+    {{
+      "resumes": [
+        {{"id": "<resume id>", "skills": [
+          {{"skillID": <int>, "skillName": "<exact from catalog>", "level": <int 1-5>, "evidence": "<short phrase>"}}
+        ]}}
+      ]
+    }}
+
+    Rules:
+    - Use ONLY skills that appear in the catalog (exact names, correct IDs).
+    - Choose a realistic level 1-5 based on resume evidence (1=basic, 5=expert).
+    - Avoid duplicates within a resume; keep the strongest level.
+    - Keep "evidence" short (few words) referencing resume content (e.g., "3 yrs Python at ACME").
+
+    --- ALLOWED SKILLS (ID | Name) ---
+    {catalog}
+
+    {blocks}
+    """).strip().format(catalog=catalog, blocks=blocks)
+
+def parse_batch_json(raw: str) -> Dict[str, List[Dict]]:
+    raw = raw.strip()
+    first = raw.find("{"); last = raw.rfind("}")
+    if 0 <= first <= last:
+        raw = raw[first:last+1]
+    data = json.loads(raw)
+    if not isinstance(data, dict) or not isinstance(data.get("resumes"), list):
+        raise ValueError("Unexpected JSON; expected object with 'resumes' list.")
+    out: Dict[str, List[Dict]] = {}
+    for entry in data["resumes"]:
+        if isinstance(entry, dict) and "id" in entry:
+            out[str(entry["id"])] = parse_skills_json(json.dumps({"skills": entry.get("skills") or []}))
+    return out
+
+def analyze_batch(batch: List[Tuple[str, str]], allowed: List[SkillRow]) -> Dict[str, object]:
+    """{resume id: parsed skills or the Exception that stopped it}."""
+    results: Dict[str, object] = {}
+    if len(batch) > 1:
+        try:
+            results = parse_batch_json(call_openai_json(build_batch_resume_prompt(batch, allowed)))
+        except Exception as e:
+            print(f"⚠️ Batched analysis failed ({e}); retrying resumes one by one.")
+    for rid, text in batch:
+        if rid not in results:
+            try:
+                results[rid] = parse_skills_json(call_openai_json(build_resume_prompt(text, allowed)))
+            except Exception as e:
+                results[rid] = e
+    return results
+
+# =========================
+# Pipeline
+# =========================
+def run_bulk_ingest(zip_path: str, csv_path: Optional[str] = None, db_path: str = DB_PATH,
+                    workers: int = 4, batch_size: int = 4, llm_concurrency: int = 4,
+                    commit_every: int = 200, dry_run: bool = False) -> Dict:
+    t0 = time.perf_counter()
+    conn = _conn(db_path)
+    try:
+        with zipfile.ZipFile(zip_path) as zf:
+            members = [n for n in zf.namelist() if n.lower().endswith(".pdf") and not n.startswith("__MACOSX/")]
+        jobs, results = resolve_employees(conn, read_mapping(zip_path, csv_path), members)
+        allowed = load_skills(conn)
+        if not allowed:
+            raise RuntimeError("Skills table is empty. Seed it first.")
+
+        by_id: Dict[str, Tuple[FileResult, int]] = {}
+        pending_batch: List[Tuple[str, str]] = []
+        llm_futures = []
+        uncommitted = 0
+
+        def flush(llm_pool) -> None:
+            if pending_batch:
+                llm_futures.append(llm_pool.submit(analyze_batch, list(pending_batch), allowed))
+                pending_batch.clear()
+
+        def apply(rid: str, parsed) -> None:
+            nonlocal uncommitted
+            res, emp_id = by_id[rid]
+            if isinstance(parsed, Exception):
+                res.status, res.error = "error", f"{type(parsed).__name__}: {parsed}"
+                return
+            res.skills = len(parsed)
+            if not dry_run:
+                summary = upsert_employee_skills(conn, emp_id, parsed, commit=False)
+                res.inserted, res.updated, res.skipped = summary["inserted"], summary["updated"], summary["skipped"]
+                uncommitted += 1
+                if uncommitted >= commit_every:
+                    conn.commit()
+                    uncommitted = 0
+            res.status = "ok"
+
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as pdf_pool, \
+                ThreadPoolExecutor(max_workers=max(1, llm_concurrency)) as llm_pool:
+            text_futures = {pdf_pool.submit(_extract_member, zip_path, member): (member, emp_id)
+                            for member, emp_id in jobs}
+            for fut in as_completed(text_futures):
+                member, emp_id = text_futures[fut]
+                res = FileResult(member, emp_id)
+                results.append(res)
+                try:
+                    text = fut.result()
+                except Exception as e:
+                    res.status, res.error = "error", f"PDF extraction failed: {e}"
+                    continue
+                res.chars = len(text)
+                if not text:
+                    res.status, res.error = "error", "no extractable text (likely scanned)"
+                    continue
+                rid = f"r{len(by_id) + 1}"
+                by_id[rid] = (res, emp_id)
+                pending_batch.append((rid, text))
+                if len(pending_batch) >= batch_size:
+                    flush(llm_pool)
+            flush(llm_pool)
+
+            # upserts stay on this thread (one connection, few transactions)
+            for fut in as_completed(llm_futures):
+                for rid, parsed in fut.result().items():
+                    apply(rid, parsed)
+
+        if uncommitted:
+            conn.commit()
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - t0
+    ok = sum(r.status == "ok" for r in results)
+    return {
+        "files": len(results),
+        "ok": ok,
+        "failed": len(results) - ok,
+        "elapsedSeconds": round(elapsed, 2),
+        "resumesPerMinute": round(ok / elapsed * 60.0, 1) if elapsed > 0 else 0.0,
+        "dryRun": dry_run,
+        "results": [asdict(r) for r in sorted(results, key=lambda r: r.file)],
+    }
+
+def print_report(report: Dict) -> None:
+    print("\nPer-file results:")
+    for r in report["results"]:
+        if r["status"] == "ok":
+            print(f"   ✅ {r['file']} → empID={r['empID']}: {r['skills']} skills "
+                  f"(inserted {r['inserted']}, updated {r['updated']}, skipped {r['skipped']})")
+        else:
+            emp = f" → empID={r['empID']}" if r["empID"] else ""
+            print(f"   ❌ {r['file']}{emp}: {r['error']}")
+    print(f"\n{report['ok']}/{report['files']} resumes ingested in {report['elapsedSeconds']}s "
+          f"— {report['resumesPerMinute']} resumes/min" + (" (dry run, nothing written)" if report["dryRun"] else ""))
+
+# =========================
+# Main
+# =========================
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Bulk resume ingest: zip of PDFs + CSV (file, empID|email).")
+    ap.add_argument("zip", help="zip archive of resume PDFs")
+    ap.add_argument("csv", nargs="?", help="mapping CSV (default: the .csv inside the zip)")
+    ap.add_argument("--db", default=DB_PATH)
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="PDF extraction processes")
+    ap.add_argument("--batch-size", type=int, default=4, help="resumes per LLM prompt")
+    ap.add_argument("--llm-concurrency", type=int, default=4, help="LLM prompts in flight")
+    ap.add_argument("--commit-every", type=int, default=200, help="employees per transaction")
+    ap.add_argument("--report", help="also write the JSON report here")
+    ap.add_argument("--dry-run", action="store_true", help="analyze but do not write skills")
+    args = ap.parse_args(argv)
+
+    print("\n=== Bulk Resume Ingest (zip + CSV → Skills) ===")
+    report = run_bulk_ingest(args.zip, args.csv, args.db, args.workers, args.batch_size,
+                             args.llm_concurrency, args.commit_every, args.dry_run)
+    print_report(report)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Report written to {args.report}")
+    return 0 if report["failed"] == 0 else 1
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\nCancelled.")
+    except Exception as e:
+        print("Error:", e)
+        sys.exit(1)
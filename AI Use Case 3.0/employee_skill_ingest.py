@@ -16,6 +16,8 @@ try:
 except Exception:
     PdfReader = None
 
+from ai_pdf_app import bump_data_version  # keeps the web app's caches in step with CLI edits
+
 load_dotenv()
 
 DB_PATH = os.getenv("EMPLOYEE_DB_PATH", "employees.db")
@@ -128,6 +130,7 @@ def set_employee_skill_exact(
             INSERT INTO EmployeeSkills(empID, skillID, profiencylevel, evidence)
             VALUES(?,?,?,?)
         """, (emp_id, skill_id, level, evidence or None))
+    bump_data_version(conn, "skills")
     conn.commit()
 
 def manual_skill_editor(conn, emp_id: int) -> None:
@@ -391,6 +394,7 @@ def upsert_employee(conn, firstname: str, lastname: str, title: str,
                SET firstname=?, lastname=?, title=?, department=?, teamID=?, phone=?
              WHERE empID=?
         """, (firstname, lastname, title, dep_id, team_id, phone_digits, existing["empID"]))
+        bump_data_version(conn, "employees")
         conn.commit()
         print(f"✏️ Updated employee {firstname} {lastname} ({email}) [empID={existing['empID']}]")
         return existing["empID"]
@@ -399,6 +403,7 @@ def upsert_employee(conn, firstname: str, lastname: str, title: str,
         INSERT INTO Employees(firstname, lastname, title, department, teamID, email, phone)
         VALUES (?,?,?,?,?,?,?)
     """, (firstname, lastname, title, dep_id, team_id, email, phone_digits))
+    bump_data_version(conn, "employees")
     conn.commit()
     emp_id = cur.lastrowid
     print(f"➕ Created employee {firstname} {lastname} ({email}) [empID={emp_id}]")
@@ -441,11 +446,12 @@ def _dedupe_skill_updates(updates: List[Dict]) -> List[Dict]:
         out.append({"skillID": sid, "level": v["level"], "evidence": ev})
     return out
 
-def upsert_employee_skills(conn, emp_id: int, updates: List[Dict]) -> Dict[str, int]:
+def upsert_employee_skills(conn, emp_id: int, updates: List[Dict], commit: bool = True) -> Dict[str, int]:
     """
     Apply skill updates for an employee (auto-ingest / AI path).
     - De-duplicates by skillID (max level wins; merges evidence)
     - Never downgrades existing levels
+    - commit=False leaves the transaction open (bulk ingest commits in batches)
     Returns: {"inserted": X, "updated": Y, "skipped": Z}
     """
     deduped = _dedupe_skill_updates(updates)
@@ -479,7 +485,10 @@ def upsert_employee_skills(conn, emp_id: int, updates: List[Dict]) -> Dict[str,
             else:
                 skipped += 1
 
-    conn.commit()
+    if inserted or updated:
+        bump_data_version(conn, "skills")
+    if commit:
+        conn.commit()
     return {"inserted": inserted, "updated": updated, "skipped": skipped}
 
 def print_employee_skills(conn, emp_id: int):
@@ -544,9 +553,11 @@ def delete_employee(conn, email: str, force: bool=False) -> None:
 
     if force and counts["total"] > 0:
         conn.execute("DELETE FROM ProjectAssignment WHERE empID=?", (emp_id,))
+        bump_data_version(conn, "projects")
         conn.commit()
 
     conn.execute("DELETE FROM Employees WHERE empID=?", (emp_id,))
+    bump_data_version(conn, "employees", "skills")  # EmployeeSkills rows go with it (cascade)
     conn.commit()
     print(f"🗑️ Deleted employee {row['firstname']} {row['lastname']} ({email}) [empID={emp_id}]")
 
@@ -559,6 +570,8 @@ def call_openai_json(prompt_text: str) -> str:
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY not set.")
     openai.api_key = api_key
+    if os.getenv("OPENAI_BASE_URL"):
+        openai.api_base = os.getenv("OPENAI_BASE_URL")  # e.g. the local stand-in
 
     resp = openai.ChatCompletion.create(
         model=OPENAI_MODEL,
@@ -1,10 +1,22 @@
 # ai_helper.py
 import os
+import sys
 import json
+import heapq
 import sqlite3
-from typing import List, Dict, Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
 from dotenv import load_dotenv
-from flask import session
+from flask import has_request_context, session
+
+import skill_matrix
+from skill_matcher import get_skill_matcher
+from llm_cache import get_llm_cache
+from llm_executor import get_llm_executor
+from llm_gateway import LLMReply, get_llm_gateway
+from llm_singleflight import get_llm_singleflight
 
 load_dotenv()
 
@@ -15,39 +27,116 @@ import importlib.util
 ai_pdf_path = os.path.join(os.path.dirname(__file__), 'AI Use Case 3.0', 'ai_pdf_app.py')
 spec = importlib.util.spec_from_file_location("ai_pdf_app", ai_pdf_path)
 ai_pdf_app = importlib.util.module_from_spec(spec)
+sys.modules["ai_pdf_app"] = ai_pdf_app  # lets PDF parse workers pickle its functions by name
 spec.loader.exec_module(ai_pdf_app)
 
 _conn = ai_pdf_app._conn
 call_anthropic = ai_pdf_app.call_anthropic
 call_gemini = ai_pdf_app.call_gemini
+get_postings_index = ai_pdf_app.get_postings_index
+get_org_snapshot = ai_pdf_app.get_org_snapshot
+get_data_version = ai_pdf_app.get_data_version
+prune_catalog = ai_pdf_app.prune_catalog
+record_prune = ai_pdf_app.record_prune
+catalog_prune_stats = ai_pdf_app.catalog_prune_stats
+bump_data_version = ai_pdf_app.bump_data_version
+extract_pdf_text = ai_pdf_app.extract_pdf_text
+pdf_text_cache_stats = ai_pdf_app.pdf_text_cache_stats
 
 DB_PATH = os.getenv("EMPLOYEE_DB_PATH", "employees.db")
 
+# ==============================================================
+# ✅ Skill postings index upkeep (called by app.py after writes)
+# ==============================================================
+def refresh_employee_postings(conn, emp_id: int) -> None:
+    """Reload one employee's skills into the postings index."""
+    index = get_postings_index(DB_PATH)
+    index.refresh_employee(conn, emp_id)
+    index.note_write(get_data_version(conn, "skills"))
+
+def remove_employee_postings(conn, emp_id: int) -> None:
+    index = get_postings_index(DB_PATH)
+    index.remove_employee(emp_id)
+    index.note_write(get_data_version(conn, "skills"))
+
+def remove_skill_postings(conn, skill_id: int) -> None:
+    index = get_postings_index(DB_PATH)
+    index.remove_skill(skill_id)
+    index.note_write(get_data_version(conn, "skills"))
+
 # ==============================================================
 # ✅ OpenAI API wrapper
 # ==============================================================
+OPENAI_TEMPERATURE = 0.4
+
+def _openai_model() -> str:
+    return os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
 def call_openai(prompt_text: str) -> str:
-    """Call OpenAI (v1.x) and return strict JSON string."""
-    from openai import OpenAI
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY not set")
-    client = OpenAI(api_key=api_key)
-    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-    resp = client.chat.completions.create(
-        model=model,
-        messages=[
-            {"role": "system", "content": "Respond in strict JSON only. No commentary."},
-            {"role": "user", "content": prompt_text}
-        ],
-        temperature=0.4
-    )
-    return resp.choices[0].message.content.strip()
+    """
+    Call OpenAI and return strict JSON string. Goes through the provider
+    gateway (llm_gateway.py): pooled client, deadline, retries, and failover
+    to the next configured provider when OpenAI is down.
+    """
+    return _complete_openai(prompt_text).text
+
+def _complete_openai(prompt_text: str) -> LLMReply:
+    """call_openai(), plus the provider/model that actually answered."""
+    return get_llm_gateway().complete_reply(prompt_text, temperature=OPENAI_TEMPERATURE, validate=_is_json_reply)
+
+def _is_json_reply(raw: str) -> bool:
+    if raw.startswith("```"):
+        raw = "\n".join([l for l in raw.splitlines() if not l.strip().startswith("```")])
+    try:
+        json.loads(raw)
+        return True
+    except ValueError:
+        return False
+
+def _submit_openai(prompt_text: str) -> Future:
+    """
+    OpenAI call through the response cache and the LLM executor. A cache hit
+    comes back as an already-completed future without taking an executor
+    slot; a miss runs on the executor and is stored if the reply is JSON and
+    came from OPENAI_MODEL itself (a failover/hedge reply from another
+    provider is returned but not cached under the OpenAI key).
+    Identical prompts already in flight (in this or another worker process)
+    share that call instead of starting a new one.
+    """
+    cache = get_llm_cache()
+    model = _openai_model()
+    key = cache.make_key("openai", model, OPENAI_TEMPERATURE, prompt_text)
+    cached = cache.get(key)
+    if cached is not None:
+        future: Future = Future()
+        future.set_result(cached)
+        return future
+
+    def _call() -> str:
+        reply = get_llm_executor().call("openai", _complete_openai, prompt_text)
+        if (reply.provider, reply.model) == ("openai", model) and _is_json_reply(reply.text):
+            cache.put(key, "openai", model, reply.text)
+        return reply.text
+
+    return get_llm_singleflight().do(key, _call)
 
 # ==============================================================
 # ✅ Skill Extraction (department scoped)
 # ==============================================================
-def _build_skill_extraction_prompt(prd_text: str, dept_skills: Dict[str, int]) -> str:
+# Local matcher pre-pass: enough confident verbatim hits skip the LLM;
+# otherwise every hit is kept in the catalog when it is pruned for the prompt.
+SKILL_MATCHER_ENABLED = os.getenv("SKILL_MATCHER_ENABLED", "1") == "1"
+SKILL_MATCH_SKIP_LLM_MIN = int(os.getenv("SKILL_MATCH_SKIP_LLM_MIN", "6"))
+
+# Kept apart from the catalog pruning totals: a skipped call is not a pruning saving
+_MATCHER_TOTALS = {"documents": 0, "llmSkipped": 0}
+_MATCHER_TOTALS_LOCK = threading.Lock()
+
+def skill_matcher_stats() -> Dict:
+    with _MATCHER_TOTALS_LOCK:
+        return {"enabled": SKILL_MATCHER_ENABLED, "skipLlmMin": SKILL_MATCH_SKIP_LLM_MIN, **_MATCHER_TOTALS}
+
+def _build_skill_extraction_prompt(prd_text: str, dept_skills: Dict[str, int], max_chars: int = 6000) -> str:
     skill_list = "\n".join([f"- {name} (ID={sid})" for name, sid in dept_skills.items()])
     return f"""
 You are an assistant extracting required skills from a project PRD.
@@ -60,8 +149,8 @@ Your task:
 Department skill catalog (allowed skills only):
 {skill_list}
 
-Project requirements (PRD, truncated to 6000 characters):
-\"\"\"{prd_text[:6000]}\"\"\"
+Project requirements (PRD, truncated to {max_chars} characters):
+\"\"\"{prd_text[:max_chars]}\"\"\"
 
 Return ONLY strict JSON with this shape.
 
@@ -86,13 +175,12 @@ Rules:
 - Output strictly valid JSON (no markdown, no commentary).
 """
 
-def extract_skills_from_text(prd_text: str, conn, department_id: int) -> List[Dict]:
+def _load_skill_catalog(conn, department_id: int, manager_id: Optional[int], required: bool = False) -> list:
     """
-    Extract skills from THIS manager's skill bank first.
-    If the manager has no ManagerSkills, fall back to all skills for the department.
+    Manager's skill bank, or the department's skills if the bank is empty.
+    Shared by skill extraction and team/portfolio scoring; `required` raises
+    instead of returning an empty catalog.
     """
-    manager_id = session.get("manager_id")
-
     rows = []
     if manager_id:
         # 1) Try manager-specific skill bank (whatever categories they chose)
@@ -112,24 +200,70 @@ def extract_skills_from_text(prd_text: str, conn, department_id: int) -> List[Di
             (department_id,)
         )
         rows = cur.fetchall()
+    if required and not rows:
+        raise RuntimeError("No skills found for this manager/department.")
+    return rows
 
+def _plan_skill_extraction(prd_text: str, conn, department_id: int, manager_id: Optional[int],
+                           max_chars: int = 6000, rows: Optional[list] = None) -> Tuple[Optional[List[Dict]], str, Dict]:
+    """
+    Catalog lookup + local pre-pass shared by the blocking and streaming extractors.
+    Pass `rows` (from _load_skill_catalog) to reuse a catalog already loaded.
+    Returns (skills found locally or None, the LLM prompt, the token report).
+    """
+    if rows is None:
+        rows = _load_skill_catalog(conn, department_id, manager_id)
     dept_skills = {row["skillName"]: row["skillID"] for row in rows}
     if not dept_skills:
         raise RuntimeError("No skills found for this manager or department.")
 
-    prompt = _build_skill_extraction_prompt(prd_text, dept_skills)
-    raw = call_openai(prompt)
+    hits = []
+    if SKILL_MATCHER_ENABLED:
+        hits = get_skill_matcher([(row["skillID"], row["skillName"]) for row in rows]).scan(prd_text)
+        # one exact-case or multi-word mention; repeated lowercase everyday words don't add up
+        confident = [h for h in hits if h.best >= 1.0]
+        skip = len(confident) >= SKILL_MATCH_SKIP_LLM_MIN
+        with _MATCHER_TOTALS_LOCK:
+            _MATCHER_TOTALS["documents"] += 1
+            _MATCHER_TOTALS["llmSkipped"] += skip
+        if skip:
+            # no prompt is built, so nothing goes into the pruning totals
+            return [
+                {"skillID": h.skillID, "skillName": h.skillName,
+                 "reason": f'Named in the document: "{h.snippets[0]}"'}
+                for h in confident[:10]
+            ], "", {"catalogSize": len(dept_skills), "skillsSent": 0, "llmSkipped": True}
+
+    full_prompt = _build_skill_extraction_prompt(prd_text, dept_skills, max_chars)
+
+    # Large catalogs: only the skills most relevant to the text go into the prompt,
+    # always including the matcher's hits; the LLM can still pick non-literal ones
+    kept = prune_catalog(
+        prd_text[:max_chars],
+        [ai_pdf_app.SkillRow(sid, name, None) for name, sid in dept_skills.items()],
+        keep_ids=[h.skillID for h in hits],
+    )
+    dept_skills = {s.skillName: s.skillID for s in kept}
+
+    prompt = _build_skill_extraction_prompt(prd_text, dept_skills, max_chars)
+    saved = record_prune(full_prompt, prompt, len(rows), len(dept_skills))
+    return None, prompt, dict(saved, llmSkipped=False)
+
+def _skill_item(it: Dict) -> Dict:
+    return {
+        "skillID": int(it["skillID"]),
+        "skillName": str(it["skillName"]).strip(),
+        "reason": str(it.get("reason", "")).strip()
+    }
+
+def _parse_skill_reply(raw: str) -> List[Dict]:
     if raw.startswith("```"):
         raw = "\n".join([l for l in raw.splitlines() if not l.strip().startswith("```")])
     data = json.loads(raw)
 
     out = []
     for it in data.get("skills", []):
-        out.append({
-            "skillID": int(it["skillID"]),
-            "skillName": str(it["skillName"]).strip(),
-            "reason": str(it.get("reason", "")).strip()
-        })
+        out.append(_skill_item(it))
 
     seen = set()
     dedup = []
@@ -140,23 +274,262 @@ def extract_skills_from_text(prd_text: str, conn, department_id: int) -> List[Di
 
     return dedup[:10]
 
-def assess_skill_proficiency(resume_text: str, skill_name: str, context: str) -> int:
+# --------------------------------------------------------------
+# Long documents: map-reduce over chunks
+# --------------------------------------------------------------
+# Text longer than one prompt's worth is split on paragraph boundaries;
+# every chunk is extracted in parallel (under the LLM executor's caps) and
+# the union is ranked locally: chunks that picked the skill, then how
+# strongly the document names it, then first appearance.
+# Chunks grow past PRD_CHUNK_CHARS to stay within PRD_MAX_CHUNKS, but never
+# past PRD_CHUNK_MAX_CHARS; text beyond that many chunks is dropped (and
+# reported as chunksDropped / charsDropped).
+PRD_CHUNK_CHARS = int(os.getenv("PRD_CHUNK_CHARS", "6000"))
+PRD_CHUNK_MAX_CHARS = int(os.getenv("PRD_CHUNK_MAX_CHARS", "12000"))
+PRD_MAX_CHUNKS = int(os.getenv("PRD_MAX_CHUNKS", "12"))
+
+def _chunk_document(text: str, chunk_chars: int = PRD_CHUNK_CHARS) -> Tuple[List[str], List[str]]:
+    """(chunks to extract, chunks dropped): paragraph-aligned, none longer than PRD_CHUNK_MAX_CHARS."""
+    if len(text) <= chunk_chars:
+        return [text], []
+    cap = max(chunk_chars, PRD_CHUNK_MAX_CHARS)
+    size = min(cap, max(chunk_chars, -(-len(text) // PRD_MAX_CHUNKS)))
+    while True:
+        chunks = _pack_paragraphs(text, size)
+        if len(chunks) <= PRD_MAX_CHUNKS:
+            return chunks, []
+        if size >= cap:
+            return chunks[:PRD_MAX_CHUNKS], chunks[PRD_MAX_CHUNKS:]
+        size = min(cap, size + size // 8)
+
+def _pack_paragraphs(text: str, chunk_chars: int) -> List[str]:
+    pieces: List[str] = []
+    for para in text.split("\n\n"):
+        while len(para) > chunk_chars:
+            cut = para.rfind(" ", 0, chunk_chars)
+            cut = cut if cut > chunk_chars // 2 else chunk_chars
+            pieces.append(para[:cut])
+            para = para[cut:].lstrip()
+        if para.strip():
+            pieces.append(para)
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 2 + len(piece) > chunk_chars:
+            chunks.append(current)
+            current = piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _then(source: Future, fn) -> Future:
+    out: Future = Future()
+
+    def _done(f: Future) -> None:
+        try:
+            out.set_result(fn(f.result()))
+        except Exception as e:
+            out.set_exception(e)
+
+    source.add_done_callback(_done)
+    return out
+
+def _map_chunks(chunks: List[str], dropped: List[str], rows: list, conn, department_id: int,
+                manager_id: Optional[int]) -> Tuple[List[Future], Dict]:
+    """One future of parsed skills per chunk, plus the summed token report."""
+    futures: List[Future] = []
+    report: Dict = {"chunks": len(chunks), "llmCalls": 0,
+                    "chunksDropped": len(dropped), "charsDropped": sum(len(c) for c in dropped)}
+    for chunk in chunks:
+        local, prompt, saved = _plan_skill_extraction(chunk, conn, department_id, manager_id,
+                                                      max_chars=len(chunk), rows=rows)
+        for k, v in saved.items():
+            if k == "catalogSize":
+                report[k] = max(report.get(k, 0), v)
+            elif isinstance(v, int) and not isinstance(v, bool):
+                report[k] = report.get(k, 0) + v
+        if local is not None:
+            f: Future = Future()
+            f.set_result(local)
+            futures.append(f)
+        else:
+            report["llmCalls"] += 1
+            futures.append(_then(_submit_openai(prompt), _parse_skill_reply))
+    report["llmSkipped"] = report["llmCalls"] == 0
+    return futures, report
+
+def _reduce_chunks(results: List, prd_text: str, rows: list) -> List[Dict]:
+    ok = [r for r in results if not isinstance(r, Exception)]
+    if not ok:
+        raise results[0]
+    strength: Dict[int, float] = {}
+    if SKILL_MATCHER_ENABLED:
+        for h in get_skill_matcher([(row["skillID"], row["skillName"]) for row in rows]).scan(prd_text):
+            strength[h.skillID] = h.score
+    votes: Dict[int, int] = {}
+    first: Dict[int, Tuple[int, int]] = {}
+    items: Dict[int, Dict] = {}
+    for ci, skills in enumerate(ok):
+        for rank, sk in enumerate(skills):
+            sid = sk["skillID"]
+            votes[sid] = votes.get(sid, 0) + 1
+            if sid not in items:
+                items[sid], first[sid] = sk, (ci, rank)
+    order = sorted(items, key=lambda sid: (-votes[sid], -strength.get(sid, 0.0), first[sid]))
+    return [items[sid] for sid in order][:10]
+
+def extract_skills_from_text(prd_text: str, conn, department_id: int,
+                             report: Optional[Dict] = None, manager_id: Optional[int] = None) -> List[Dict]:
     """
-    Use AI to assess proficiency level (0-10) for a specific skill based on resume.
-    
-    Returns:
-        int: Proficiency level from 0-10
+    Extract skills from THIS manager's skill bank first.
+    If the manager has no ManagerSkills, fall back to all skills for the department.
+    Long documents are extracted chunk by chunk in parallel and merged.
+    Pass a dict as `report` to receive the prompt token savings for this call.
+    manager_id defaults to the logged-in manager (pass it outside a request, e.g. in jobs).
     """
-    prompt = f"""
-You are analyzing a resume to assess proficiency level for a specific skill.
+    if manager_id is None and has_request_context():
+        manager_id = session.get("manager_id")
 
-Skill to assess: {skill_name}
-Context from resume: {context}
+    chunks, dropped = _chunk_document(prd_text)
+    if len(chunks) > 1:
+        rows = _load_skill_catalog(conn, department_id, manager_id)
+        futures, saved = _map_chunks(chunks, dropped, rows, conn, department_id, manager_id)
+        if report is not None:
+            report.update(saved)
+        results = get_llm_executor().gather(futures)
+        return _reduce_chunks(results, prd_text, rows)
 
-Resume excerpt (first 3000 chars):
-\"\"\"{resume_text[:3000]}\"\"\"
+    local, prompt, saved = _plan_skill_extraction(prd_text, conn, department_id, manager_id)
+    if report is not None:
+        report.update(saved)
+    if local is not None:
+        return local
+
+    return _parse_skill_reply(_submit_openai(prompt).result())
 
-Assess the proficiency level on a 0-10 scale:
+class _JsonItemStream:
+    """
+    Incremental scanner for replies shaped like {"skills": [{...}, {...}]}:
+    feed() text chunks, get back each array item as soon as its closing brace
+    arrives. Anything outside the JSON (code fences) is ignored.
+    """
+
+    def __init__(self, item_depth: int = 2):
+        self.item_depth = item_depth
+        self.buf = []
+        self.depth = 0
+        self.in_string = self.escape = False
+        self.item: Optional[List[str]] = None
+
+    def feed(self, chunk: str) -> List[Dict]:
+        items = []
+        for ch in chunk:
+            if self.item is not None:
+                self.item.append(ch)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+            if ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                if ch == "{" and self.depth == self.item_depth:
+                    self.item = [ch]
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if ch == "}" and self.depth == self.item_depth and self.item is not None:
+                    try:
+                        items.append(json.loads("".join(self.item)))
+                    except ValueError:
+                        pass
+                    self.item = None
+        return items
+
+def stream_skills_from_text(prd_text: str, conn, department_id: int,
+                            manager_id: Optional[int] = None) -> Iterator[Tuple[str, Dict]]:
+    """
+    Streaming variant of extract_skills_from_text. Yields (event, payload):
+      ("catalog", token report)  catalog chosen / pruned, or skills found locally
+      ("model", {"cached"})      reply is coming from the cache or the model
+      ("chunk", {"done", "of"})  long documents: one per finished chunk
+      ("skill", skill)           one skill, as soon as it is parsed from the reply
+      ("done", {"skills"})       the final list (same as extract_skills_from_text)
+    """
+    if manager_id is None and has_request_context():
+        manager_id = session.get("manager_id")
+
+    chunks, dropped = _chunk_document(prd_text)
+    if len(chunks) > 1:
+        rows = _load_skill_catalog(conn, department_id, manager_id)
+        futures, saved = _map_chunks(chunks, dropped, rows, conn, department_id, manager_id)
+        yield "catalog", saved
+        yield "model", {"cached": False, "chunks": len(chunks)}
+        index = {f: i for i, f in enumerate(futures)}
+        for n, f in enumerate(as_completed(futures), 1):
+            yield "chunk", {"index": index[f], "done": n, "of": len(futures), "ok": f.exception() is None}
+        skills = _reduce_chunks(get_llm_executor().gather(futures), prd_text, rows)
+        for s in skills:
+            yield "skill", s
+        yield "done", {"skills": skills}
+        return
+
+    local, prompt, saved = _plan_skill_extraction(prd_text, conn, department_id, manager_id)
+    yield "catalog", saved
+    if local is not None:
+        for s in local:
+            yield "skill", s
+        yield "done", {"skills": local}
+        return
+
+    cache = get_llm_cache()
+    model = _openai_model()
+    key = cache.make_key("openai", model, OPENAI_TEMPERATURE, prompt)
+    cached = cache.get(key)
+    yield "model", {"cached": cached is not None}
+
+    parts: List[str] = []
+    source: Dict = {}
+
+    def _chunks() -> Iterator[str]:
+        if cached is not None:
+            yield cached
+            return
+        with get_llm_executor().slot("openai"):
+            reply = get_llm_gateway().stream_reply(prompt, temperature=OPENAI_TEMPERATURE)
+            for chunk in reply:
+                parts.append(chunk)
+                yield chunk
+            source["reply"] = (reply.provider, reply.model)
+
+    scanner = _JsonItemStream()
+    seen = set()
+    skills: List[Dict] = []
+    for chunk in _chunks():
+        for it in scanner.feed(chunk):
+            try:
+                s = _skill_item(it)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if s["skillID"] in seen or len(skills) >= 10:
+                continue
+            seen.add(s["skillID"])
+            skills.append(s)
+            yield "skill", s
+
+    raw = "".join(parts)
+    # only a reply from OPENAI_MODEL itself belongs under the OpenAI key (not a failover's)
+    if source.get("reply") == ("openai", model) and _is_json_reply(raw):
+        cache.put(key, "openai", model, raw)
+    yield "done", {"skills": skills}
+
+_PROFICIENCY_SCALE = """Assess the proficiency level on a 0-10 scale:
 - 0: No evidence
 - 1-2: Novice/Beginner (mentioned, learning, courses)
 - 3-4: Developing/Intermediate (some projects, 1-2 years experience)
@@ -169,7 +542,19 @@ Consider:
 - Complexity of projects using the skill
 - Leadership/mentoring in the skill
 - Certifications or formal training
-- Depth of description
+- Depth of description"""
+
+def _build_proficiency_prompt(resume_text: str, skill_name: str, context: str) -> str:
+    return f"""
+You are analyzing a resume to assess proficiency level for a specific skill.
+
+Skill to assess: {skill_name}
+Context from resume: {context}
+
+Resume excerpt (first 3000 chars):
+\"\"\"{resume_text[:3000]}\"\"\"
+
+{_PROFICIENCY_SCALE}
 
 Return ONLY a JSON object:
 {{
@@ -177,20 +562,543 @@ Return ONLY a JSON object:
   "reasoning": "<brief 1-sentence explanation>"
 }}
 """
+
+def _parse_proficiency_level(raw: str) -> int:
+    if raw.startswith("```"):
+        raw = "\n".join([l for l in raw.splitlines() if not l.strip().startswith("```")])
+    data = json.loads(raw)
+    level = int(data.get("level", 3))
+    # Clamp to 0-10 range
+    return max(0, min(10, level))
+
+def assess_skill_proficiency(resume_text: str, skill_name: str, context: str) -> int:
+    """
+    Use AI to assess proficiency level (0-10) for a specific skill based on resume.
     
+    Returns:
+        int: Proficiency level from 0-10
+    """
+    prompt = _build_proficiency_prompt(resume_text, skill_name, context)
     try:
-        raw = call_openai(prompt)
-        if raw.startswith("```"):
-            raw = "\n".join([l for l in raw.splitlines() if not l.strip().startswith("```")])
-        data = json.loads(raw)
-        level = int(data.get("level", 3))
-        # Clamp to 0-10 range
-        return max(0, min(10, level))
+        raw = _submit_openai(prompt).result()
+        return _parse_proficiency_level(raw)
     except Exception as e:
         print(f"Error assessing proficiency for {skill_name}: {e}")
         # Fallback to middle value
         return 5
 
+def assess_skill_proficiencies(resume_text: str, skills: List[Dict]) -> Dict[int, Dict]:
+    """
+    Assess every extracted skill in ONE call (one copy of the resume).
+
+    skills: [{"skillID", "skillName", "reason"}]
+    Returns {skillID: {"level": 0-10, "reasoning": str}}. Skills the batch
+    response misses (or all of them, if the call fails) fall back to
+    per-skill calls, fanned out in parallel through the LLM executor.
+    Replies are served from the LLM response cache when the prompt repeats.
+    """
+    if not skills:
+        return {}
+
+    skill_lines = "\n".join(
+        f"- ID={s['skillID']} | {s['skillName']} | context: {s.get('reason', '')}"
+        for s in skills
+    )
+    prompt = f"""
+You are analyzing a resume to assess proficiency levels for several skills.
+
+Skills to assess (ID | name | context from resume):
+{skill_lines}
+
+Resume excerpt (first 3000 chars):
+\"\"\"{resume_text[:3000]}\"\"\"
+
+{_PROFICIENCY_SCALE}
+
+Assess EVERY skill listed above. Return ONLY a JSON object:
+{{
+  "assessments": [
+    {{"skillID": <ID from the list>, "level": <integer 0-10>, "reasoning": "<brief 1-sentence explanation>"}}
+  ]
+}}
+"""
+
+    executor = get_llm_executor()
+    wanted = {int(s["skillID"]) for s in skills}
+    results: Dict[int, Dict] = {}
+    try:
+        raw = _submit_openai(prompt).result()
+        if raw.startswith("```"):
+            raw = "\n".join([l for l in raw.splitlines() if not l.strip().startswith("```")])
+        data = json.loads(raw)
+        for it in data.get("assessments", []):
+            try:
+                sid = int(it["skillID"])
+                level = int(it.get("level", 3))
+            except (KeyError, TypeError, ValueError):
+                continue
+            if sid in wanted and sid not in results:
+                results[sid] = {
+                    "level": max(0, min(10, level)),
+                    "reasoning": str(it.get("reasoning", "")).strip(),
+                }
+    except Exception as e:
+        print(f"Batched proficiency assessment failed, assessing one by one: {e}")
+
+    # Per-skill fallback for anything the batch didn't cover, all at once
+    missing = [s for s in skills if int(s["skillID"]) not in results]
+    futures = [
+        _submit_openai(_build_proficiency_prompt(resume_text, s["skillName"], s.get("reason", "")))
+        for s in missing
+    ]
+    for s, raw in zip(missing, executor.gather(futures)):
+        try:
+            if isinstance(raw, Exception):
+                raise raw
+            level = _parse_proficiency_level(raw)
+        except Exception as e:
+            print(f"Error assessing proficiency for {s['skillName']}: {e}")
+            level = 5  # Fallback to middle value
+        results[int(s["skillID"])] = {"level": level, "reasoning": ""}
+    return results
+
+# ==============================================================
+# ✅ Candidate scoring
+# ==============================================================
+# "matrix" = vectorized NumPy scoring (skill_matrix.py), fed from the shared OrgSnapshot
+# "sql"    = one aggregated statement over Employees/EmployeeSkills/ProjectAssignment
+# "loop"   = original per-employee queries, kept for comparison
+RECOMMENDATION_SCORER = os.getenv("RECOMMENDATION_SCORER", "matrix").strip().lower()
+
+def _score_candidates(conn, department_id: int, top_ids: List[int], id_to_name: Dict[int, str],
+                      db_path: Optional[str] = None) -> List[Dict]:
+    """Score all employees of a department with the configured scorer."""
+    if RECOMMENDATION_SCORER == "sql":
+        return _score_candidates_sql(conn, department_id, top_ids, id_to_name)
+    if RECOMMENDATION_SCORER == "matrix" and skill_matrix.numpy_available():
+        snapshot = get_org_snapshot(db_path or DB_PATH, conn)
+        matrix = skill_matrix.load_department_matrix_from_snapshot(snapshot, department_id, top_ids)
+        return skill_matrix.score_candidates(matrix, top_ids, id_to_name)
+    return _score_candidates_loop(conn, department_id, top_ids)
+
+def _score_candidates_sql(conn, department_id: int, top_ids: List[int], id_to_name: Dict[int, str]) -> List[Dict]:
+    """
+    Set-based scoring: base score, coverage and project count for every
+    employee come back from ONE statement parameterized by the required skill IDs.
+
+    Each required skill is pivoted into its own column (p0..pN, NULL when not
+    held) so the base score is summed in the same order as the loop and the
+    results match it exactly. Python only rounds and shapes the rows.
+    """
+    n = len(top_ids)
+    if n == 0:
+        return []
+
+    cols = range(n)
+    pivot = ",\n                   ".join(
+        f"MAX(CASE WHEN es.skillID = ? THEN COALESCE(es.profiencylevel, 0) END) AS p{j}" for j in cols
+    )
+    base_sum = " + ".join(f"COALESCE(sk.p{j}, 0) / 10.0" for j in cols)
+    matched = " + ".join(f"(sk.p{j} IS NOT NULL)" for j in cols)
+    matched_prof = " + ".join(f"COALESCE(sk.p{j}, 0)" for j in cols)
+    placeholders = ",".join("?" * n)
+
+    rows = conn.execute(f"""
+        SELECT e.empID, e.firstname, e.lastname, e.title, e.email,
+               {", ".join(f"sk.p{j}" for j in cols)},
+               ((0.0 + {base_sum}) / {n}) * 100.0 AS base_raw,
+               ({matched}) AS matched,
+               ({matched_prof}) AS matched_prof_sum,
+               COALESCE(pc.cnt, 0) AS active_projects
+        FROM Employees e
+        LEFT JOIN (
+            SELECT es.empID,
+                   {pivot}
+            FROM EmployeeSkills es
+            JOIN Skills s ON s.skillID = es.skillID
+            WHERE es.skillID IN ({placeholders})
+            GROUP BY es.empID
+        ) sk ON sk.empID = e.empID
+        LEFT JOIN (
+            SELECT pa.empID, COUNT(p.projectID) AS cnt
+            FROM ProjectAssignment pa
+            JOIN Projects p ON p.projectID = pa.projectID
+            GROUP BY pa.empID
+        ) pc ON pc.empID = e.empID
+        WHERE e.department = ?
+        ORDER BY e.empID
+    """, (*top_ids, *top_ids, department_id)).fetchall()
+
+    names = [id_to_name.get(sid, "") for sid in top_ids]
+    candidates = []
+    for r in rows:
+        active_projects = int(r["active_projects"])
+        multiplier = skill_matrix.WORKLOAD_MULTIPLIERS[min(active_projects, 3)]
+        base_score = round(r["base_raw"], 2)
+        matched_count = int(r["matched"])
+        avg_prof = r["matched_prof_sum"] / matched_count if matched_count else 0.0
+
+        candidates.append({
+            "id": r["empID"],
+            "name": f"{r['firstname']} {r['lastname']}",
+            "title": r["title"] or "N/A",
+            "email": r["email"],
+            "matchScore": round(base_score * multiplier, 1),
+            "baseMatchScore": base_score,
+            "loadPenaltyMultiplier": round(multiplier, 2),
+            "activeProjectCount": active_projects,
+            "atCapacity": active_projects >= 3,
+            "coveragePercent": round(matched_count / n * 100.0, 1),
+            "avgProficiency": round(avg_prof, 2),
+            "skillsMatched": [names[j] for j in cols if r[f"p{j}"] is not None],
+        })
+    return candidates
+
+def _score_candidates_loop(conn, department_id: int, top_ids: List[int]) -> List[Dict]:
+    """Per-employee scoring: two queries per employee (skills + project count)."""
+    employees = conn.execute("""
+        SELECT empID, firstname, lastname, title, email
+        FROM Employees
+        WHERE department = ?
+    """, (department_id,)).fetchall()
+
+    candidates = []
+    for emp in employees:
+        # All skills for this employee
+        emp_skill_rows = conn.execute("""
+            SELECT s.skillID, s.skillName, es.profiencylevel
+            FROM EmployeeSkills es
+            JOIN Skills s ON es.skillID = s.skillID
+            WHERE es.empID = ?
+        """, (emp["empID"],)).fetchall()
+
+        # 📌 How many projects are they currently on?
+        project_row = conn.execute("""
+            SELECT COUNT(p.projectID) AS cnt
+            FROM ProjectAssignment pa
+            JOIN Projects p ON p.projectID = pa.projectID
+            WHERE pa.empID = ?
+        """, (emp["empID"],)).fetchone()
+        active_projects = project_row["cnt"] if project_row else 0
+
+        # -----------------------------------------
+        # 🔢 Per-skill scoring against PRD skills
+        # -----------------------------------------
+        total_required = len(top_ids)  # all PRD-selected skills for this project
+
+        skill_score_sum = 0.0
+        matched_names: List[str] = []
+        matched_profs: List[float] = []
+
+        # For each required PRD skill, see if this employee has it
+        for req_id in top_ids:
+            match = next(
+                (s for s in emp_skill_rows if s["skillID"] == req_id),
+                None
+            )
+            if match:
+                prof = match["profiencylevel"] or 0
+                # proficiency 0–10 → normalize to 0–1 and add to total
+                skill_score_sum += (prof / 10.0)
+                matched_names.append(match["skillName"])
+                matched_profs.append(prof)
+            else:
+                # missing skill adds 0 for this required skill
+                skill_score_sum += 0.0
+
+        # Base score: average normalized proficiency across ALL required skills
+        # (missing skills count as 0)
+        if total_required > 0:
+            base_score = round((skill_score_sum / total_required) * 100.0, 2)
+        else:
+            base_score = 0.0
+
+        # Coverage = how many of the PRD skills they actually have
+        coverage = (
+            len(matched_names) / total_required
+            if total_required > 0 else 0.0
+        )
+
+        # Average proficiency across only the matched skills (0–10 scale)
+        avg_prof = (
+            sum(matched_profs) / len(matched_profs)
+            if matched_profs else 0.0
+        )
+
+        # 🧮 Workload penalty based on active projects (unchanged)
+        if active_projects <= 0:
+            multiplier = 1.0
+        elif active_projects == 1:
+            multiplier = 0.9
+        elif active_projects == 2:
+            multiplier = 0.75
+        else:
+            multiplier = 0.5
+
+        penalized_score = base_score * multiplier
+
+        candidates.append({
+            "id": emp["empID"],
+            "name": f"{emp['firstname']} {emp['lastname']}",
+            "title": emp["title"] or "N/A",
+            "email": emp["email"],
+            "matchScore": round(penalized_score, 1),       # what UI shows
+            "baseMatchScore": base_score,                  # raw skill fit (0–100)
+            "loadPenaltyMultiplier": round(multiplier, 2),
+            "activeProjectCount": int(active_projects),
+            "atCapacity": active_projects >= 3,
+            "coveragePercent": round(coverage * 100.0, 1), # % of PRD skills matched
+            "avgProficiency": round(avg_prof, 2),          # 0–10 across matched skills
+            "skillsMatched": matched_names,                # names of matched PRD skills
+        })
+    return candidates
+
+# ==============================================================
+# ✅ Recommendation cache (keyed by data version)
+# ==============================================================
+RECOMMENDATION_CACHE_SIZE = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "128"))
+
+class _RecommendationCache:
+    """
+    LRU of scored candidate lists keyed by
+    (db, department, scorer, required skill IDs, data version).
+
+    The version is bumped by every write that changes scoring inputs, so a
+    write simply makes old keys unreachable; entries from older versions are
+    dropped as soon as a newer version is stored. Cached lists are shared
+    between requests and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, List[Dict]]" = OrderedDict()
+        self._version = -1
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[List[Dict]]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value: List[Dict]) -> None:
+        if self.max_entries <= 0:
+            return
+        version = key[-1]
+        with self._lock:
+            if version < self._version:
+                return  # a newer write already landed; don't cache stale scores
+            if version > self._version:
+                self._entries.clear()
+                self._version = version
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._version = -1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits,
+                    "misses": self.misses, "version": self._version}
+
+_RECOMMENDATION_CACHE = _RecommendationCache(RECOMMENDATION_CACHE_SIZE)
+
+def recommendation_cache_stats() -> Dict:
+    return _RECOMMENDATION_CACHE.stats()
+
+# ==============================================================
+# ✅ Scoring entry point (shared by team and portfolio modes)
+# ==============================================================
+def _resolve_skill_ids(skills_needed: List[str], skill_rows: list) -> List[int]:
+    """Map skill names (exact, then case-insensitive) to catalog IDs, de-duplicated in order."""
+    skill_map = {r["skillName"]: r["skillID"] for r in skill_rows}
+    skill_map_lower = {r["skillName"].strip().lower(): r["skillID"] for r in skill_rows}
+
+    selected_ids: List[int] = []
+    for raw_name in skills_needed:
+        if not raw_name:
+            continue
+        name = str(raw_name).strip()
+        sid = skill_map.get(name)
+        if not sid:
+            sid = skill_map_lower.get(name.lower())
+        if sid and sid not in selected_ids:
+            selected_ids.append(sid)
+    return selected_ids
+
+def score_department_candidates(conn, department_id: int, top_ids: List[int], id_to_name: Dict[int, str],
+                                db_path: Optional[str] = None) -> List[Dict]:
+    """
+    Scored candidate list for a department, served from the versioned cache when possible.
+    db_path (default DB_PATH) must be the database conn is open on.
+    """
+    db_path = os.path.abspath(db_path or DB_PATH)
+    cache_key = (
+        db_path, department_id, RECOMMENDATION_SCORER,
+        tuple(top_ids), get_data_version(conn),
+    )
+    candidates = _RECOMMENDATION_CACHE.get(cache_key)
+    if candidates is None:
+        candidates = _score_candidates(conn, department_id, top_ids, id_to_name, db_path)
+        _RECOMMENDATION_CACHE.put(cache_key, candidates)
+    return candidates
+
+# ==============================================================
+# ✅ Team selection (partial top-k + priority mixing)
+# ==============================================================
+def _high_count_for_priority(priority_key: str, n: int) -> int:
+    if priority_key == "high":
+        return max(1, round(n * 0.75))
+    if priority_key == "medium":
+        return max(1, round(n * 0.5))
+    if priority_key == "low":
+        return min(2, n)
+    # Critical / unknown: all highly qualified
+    return n
+
+def _select_team(candidates: List[Dict], k: int, priority: str) -> List[Dict]:
+    """
+    Choose up to k candidates without sorting the whole list.
+
+    Same result as ranking everyone by matchScore (stable, so ties keep
+    department order) and then:
+      - Critical: take the best n people.
+      - High/Medium/Low: take the best high_count people, then fill the rest
+        from the BOTTOM of the ranking, skipping anyone at capacity.
+
+    Both picks are heap-based partial selections (O(n log k)) and the
+    "remaining" pool is built with an index set, so the whole stage is
+    linear in the number of candidates.
+    """
+    n = max(0, min(k, len(candidates)))
+    priority_key = (priority or "Critical").strip().lower()
+    high_count = n if priority_key == "critical" else _high_count_for_priority(priority_key, n)
+    low_count = max(0, n - high_count)
+
+    # heapq.nlargest with a key matches sorted(..., reverse=True)[:high_count],
+    # including the stable order of tied scores
+    high_idx = heapq.nlargest(
+        high_count, range(len(candidates)), key=lambda i: candidates[i]["matchScore"]
+    )
+    chosen = [candidates[i] for i in high_idx]
+    if low_count == 0:
+        return chosen
+
+    # Lower-qualified pool: everyone not already picked and not overloaded.
+    # Walking the ranking from the bottom means ascending score, and among
+    # equal scores the later department entry comes first.
+    taken = set(high_idx)
+    low_pool = [i for i in range(len(candidates)) if i not in taken and not candidates[i]["atCapacity"]]
+    low_idx = heapq.nsmallest(low_count, low_pool, key=lambda i: (candidates[i]["matchScore"], -i))
+    chosen.extend(candidates[i] for i in low_idx)
+    return chosen
+
+# ==============================================================
+# ✅ Coverage-maximizing team selection (lazy greedy)
+# ==============================================================
+def _required_skill_levels(conn, top_ids: List[int], db_path: Optional[str] = None) -> Dict[int, List[Optional[int]]]:
+    """
+    {empID: [level or None for each required skill]} for everyone holding at
+    least one required skill, read from the org snapshot.
+    """
+    snapshot = get_org_snapshot(db_path or DB_PATH, conn)
+    levels: Dict[int, List[Optional[int]]] = {}
+    for j, sid in enumerate(top_ids):
+        for emp_id, level in snapshot.postings(sid):
+            levels.setdefault(emp_id, [None] * len(top_ids))[j] = level
+    return levels
+
+def _select_team_for_coverage(
+    candidates: List[Dict],
+    k: int,
+    levels: Dict[int, List[Optional[int]]],
+    num_skills: int,
+) -> List[Dict]:
+    """
+    Pick the team that best covers the required skills TOGETHER.
+
+    Team value = sum over required skills of the best workload-adjusted
+    proficiency any member brings (level x loadPenaltyMultiplier). Adding a
+    person can only help, and helps less as the team grows (submodular), so
+    greedy is near-optimal and a person's last computed gain is an upper
+    bound on their current gain. Lazy evaluation uses that: pop the best
+    bound, recompute only that person, and accept them if they still beat the
+    next bound. Only holders of a required skill enter the heap.
+
+    Once no one adds coverage, remaining seats go to the best matchScores.
+    """
+    n = max(0, min(k, len(candidates)))
+    best = [0.0] * num_skills
+
+    def gain(i: int) -> float:
+        c = candidates[i]
+        mult = c["loadPenaltyMultiplier"]
+        return sum(
+            max(0.0, level * mult - best[j])
+            for j, level in enumerate(levels[c["id"]]) if level is not None
+        )
+
+    heap = [(-gain(i), i) for i, c in enumerate(candidates) if c["id"] in levels]
+    heapq.heapify(heap)
+
+    chosen: List[int] = []
+    while heap and len(chosen) < n:
+        _bound, i = heapq.heappop(heap)
+        g = gain(i)
+        if heap and g < -heap[0][0]:
+            heapq.heappush(heap, (-g, i))  # stale bound; someone else may be better now
+            continue
+        if g <= 0:
+            break
+        chosen.append(i)
+        mult = candidates[i]["loadPenaltyMultiplier"]
+        for j, level in enumerate(levels[candidates[i]["id"]]):
+            if level is not None:
+                best[j] = max(best[j], level * mult)
+
+    if len(chosen) < n:
+        taken = set(chosen)
+        chosen.extend(heapq.nlargest(
+            n - len(chosen),
+            (i for i in range(len(candidates)) if i not in taken),
+            key=lambda i: candidates[i]["matchScore"],
+        ))
+    return [candidates[i] for i in chosen]
+
+def _team_coverage(
+    team: List[Dict],
+    top_ids: List[int],
+    id_to_name: Dict[int, str],
+    levels: Dict[int, List[Optional[int]]],
+) -> Dict:
+    """Coverage of the required skills by the team as a whole."""
+    best: List[Optional[int]] = [None] * len(top_ids)
+    for member in team:
+        for j, level in enumerate(levels.get(member["id"], ())):
+            if level is not None and (best[j] is None or level > best[j]):
+                best[j] = level
+
+    covered = [id_to_name.get(sid, "") for j, sid in enumerate(top_ids) if best[j] is not None]
+    missing = [id_to_name.get(sid, "") for j, sid in enumerate(top_ids) if best[j] is None]
+    return {
+        "coveragePercent": round(len(covered) / len(top_ids) * 100.0, 1) if top_ids else 0.0,
+        "skillsCovered": covered,
+        "skillsMissing": missing,
+        # best level per required skill (0 if missing), averaged; 0–10
+        "avgBestProficiency": round(sum(b or 0 for b in best) / len(top_ids), 2) if top_ids else 0.0,
+    }
+
 # ==============================================================
 # ✅ Team Recommendation (department scoped)
 # ==============================================================
@@ -200,12 +1108,14 @@ def get_ai_team_recommendations(
     department_id: int,
     k: int = 5,
     priority: str = "Critical",
-    manager_notes: Optional[str] = None
+    manager_notes: Optional[str] = None,
+    selection_mode: str = "priority",
+    scope: str = "department",
 ) -> Dict:
     """
     Recommend employees from the same department that best match provided skills.
 
-    Priority behavior:
+    Priority behavior (selection_mode="priority"):
       - Critical: just take the best k people by matchScore.
       - High: ~75% highly qualified, ~25% lower-qualified.
       - Medium: ~50% highly qualified, ~50% lower-qualified.
@@ -213,54 +1123,26 @@ def get_ai_team_recommendations(
 
     For the "lower-qualified" pool, we EXCLUDE people whose score is low
     mainly because they're already overloaded (activeProjectCount >= 3).
+
+    selection_mode="coverage" ignores priority and picks the team that
+    jointly covers the most required skills at the highest proficiency.
+    Either way, "team_coverage" reports coverage for the team as a whole.
+
+    scope="org" searches every department (see org_search.py); candidates
+    then also carry departmentId / departmentName.
     """
     conn = sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
 
     try:
         # 1️⃣ Build the skill catalog from the MANAGER'S skill bank first
-        from flask import session
-        manager_id = session.get("manager_id")
+        skill_rows = _load_skill_catalog(conn, department_id, session.get("manager_id"), required=True)
 
-        if manager_id:
-            skill_rows = conn.execute("""
-                SELECT s.skillID, s.skillName
-                FROM Skills s
-                JOIN ManagerSkills ms ON ms.skillID = s.skillID
-                WHERE ms.managerID = ?
-                ORDER BY s.skillName
-            """, (manager_id,)).fetchall()
-        else:
-            skill_rows = []
-
-        # Fallback: if manager has no skill bank yet, use department skills
-        if not skill_rows:
-            skill_rows = conn.execute("""
-                SELECT skillID, skillName
-                FROM Skills
-                WHERE skillCategoryID = ?
-                ORDER BY skillName
-            """, (department_id,)).fetchall()
-
-        if not skill_rows:
-            raise RuntimeError("No skills found for this manager/department.")
-
-        # name -> id and id -> name maps
-        skill_map = {r["skillName"]: r["skillID"] for r in skill_rows}
-        skill_map_lower = {r["skillName"].strip().lower(): r["skillID"] for r in skill_rows}
+        # id -> name map
         id_to_name = {r["skillID"]: r["skillName"] for r in skill_rows}
 
         # 2️⃣ Map PRD-selected skills directly to IDs (no extra AI step)
-        selected_ids: List[int] = []
-        for raw_name in skills_needed:
-            if not raw_name:
-                continue
-            name = str(raw_name).strip()
-            sid = skill_map.get(name)
-            if not sid:
-                sid = skill_map_lower.get(name.lower())
-            if sid and sid not in selected_ids:
-                selected_ids.append(sid)
+        selected_ids = _resolve_skill_ids(skills_needed, skill_rows)
 
         # If we couldn't map any PRD skills to catalog skills, return no recs
         if not selected_ids:
@@ -281,107 +1163,16 @@ def get_ai_team_recommendations(
         ]
         top_ids = core_ids  # used for scoring below
 
-        # 3️⃣ Get employees from this department
-        employees = conn.execute("""
-            SELECT empID, firstname, lastname, title, email
-            FROM Employees
-            WHERE department = ?
-        """, (department_id,)).fetchall()
-
-        candidates = []
-        for emp in employees:
-            # All skills for this employee
-            emp_skill_rows = conn.execute("""
-                SELECT s.skillID, s.skillName, es.profiencylevel
-                FROM EmployeeSkills es
-                JOIN Skills s ON es.skillID = s.skillID
-                WHERE es.empID = ?
-            """, (emp["empID"],)).fetchall()
-
-            # 📌 How many projects are they currently on?
-            project_row = conn.execute("""
-                SELECT COUNT(p.projectID) AS cnt
-                FROM ProjectAssignment pa
-                JOIN Projects p ON p.projectID = pa.projectID
-                WHERE pa.empID = ?
-            """, (emp["empID"],)).fetchone()
-            active_projects = project_row["cnt"] if project_row else 0
-
-            # -----------------------------------------
-            # 🔢 Per-skill scoring against PRD skills
-            # -----------------------------------------
-            total_required = len(top_ids)  # all PRD-selected skills for this project
-
-            skill_score_sum = 0.0
-            matched_names: List[str] = []
-            matched_profs: List[float] = []
-
-            # For each required PRD skill, see if this employee has it
-            for req_id in top_ids:
-                match = next(
-                    (s for s in emp_skill_rows if s["skillID"] == req_id),
-                    None
-                )
-                if match:
-                    prof = match["profiencylevel"] or 0
-                    # proficiency 0–10 → normalize to 0–1 and add to total
-                    skill_score_sum += (prof / 10.0)
-                    matched_names.append(match["skillName"])
-                    matched_profs.append(prof)
-                else:
-                    # missing skill adds 0 for this required skill
-                    skill_score_sum += 0.0
-
-            # Base score: average normalized proficiency across ALL required skills
-            # (missing skills count as 0)
-            if total_required > 0:
-                base_score = round((skill_score_sum / total_required) * 100.0, 2)
-            else:
-                base_score = 0.0
-
-            # Coverage = how many of the PRD skills they actually have
-            coverage = (
-                len(matched_names) / total_required
-                if total_required > 0 else 0.0
-            )
-
-            # Average proficiency across only the matched skills (0–10 scale)
-            avg_prof = (
-                sum(matched_profs) / len(matched_profs)
-                if matched_profs else 0.0
-            )
+        # 3️⃣ Score every employee in this department. Re-clicks with the same
+        #    skills (any team size / priority) reuse the scored list until a
+        #    write bumps the data version. Org scope shards this per department.
+        if (scope or "department").strip().lower() == "org":
+            import org_search  # imports this module; load lazily
+            candidates = org_search.search_org_candidates(conn, top_ids, id_to_name, k, selection_mode)
+        else:
+            candidates = score_department_candidates(conn, department_id, top_ids, id_to_name)
 
-            # 🧮 Workload penalty based on active projects (unchanged)
-            if active_projects <= 0:
-                multiplier = 1.0
-            elif active_projects == 1:
-                multiplier = 0.9
-            elif active_projects == 2:
-                multiplier = 0.75
-            else:
-                multiplier = 0.5
-
-            penalized_score = base_score * multiplier
-
-            candidates.append({
-                "id": emp["empID"],
-                "name": f"{emp['firstname']} {emp['lastname']}",
-                "title": emp["title"] or "N/A",
-                "email": emp["email"],
-                "matchScore": round(penalized_score, 1),       # what UI shows
-                "baseMatchScore": base_score,                  # raw skill fit (0–100)
-                "loadPenaltyMultiplier": round(multiplier, 2),
-                "activeProjectCount": int(active_projects),
-                "atCapacity": active_projects >= 3,
-                "coveragePercent": round(coverage * 100.0, 1), # % of PRD skills matched
-                "avgProficiency": round(avg_prof, 2),          # 0–10 across matched skills
-                "skillsMatched": matched_names,                # names of matched PRD skills
-            })
-
-        # 4️⃣ Rank candidates by penalized score
-        candidates_sorted = sorted(candidates, key=lambda x: x["matchScore"], reverse=True)
-
-        if not candidates_sorted:
+        if not candidates:
             return {
                 "top5_skills": top5,
                 "recommended_team": [],
@@ -389,59 +1180,19 @@ def get_ai_team_recommendations(
                 "ai_provider": "openai",
             }
 
-        n = min(k, len(candidates_sorted))
-        priority_key = (priority or "Critical").strip().lower()
-
-        # 🧠 Priority mixing logic (unchanged)
-        if priority_key == "critical":
-            # Just take the best n people
-            chosen = candidates_sorted[:n]
+        # 4️⃣ Pick the team (partial top-k + priority mixing, or joint coverage)
+        levels = _required_skill_levels(conn, top_ids)
+        if (selection_mode or "priority").strip().lower() == "coverage":
+            chosen = _select_team_for_coverage(candidates, k, levels, len(top_ids))
         else:
-            if priority_key == "high":
-                high_count = max(1, round(n * 0.75))
-            elif priority_key == "medium":
-                high_count = max(1, round(n * 0.5))
-            elif priority_key == "low":
-                high_count = min(2, n)
-            else:
-                # Fallback: behave like critical
-                high_count = n
-
-            low_count = max(0, n - high_count)
-
-            # Top = high matches (can include overloaded folks)
-            high_selected = candidates_sorted[:high_count]
-
-            # Remaining pool, excluding the ones we already picked
-            remaining = [c for c in candidates_sorted if c not in high_selected]
-
-            # Build the "low-qualified" pool EXCLUDING overloaded people
-            low_pool = [
-                c for c in reversed(remaining)
-                if not c["atCapacity"]
-            ]
-
-            low_selected = low_pool[:low_count]
-
-            # If we still don't have enough, backfill with any remaining non-overloaded folks.
-            if len(low_selected) < low_count:
-                needed = low_count - len(low_selected)
-                backup = [
-                    c for c in reversed(remaining)
-                    if c not in low_selected and not c["atCapacity"]
-                ][:needed]
-                low_selected.extend(backup)
-
-            chosen = high_selected + low_selected
+            chosen = _select_team(candidates, k, priority)
 
         return {
             "top5_skills": top5,
             "recommended_team": chosen,
+            "team_coverage": _team_coverage(chosen, top_ids, id_to_name, levels),
             "department_id": department_id,
             "ai_provider": "openai",
         }
     finally:
         conn.close()
-
-
-
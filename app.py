@@ -1,15 +1,36 @@
-from flask import Flask, request, jsonify, g, send_from_directory, session
+from flask import Flask, Response, request, jsonify, g, send_from_directory, session, stream_with_context
 from schema import init_db, get_db, insert_dummy_data
-from pypdf import PdfReader
-from ai_helper import extract_skills_from_text, get_ai_team_recommendations
+from ai_helper import (
+    bump_data_version,
+    catalog_prune_stats,
+    extract_pdf_text,
+    extract_skills_from_text,
+    get_ai_team_recommendations,
+    pdf_text_cache_stats,
+    stream_skills_from_text,
+    recommendation_cache_stats,
+    skill_matcher_stats,
+    refresh_employee_postings,
+    remove_employee_postings,
+    remove_skill_postings,
+)
+from portfolio import allocate_portfolio
+from resume_jobs import get_resume_jobs
+from llm_cache import get_llm_cache
+from llm_executor import get_llm_executor
+from llm_gateway import get_llm_gateway
+from llm_singleflight import get_llm_singleflight
 import sqlite3
 import os
 import csv
+import json
 from io import TextIOWrapper
 
 app = Flask(__name__)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATABASE = os.path.join(BASE_DIR, "employees.db")
+# PRDs are read in full (long ones are extracted chunk by chunk) up to this many pages
+PRD_MAX_PAGES = int(os.getenv("PRD_MAX_PAGES", "100"))
 
 # ðŸŸ¢ Secret key for Flask sessions
 app.secret_key = "super_secret_demo_key"
@@ -223,6 +244,7 @@ def update_employee(emp_id):
         data.get("firstname", ""), data.get("lastname", ""), data.get("title", ""),
         new_dept, data.get("email", ""), data.get("phone", ""), data.get("photo", ""), emp_id
     ))
+    bump_data_version(db, "employees")
     db.commit()
 
     # ✅ If manager moved employee to another department, tell frontend to redirect
@@ -249,6 +271,7 @@ def add_employee():
         data.get("firstname", ""), data.get("lastname", ""), data.get("title", ""),
         data.get("department", None), data.get("email", ""), data.get("phone", ""), data.get("photo", "")
     ))
+    bump_data_version(db, "employees")
     db.commit()
     return jsonify({"message": "Employee added successfully.", "id": cursor.lastrowid}), 201
 
@@ -271,6 +294,7 @@ def import_csv():
             row.get("department", None), row.get("email", ""), row.get("phone", ""), row.get("photo", "")
         ))
         count += 1
+    bump_data_version(db, "employees")
     db.commit()
     return jsonify({"message": f"Imported {count} employees."}), 201
 
@@ -302,13 +326,15 @@ def update_employee_skills(emp_id):
             INSERT INTO EmployeeSkills (empID, skillID, profiencylevel, evidence)
             VALUES (?, ?, ?, ?)
         """, (emp_id, s.get("skillID"), s.get("profiencylevel", 1), s.get("evidence", "")))
+    bump_data_version(db, "skills")
     db.commit()
+    refresh_employee_postings(db, emp_id)
     return jsonify({"message": "Employee skills updated successfully."})
 
 
 @app.route("/employees/<int:emp_id>/upload-resume", methods=["POST"])
 def upload_employee_resume(emp_id):
-    """Upload resume and extract skills using AI with proficiency assessment."""
+    """Queue a resume for AI skill extraction; poll /api/resume-jobs/<jobID> for the result."""
     try:
         if "manager_id" not in session:
             return jsonify({"success": False, "error": "Not logged in"}), 401
@@ -320,63 +346,18 @@ def upload_employee_resume(emp_id):
         if not file.filename.lower().endswith(".pdf"):
             return jsonify({"success": False, "error": "Only PDF files are supported"}), 400
 
-        # Extract text from PDF
-        from pypdf import PdfReader
-        reader = PdfReader(file.stream)
-        text_parts = []
-        for i, page in enumerate(reader.pages[:10]):  # Max 10 pages
-            try:
-                text_parts.append(page.extract_text() or "")
-            except Exception:
-                pass
-        
-        resume_text = "\n\n".join(text_parts).strip()
-        if not resume_text:
-            return jsonify({"success": False, "error": "Could not extract text from PDF"}), 400
-
-        # Get department-specific skills for this employee
         db = get_db()
-        emp = db.execute("SELECT department FROM Employees WHERE empID = ?", (emp_id,)).fetchone()
+        emp = db.execute("SELECT empID FROM Employees WHERE empID = ?", (emp_id,)).fetchone()
         if not emp:
             return jsonify({"success": False, "error": "Employee not found"}), 404
 
-        dept_id = emp["department"]
-        
-        # Use existing AI helper to extract skills
-        from ai_helper import extract_skills_from_text, assess_skill_proficiency
-        extracted_skills = extract_skills_from_text(resume_text, db, dept_id)
-
-        # Get additional skill details with AI-assessed proficiency
-        skills_with_details = []
-        for skill in extracted_skills:
-            skill_row = db.execute("""
-                SELECT s.skillID, s.skillName, sc.skillCategoryname
-                FROM Skills s
-                LEFT JOIN SkillCategories sc ON s.skillCategoryID = sc.skillCategoryID
-                WHERE s.skillID = ?
-            """, (skill["skillID"],)).fetchone()
-            
-            if skill_row:
-                # 🟢 NEW: Use AI to assess proficiency level (0-10 scale)
-                proficiency_level = assess_skill_proficiency(
-                    resume_text, 
-                    skill_row["skillName"],
-                    skill.get("reason", "")
-                )
-                
-                skills_with_details.append({
-                    "skillID": skill_row["skillID"],
-                    "skillName": skill_row["skillName"],
-                    "categoryName": skill_row["skillCategoryname"],
-                    "level": proficiency_level,  # AI-assessed level
-                    "evidence": skill.get("reason", "Extracted from resume")
-                })
-
+        job_id = get_resume_jobs(DATABASE).submit(emp_id, session["manager_id"], file.read())
         return jsonify({
             "success": True,
-            "skills": skills_with_details,
-            "message": f"Extracted {len(skills_with_details)} skills from resume with AI-assessed proficiency levels"
-        })
+            "jobID": job_id,
+            "statusUrl": f"/api/resume-jobs/{job_id}",
+            "message": "Resume queued for processing"
+        }), 202
 
     except Exception as e:
         print(f"Resume upload error: {str(e)}")
@@ -384,6 +365,32 @@ def upload_employee_resume(emp_id):
         traceback.print_exc()
         return jsonify({"success": False, "error": str(e)}), 500
 
+
+@app.route("/api/resume-jobs/<job_id>", methods=["GET"])
+def resume_job_status(job_id):
+    """Progress of a resume job; `skills` is filled in once it has succeeded."""
+    if "manager_id" not in session:
+        return jsonify({"success": False, "error": "Not logged in"}), 401
+
+    job = get_resume_jobs(DATABASE).get(job_id)
+    if not job or job["managerID"] != session["manager_id"]:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+
+    body = {
+        "success": True,
+        "jobID": job["jobID"],
+        "empID": job["empID"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "progress": job["progress"],
+    }
+    if job["status"] == "succeeded":
+        body["skills"] = job["skills"]
+        body["message"] = f"Extracted {len(job['skills'])} skills from resume with AI-assessed proficiency levels"
+    elif job["status"] == "failed":
+        body["error"] = job["error"]
+    return jsonify(body)
+
 # ============================================================
 # ðŸŸ¢ AI: Extract Skills (Department Scoped)
 # ============================================================
@@ -400,25 +407,85 @@ def extract_skills_api():
         if not file.filename.lower().endswith(".pdf"):
             return jsonify({"success": False, "error": "Only PDF supported"}), 400
 
-        reader = PdfReader(file.stream)
-        pages = min(len(reader.pages), 8)
-        text = []
-        for i in range(pages):
-            try:
-                text.append(reader.pages[i].extract_text() or "")
-            except Exception:
-                pass
-        prd_text = "\n\n".join(text).strip()
+        pdf = extract_pdf_text(file.read(), PRD_MAX_PAGES)
+        prd_text = pdf.text
         if not prd_text:
             return jsonify({"success": False, "error": "Could not extract text"}), 400
 
         conn = get_db()
         dept_id = session["department_id"]
-        skills = extract_skills_from_text(prd_text, conn, dept_id)
-        return jsonify({"success": True, "skills": skills, "department_id": dept_id})
+        prompt_report = {}
+        skills = extract_skills_from_text(prd_text, conn, dept_id, report=prompt_report)
+        return jsonify({"success": True, "skills": skills, "department_id": dept_id,
+                        "promptReport": prompt_report, "skippedPages": pdf.skipped_pages})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route("/api/projects/extract-skills/stream", methods=["POST"])
+def extract_skills_stream_api():
+    """
+    Same as /api/projects/extract-skills, but answers with server-sent events:
+    pdf (parsed), catalog (prompt report), model, chunk (long PRDs), skill (one per skill),
+    done | error.
+    """
+    if "manager_id" not in session or "department_id" not in session:
+        return jsonify({"success": False, "error": "Not logged in"}), 403
+
+    if "prd" not in request.files:
+        return jsonify({"success": False, "error": "No file uploaded"}), 400
+
+    file = request.files["prd"]
+    if not file.filename.lower().endswith(".pdf"):
+        return jsonify({"success": False, "error": "Only PDF supported"}), 400
+
+    pdf_bytes = file.read()
+    manager_id = session["manager_id"]
+    dept_id = session["department_id"]
+
+    def events():
+        try:
+            pdf = extract_pdf_text(pdf_bytes, PRD_MAX_PAGES)
+            prd_text = pdf.text
+            if not prd_text:
+                yield _sse("error", {"error": "Could not extract text"})
+                return
+            yield _sse("pdf", {"pages": pdf.pages, "chars": len(prd_text), "cached": pdf.cached,
+                               "skippedPages": pdf.skipped_pages})
+
+            for event, payload in stream_skills_from_text(prd_text, get_db(), dept_id, manager_id=manager_id):
+                if event == "done":
+                    payload = dict(payload, department_id=dept_id)
+                yield _sse(event, payload)
+        except Exception as e:
+            yield _sse("error", {"error": str(e)})
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ============================================================
+# 🟢 AI: Runtime Stats (LLM concurrency, caches)
+# ============================================================
+@app.route("/api/ai/stats", methods=["GET"])
+def ai_stats():
+    if "manager_id" not in session:
+        return jsonify({"success": False, "error": "Not logged in"}), 401
+    return jsonify({
+        "success": True,
+        "llmExecutor": get_llm_executor().stats(),
+        "llmCache": get_llm_cache().stats(),
+        "llmGateway": get_llm_gateway().stats(),
+        "llmSingleFlight": get_llm_singleflight().stats(),
+        "recommendationCache": recommendation_cache_stats(),
+        "catalogPruning": catalog_prune_stats(),
+        "skillMatcher": skill_matcher_stats(),
+        "pdfTextCache": pdf_text_cache_stats(),
+    })
+
 # ============================================================
 # ðŸŸ¢ AI: Generate Team (Department Scoped)
 # ============================================================
@@ -433,6 +500,8 @@ def generate_team_recommendations():
         team_size = int(data.get("teamSize", 4))
         priority = data.get("priority", "Critical")
         manager_notes = data.get("managerNotes", "")  # 🔹 NEW: notes from frontend
+        selection_mode = data.get("selectionMode", "priority")  # "priority" | "coverage"
+        search_scope = data.get("searchScope", "department")  # "department" | "org"
         department_id = session["department_id"]
 
         if not skills_needed:
@@ -444,17 +513,43 @@ def generate_team_recommendations():
             team_size,
             priority,
             manager_notes,
+            selection_mode,
+            search_scope,
         )
         return jsonify({
             "success": True,
             "department_id": department_id,
             "top5_skills": result["top5_skills"],
             "recommendations": result["recommended_team"],
+            "teamCoverage": result.get("team_coverage"),
             "ai_provider": result.get("ai_provider", "openai")
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+# ============================================================
+# ðŸŸ¢ AI: Portfolio Allocation (several projects at once)
+# ============================================================
+@app.route("/api/projects/generate-portfolio", methods=["POST"])
+def generate_portfolio():
+    """
+    Staff several projects jointly.
+    Body: {"projects": [{"name", "skills": [...], "teamSize", "priority"}, ...]}
+    """
+    try:
+        if "manager_id" not in session or "department_id" not in session:
+            return jsonify({"error": "Not logged in"}), 403
+
+        data = request.get_json(silent=True) or {}
+        projects = data.get("projects", [])
+        if not projects:
+            return jsonify({"error": "No projects provided"}), 400
+
+        result = allocate_portfolio(projects, session["department_id"], session["manager_id"])
+        return jsonify({"success": True, **result})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # ============================================================
 # Create Project
 # ============================================================
@@ -526,6 +621,7 @@ def create_project():
                 VALUES (?, ?, ?)
             """, (project_id, emp_id, role))
         
+        bump_data_version(db, "projects")
         db.commit()
         
         return jsonify({
@@ -659,6 +755,7 @@ def add_project_member(project_id):
             VALUES (?, ?, ?)
         """, (project_id, emp_id, role))
 
+        bump_data_version(db, "projects")
         db.commit()
         return jsonify({"success": True, "message": "Member added successfully"})
     except sqlite3.IntegrityError:
@@ -692,6 +789,7 @@ def delete_project_member(project_id, emp_id):
         DELETE FROM ProjectAssignment
         WHERE projectID = ? AND empID = ?
     """, (project_id, emp_id))
+    bump_data_version(db, "projects")
     db.commit()
     return jsonify({"success": True, "message": "Member removed successfully"})
 
@@ -755,6 +853,7 @@ def delete_project_member_by_value(project_id, value):
         DELETE FROM ProjectAssignment
         WHERE projectID = ? AND empID = ?
     """, (project_id, emp_id))
+    bump_data_version(db, "projects")
     db.commit()
 
     return jsonify({"success": True, "message": "Member removed"})
@@ -778,6 +877,7 @@ def update_project(project_id):
         project_id
     ))
 
+    bump_data_version(db, "projects")
     db.commit()
 
     return jsonify({"success": True, "message": "Project updated"})
@@ -788,6 +888,7 @@ def update_project(project_id):
 def delete_project(project_id):
     db = get_db()
     db.execute("DELETE FROM Projects WHERE projectID = ?", (project_id,))
+    bump_data_version(db, "projects")
     db.commit()
     return jsonify({"success": True, "message": "Project deleted"})
 
@@ -802,7 +903,9 @@ def delete_employee(emp_id):
     if not emp:
         return jsonify({"error": "Employee not found"}), 404
     db.execute("DELETE FROM Employees WHERE empID = ?", (emp_id,))
+    bump_data_version(db, "employees", "skills", "projects")
     db.commit()
+    remove_employee_postings(db, emp_id)
     return jsonify({"message": "Employee deleted successfully"}), 200
 
 
@@ -968,6 +1071,7 @@ def add_manager_skill(managerID):
         INSERT INTO ManagerSkills (managerID, skillID) VALUES (?, ?)
     """, (managerID, skill_id))
 
+    bump_data_version(db, "skills")
     db.commit()
     return jsonify({"message": "Skill added", "skillID": skill_id})
 
@@ -1002,6 +1106,7 @@ def update_manager_skill(managerID, skillID):
         WHERE skillID = ?
     """, (new_name, new_category, skillID))
 
+    bump_data_version(db, "skills")
     db.commit()
     return jsonify({"message": "Skill updated"})
 
@@ -1025,7 +1130,9 @@ def delete_manager_skill(managerID, skillID):
     # Remove the skill itself
     cur.execute("DELETE FROM Skills WHERE skillID = ?", (skillID,))
 
+    bump_data_version(db, "skills")
     db.commit()
+    remove_skill_postings(db, skillID)
 
     return jsonify({"success": True, "message": "Skill deleted"})
 
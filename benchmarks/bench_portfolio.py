@@ -0,0 +1,84 @@
+# bench_portfolio.py
+"""
+Benchmark for the portfolio allocation solver (portfolio.solve_assignment).
+
+Builds synthetic portfolios (projects x department candidates), times the
+min-cost-flow solve against portfolio size, and compares the result with
+staffing the projects one at a time in priority order (today's behavior).
+
+Run from the repo root:
+    python benchmarks/bench_portfolio.py
+    python benchmarks/bench_portfolio.py --projects 10 50 100 200 --employees 3000
+"""
+import argparse
+import heapq
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from portfolio import CANDIDATES_PER_PROJECT, PRIORITY_WEIGHTS, solve_assignment  # noqa: E402
+
+
+def synthetic_portfolio(n_projects: int, n_employees: int, cap_limit: int, seed: int = 11):
+    rnd = random.Random(seed)
+    priorities = list(PRIORITY_WEIGHTS)
+    team_sizes = [rnd.randint(3, 6) for _ in range(n_projects)]
+    weights: List[Dict[int, float]] = []
+    for _ in range(n_projects):
+        w = PRIORITY_WEIGHTS[rnd.choice(priorities)]
+        # Popular people show up on many projects: skew toward low empIDs
+        pool = {min(n_employees, int(rnd.paretovariate(1.2))) + rnd.randint(0, n_employees // 4)
+                for _ in range(CANDIDATES_PER_PROJECT * 2)}
+        scores = {e: round(rnd.uniform(5, 100), 2) for e in pool}
+        top = heapq.nlargest(CANDIDATES_PER_PROJECT, scores.items(), key=lambda kv: kv[1])
+        weights.append({e: w * s for e, s in top})
+    capacity = {e: cap_limit - rnd.choice([0, 0, 1, 2, 3]) for e in range(n_employees + 1)}
+    return team_sizes, weights, capacity
+
+
+def greedy_one_at_a_time(team_sizes, weights, capacity):
+    """Staff projects sequentially, highest priority first, best available people."""
+    left = dict(capacity)
+    order = sorted(range(len(team_sizes)), key=lambda p: -max(weights[p].values(), default=0))
+    total, filled = 0.0, 0
+    for p in order:
+        avail = [(w, e) for e, w in weights[p].items() if left.get(e, 0) > 0]
+        for w, e in heapq.nlargest(team_sizes[p], avail):
+            left[e] -= 1
+            total += w
+            filled += 1
+    return filled, total
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--projects", type=int, nargs="+", default=[5, 10, 25, 50, 100])
+    ap.add_argument("--employees", type=int, default=2000)
+    ap.add_argument("--cap", type=int, default=3, help="MAX_ACTIVE_ASSIGNMENTS")
+    args = ap.parse_args()
+
+    print(f"{'projects':>8} {'seats':>6} {'solve ms':>9} {'filled':>7} {'weighted fit':>13} "
+          f"{'greedy filled':>14} {'greedy fit':>11}")
+    for n in args.projects:
+        sizes, weights, capacity = synthetic_portfolio(n, args.employees, args.cap)
+        t0 = time.perf_counter()
+        teams, total = solve_assignment(sizes, weights, capacity)
+        ms = (time.perf_counter() - t0) * 1000
+        for p, team in enumerate(teams):
+            assert len(team) <= sizes[p]
+        used: Dict[int, int] = {}
+        for team in teams:
+            for e in team:
+                used[e] = used.get(e, 0) + 1
+        assert all(used[e] <= capacity[e] for e in used), "capacity violated"
+        g_filled, g_total = greedy_one_at_a_time(sizes, weights, capacity)
+        print(f"{n:>8} {sum(sizes):>6} {ms:>9.1f} {sum(map(len, teams)):>7} {total:>13.1f} "
+              f"{g_filled:>14} {g_total:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+# bench_recommendations.py
+"""
+Scale benchmark for the recommendation paths:
+
+  - ai_helper.get_ai_team_recommendations  (web app, one department)
+  - ai_pdf_app.score_employees_for_skills  (CLI, whole org)
+  - ai_pdf_app.suggest_team                (CLI, whole org)
+
+For each scale it builds a synthetic employees.db (same schema as the web
+app), then times every path with LLM calls stubbed out:
+
+  cold  = first call after all in-process caches are dropped
+  warm  = p50 / p95 over --repeat calls with a fresh random skill set each time
+  peak  = tracemalloc peak over one cold + one warm call
+
+Results go to a JSON file. Pass --compare with an older file to diff p95s.
+
+Run from the repo root:
+    python benchmarks/bench_recommendations.py
+    python benchmarks/bench_recommendations.py --scales 1k 10k 100k --out bench.json
+    python benchmarks/bench_recommendations.py --scales 10k --compare bench.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, session  # noqa: E402
+
+import ai_helper  # noqa: E402
+from llm_gateway import LLMReply  # noqa: E402
+import schema  # noqa: E402
+
+ai_pdf_app = ai_helper.ai_pdf_app
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+STATUSES = ["Not Started", "In Progress", "Completed"]
+
+
+# ==============================================================
+# Synthetic org
+# ==============================================================
+def build_synthetic_db(
+    path: str,
+    employees: int,
+    departments: int = 10,
+    skills_per_department: int = 40,
+    skills_per_employee: int = 8,
+    projects: int = 0,
+    assignments_per_employee: float = 1.5,
+    seed: int = 13,
+) -> None:
+    """Creates `path` with the web app's schema and a random org of the given size."""
+    rnd = random.Random(seed)
+    projects = projects or max(10, employees // 20)
+
+    if os.path.exists(path):
+        os.remove(path)
+    schema.DATABASE = path
+    with Flask("bench").app_context():
+        schema.init_db()
+        schema.get_db().close()
+
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+
+    conn.executemany("INSERT INTO Departments(depID, departmentname) VALUES (?, ?)",
+                     [(d, f"Department {d}") for d in range(1, departments + 1)])
+    conn.executemany("INSERT INTO SkillCategories(skillCategoryID, skillCategoryname) VALUES (?, ?)",
+                     [(d, f"Category {d}") for d in range(1, departments + 1)])
+    conn.executemany("INSERT INTO Managers(managerID, firstname, lastname, department, email, password) VALUES (?, ?, ?, ?, ?, ?)",
+                     [(d, "Manager", str(d), d, f"mgr{d}@bench.local", "x") for d in range(1, departments + 1)])
+    conn.executemany("INSERT INTO Teams(teamID, teamName, managerID, department) VALUES (?, ?, ?, ?)",
+                     [(d, f"Team {d}", d, d) for d in range(1, departments + 1)])
+
+    skills_by_dept: Dict[int, List[int]] = {}
+    skill_rows = []
+    for d in range(1, departments + 1):
+        for j in range(skills_per_department):
+            sid = len(skill_rows) + 1
+            skill_rows.append((sid, f"Skill {d}-{j}", d))
+            skills_by_dept.setdefault(d, []).append(sid)
+    conn.executemany("INSERT INTO Skills(skillID, skillName, skillCategoryID) VALUES (?, ?, ?)", skill_rows)
+    all_skills = [r[0] for r in skill_rows]
+
+    def emp_rows():
+        for e in range(1, employees + 1):
+            d = rnd.randint(1, departments)
+            yield (e, d, "Emp", str(e), "Engineer", f"e{e}@bench.local", d)
+    conn.executemany("INSERT INTO Employees(empID, teamID, firstname, lastname, title, email, department) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     emp_rows())
+
+    dept_of = dict(conn.execute("SELECT empID, department FROM Employees"))
+
+    def emp_skill_rows():
+        for e in range(1, employees + 1):
+            own = skills_by_dept[dept_of[e]]
+            picked = set()
+            for _ in range(skills_per_employee):
+                # mostly the department's own catalog, some cross-department skills
+                picked.add(rnd.choice(own) if rnd.random() < 0.8 else rnd.choice(all_skills))
+            for sid in picked:
+                yield (e, sid, rnd.randint(1, 10))
+    conn.executemany("INSERT INTO EmployeeSkills(empID, skillID, profiencylevel) VALUES (?, ?, ?)", emp_skill_rows())
+
+    conn.executemany("INSERT INTO Projects(projectID, teamID, projectName, status, endDate) VALUES (?, ?, ?, ?, ?)",
+                     [(p, rnd.randint(1, departments), f"Project {p}", rnd.choice(STATUSES),
+                       rnd.choice([None, "2020-01-01", "2099-12-31"])) for p in range(1, projects + 1)])
+
+    def assignment_rows():
+        for e in range(1, employees + 1):
+            n = min(projects, int(rnd.expovariate(1 / assignments_per_employee))) if assignments_per_employee else 0
+            for p in rnd.sample(range(1, projects + 1), n):
+                yield (p, e, "Contributor")
+    conn.executemany("INSERT INTO ProjectAssignment(projectID, empID, role) VALUES (?, ?, ?)", assignment_rows())
+
+    conn.commit()
+    conn.close()
+
+
+# ==============================================================
+# Timing helpers
+# ==============================================================
+def _percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)]
+
+
+def _drop_caches() -> None:
+    ai_pdf_app._ORG_SNAPSHOTS.clear()
+    ai_pdf_app._POSTINGS_INDEXES.clear()
+    ai_helper._RECOMMENDATION_CACHE.clear()
+
+
+def _stub_llm() -> None:
+    """None of the timed paths should call a provider; make sure they can't."""
+    canned = json.dumps({"top5": []})
+    for mod in (ai_helper, ai_pdf_app):
+        for name in ("call_openai", "call_anthropic", "call_gemini"):
+            if hasattr(mod, name):
+                setattr(mod, name, lambda _prompt, _c=canned: _c)
+    ai_helper._complete_openai = lambda _prompt: LLMReply(canned, "openai", ai_helper._openai_model())
+
+
+def measure(call: Callable[[int], object], repeat: int) -> Dict[str, float]:
+    """call(i) runs one request; i picks the random skill set."""
+    _drop_caches()
+    t0 = time.perf_counter()
+    call(0)
+    cold_ms = (time.perf_counter() - t0) * 1000.0
+
+    samples = []
+    for i in range(1, repeat + 1):
+        t0 = time.perf_counter()
+        call(i)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+
+    _drop_caches()
+    tracemalloc.start()
+    call(0)
+    call(1)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "cold_ms": round(cold_ms, 3),
+        "p50_ms": round(_percentile(samples, 50), 3),
+        "p95_ms": round(_percentile(samples, 95), 3),
+        "peak_kib": round(peak / 1024.0, 1),
+        "iterations": repeat,
+    }
+
+
+# ==============================================================
+# Paths under test
+# ==============================================================
+def bench_scale(db_path: str, repeat: int, scorers: List[str], k: int, seed: int) -> List[Dict]:
+    ai_helper.DB_PATH = db_path
+    conn = sqlite3.connect(db_path)
+    dept_skill_names = [r[0] for r in conn.execute("SELECT skillName FROM Skills WHERE skillCategoryID = 1")]
+    all_skill_ids = [r[0] for r in conn.execute("SELECT skillID FROM Skills")]
+    conn.close()
+
+    rnd = random.Random(seed)
+    web_sets = [rnd.sample(dept_skill_names, 5) for _ in range(repeat + 1)]
+    cli_sets = [[{"skillID": sid} for sid in rnd.sample(all_skill_ids, 5)] for _ in range(repeat + 1)]
+
+    results = []
+    ctx_app = Flask("bench")
+    ctx_app.secret_key = "bench"
+    with ctx_app.test_request_context():
+        session["manager_id"] = None  # department catalog fallback
+        for scorer in scorers:
+            ai_helper.RECOMMENDATION_SCORER = scorer
+            stats = measure(lambda i: ai_helper.get_ai_team_recommendations(web_sets[i], 1, k, "High"), repeat)
+            results.append({"path": f"get_ai_team_recommendations[{scorer}]", **stats})
+
+    stats = measure(lambda i: ai_pdf_app.score_employees_for_skills(db_path, cli_sets[i]), repeat)
+    results.append({"path": "score_employees_for_skills", **stats})
+    stats = measure(lambda i: ai_pdf_app.suggest_team(db_path, cli_sets[i], k=k), repeat)
+    results.append({"path": "suggest_team", **stats})
+    return results
+
+
+def _scale_size(label: str) -> int:
+    if label in SCALES:
+        return SCALES[label]
+    return int(label.lower().replace("k", "000"))
+
+
+def compare(old: Dict, new: Dict, threshold: float) -> int:
+    """Prints p95 deltas per (scale, path); returns how many regressed beyond threshold."""
+    before = {(r["scale"], r["path"]): r for r in old.get("results", [])}
+    regressions = 0
+    print(f"\n{'scale':>6} {'path':<42} {'old p95':>9} {'new p95':>9} {'change':>8}")
+    for r in new["results"]:
+        o = before.get((r["scale"], r["path"]))
+        if not o:
+            continue
+        change = (r["p95_ms"] - o["p95_ms"]) / o["p95_ms"] if o["p95_ms"] else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        regressions += bool(flag)
+        print(f"{r['scale']:>6} {r['path']:<42} {o['p95_ms']:>9.2f} {r['p95_ms']:>9.2f} {change:>+7.0%}{flag}")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scales", nargs="+", default=["1k", "10k"], help="employee counts: 1k, 10k, 100k or any number")
+    ap.add_argument("--skills-per-employee", type=int, default=8)
+    ap.add_argument("--departments", type=int, default=10)
+    ap.add_argument("--projects", type=int, default=0, help="default: employees / 20")
+    ap.add_argument("--assignments-per-employee", type=float, default=1.5)
+    ap.add_argument("--scorers", nargs="+", default=["matrix", "sql"], help="RECOMMENDATION_SCORER values to time")
+    ap.add_argument("--repeat", type=int, default=30)
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--seed", type=int, default=13)
+    ap.add_argument("--db-dir", default=None, help="keep the synthetic databases here (default: temp dir)")
+    ap.add_argument("--out", default="bench_recommendations.json")
+    ap.add_argument("--compare", default=None, help="earlier --out file to diff against")
+    ap.add_argument("--threshold", type=float, default=0.10, help="p95 slowdown that counts as a regression")
+    args = ap.parse_args()
+
+    _stub_llm()
+    db_dir = args.db_dir or tempfile.mkdtemp(prefix="bench_org_")
+    os.makedirs(db_dir, exist_ok=True)
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "params": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "db_dir")},
+        },
+        "results": [],
+    }
+
+    print(f"{'scale':>6} {'path':<42} {'cold ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'peak KiB':>10}")
+    for label in args.scales:
+        n = _scale_size(label)
+        db_path = os.path.join(db_dir, f"bench_{label}.db")
+        t0 = time.perf_counter()
+        build_synthetic_db(db_path, n, args.departments, skills_per_employee=args.skills_per_employee,
+                           projects=args.projects, assignments_per_employee=args.assignments_per_employee,
+                           seed=args.seed)
+        print(f"# built {db_path} ({n} employees) in {time.perf_counter() - t0:.1f}s")
+
+        for r in bench_scale(db_path, args.repeat, args.scorers, args.k, args.seed):
+            r = {"scale": label, "employees": n, **r}
+            report["results"].append(r)
+            print(f"{label:>6} {r['path']:<42} {r['cold_ms']:>9.2f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['peak_kib']:>10.1f}")
+
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"# wrote {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        if regressions:
+            sys.exit(f"{regressions} path(s) regressed by more than {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# bench_selection.py
+"""
+Benchmark + equivalence check for team selection (ai_helper._select_team).
+
+Compares the heap-based selection against the previous full-sort + list
+membership version on synthetic candidate lists.
+
+Run from the repo root:
+    python benchmarks/bench_selection.py
+    python benchmarks/bench_selection.py --sizes 10000 100000 --k 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_helper import _select_team  # noqa: E402
+
+PRIORITIES = ["Critical", "High", "Medium", "Low"]
+
+
+def reference_select(candidates: List[Dict], k: int, priority: str) -> List[Dict]:
+    """The selection stage as it was before the top-k rewrite (sort + list scans)."""
+    candidates_sorted = sorted(candidates, key=lambda x: x["matchScore"], reverse=True)
+    n = min(k, len(candidates_sorted))
+    priority_key = (priority or "Critical").strip().lower()
+    if priority_key == "critical":
+        return candidates_sorted[:n]
+    if priority_key == "high":
+        high_count = max(1, round(n * 0.75))
+    elif priority_key == "medium":
+        high_count = max(1, round(n * 0.5))
+    elif priority_key == "low":
+        high_count = min(2, n)
+    else:
+        high_count = n
+    low_count = max(0, n - high_count)
+    high_selected = candidates_sorted[:high_count]
+    remaining = [c for c in candidates_sorted if c not in high_selected]
+    low_pool = [c for c in reversed(remaining) if not c["atCapacity"]]
+    return high_selected + low_pool[:low_count]
+
+
+def synthetic_candidates(n: int, seed: int = 7) -> List[Dict]:
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        active = rnd.choice([0, 0, 1, 2, 3, 4])
+        # Coarse scores so there are lots of ties, like real 0-10 proficiencies
+        out.append({
+            "id": i + 1,
+            "matchScore": round(rnd.randint(0, 100) * rnd.choice([1.0, 0.9, 0.75, 0.5]), 1),
+            "activeProjectCount": active,
+            "atCapacity": active >= 3,
+        })
+    return out
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--skip-reference", action="store_true", help="time only the top-k version")
+    args = ap.parse_args()
+
+    print(f"{'n':>8} {'priority':>9} {'top-k ms':>10} {'reference ms':>13}  identical")
+    for n in args.sizes:
+        cands = synthetic_candidates(n)
+        for prio in PRIORITIES:
+            new_ms = _time(lambda: _select_team(cands, args.k, prio), args.repeat) * 1000
+            if args.skip_reference:
+                print(f"{n:>8} {prio:>9} {new_ms:>10.2f} {'-':>13}  -")
+                continue
+            ref_ms = _time(lambda: reference_select(cands, args.k, prio), 1) * 1000
+            same = _select_team(cands, args.k, prio) == reference_select(cands, args.k, prio)
+            print(f"{n:>8} {prio:>9} {new_ms:>10.2f} {ref_ms:>13.2f}  {same}")
+            if not same:
+                sys.exit(f"Selection mismatch at n={n}, priority={prio}")
+
+
+if __name__ == "__main__":
+    main()
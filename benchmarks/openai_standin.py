@@ -0,0 +1,289 @@
+# openai_standin.py
+"""
+Local stand-in for the OpenAI chat-completions API, for load and latency
+tests without network access or token spend.
+
+It answers POST /v1/chat/completions (the protocol the app's call_openai
+uses) with schema-valid JSON for the prompts the app sends:
+
+  - skill extraction  (ai_helper._build_skill_extraction_prompt)  -> {"skills": [...]}
+  - batched proficiency (ai_helper.assess_skill_proficiencies)    -> {"assessments": [...]}
+  - single proficiency (ai_helper._build_proficiency_prompt)      -> {"level", "reasoning"}
+  - CLI top-5 (ai_pdf_app.build_constrained_prompt)               -> {"top5": [...]}
+  - resume ingest, single or batched (AI Use Case 3.0 CLIs)       -> {"skills"} / {"resumes"}
+
+Skills are picked from the catalog in the prompt, preferring ones the
+document names, so replies always reference real IDs.
+
+With "stream": true the reply is sent as chat.completion.chunk events: the
+first chunk after ~30% of the drawn latency, the rest spread over the remainder.
+
+Latency is drawn per request from a distribution, and a share of requests
+can fail with 500 or 429 (with Retry-After); --rpm adds a real token-bucket
+rate limit. GET /stats returns request counts, status codes and peak
+concurrency, which shows how the app fans out under load.
+
+Run it, then point the app at it:
+    python benchmarks/openai_standin.py --port 8089 --latency lognormal:0.8,0.5 --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=standin python app.py
+
+Latency specs (seconds): fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+_CATALOG_PATTERNS = [
+    re.compile(r"^- (?P<name>.+?) \(ID=(?P<id>\d+)\)\s*$", re.M),           # web app extraction
+    re.compile(r"^\s*(?P<id>\d+) \| (?P<name>.+?)\s*$", re.M),              # CLI "ID | Name" catalogs
+]
+_ASSESS_RE = re.compile(r"^- ID=(?P<id>\d+) \| (?P<name>.+?) \| context:", re.M)
+_RESUME_ID_RE = re.compile(r"--- RESUME id=(\S+) START ---")
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    kind, _, args = spec.partition(":")
+    vals = [float(v) for v in args.split(",") if v.strip()] if args else []
+    if kind == "fixed":
+        return lambda rng: vals[0] if vals else 0.0
+    if kind == "uniform":
+        lo, hi = vals
+        return lambda rng: rng.uniform(lo, hi)
+    if kind == "lognormal":
+        median, sigma = vals
+        return lambda rng: rng.lognormvariate(math.log(median), sigma)
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+def _catalog(prompt: str) -> List[Tuple[int, str]]:
+    for pat in _CATALOG_PATTERNS:
+        found = [(int(m["id"]), m["name"]) for m in pat.finditer(prompt)]
+        if found:
+            return found
+    return []
+
+
+def _pick(catalog: List[Tuple[int, str]], text: str, rng: random.Random, lo: int, hi: int) -> List[Tuple[int, str]]:
+    """Skills named in text first, then random ones, lo..hi in total."""
+    low = text.lower()
+    named = [s for s in catalog if s[1].lower() in low]
+    rest = [s for s in catalog if s not in named]
+    rng.shuffle(rest)
+    n = min(len(catalog), max(lo, min(hi, len(named))))
+    return (named + rest)[:n]
+
+
+def respond(prompt: str, rng: random.Random) -> Tuple[str, str]:
+    """(prompt kind, JSON reply text)."""
+    if '"assessments"' in prompt:
+        skills = [(int(m["id"]), m["name"]) for m in _ASSESS_RE.finditer(prompt)]
+        return "proficiency_batch", json.dumps({"assessments": [
+            {"skillID": sid, "level": rng.randint(2, 9), "reasoning": f"Resume shows hands-on {name} work."}
+            for sid, name in skills
+        ]})
+    if "Skill to assess:" in prompt:
+        name = prompt.split("Skill to assess:", 1)[1].splitlines()[0].strip()
+        return "proficiency", json.dumps({"level": rng.randint(2, 9), "reasoning": f"Resume shows hands-on {name} work."})
+
+    catalog = _catalog(prompt)
+    resume_ids = _RESUME_ID_RE.findall(prompt)
+    if resume_ids:
+        return "resume_batch", json.dumps({"resumes": [
+            {"id": rid, "skills": [
+                {"skillID": sid, "skillName": name, "level": rng.randint(1, 5), "evidence": "resume"}
+                for sid, name in _pick(catalog, prompt.split(f"id={rid} START", 1)[1].split(f"id={rid} END", 1)[0], rng, 3, 8)
+            ]} for rid in resume_ids
+        ]})
+    if '"top5"' in prompt:
+        return "top5", json.dumps({"top5": [
+            {"skillID": sid, "skillName": name, "reason": "The case calls for it."}
+            for sid, name in _pick(catalog, prompt, rng, 5, 5)
+        ]})
+    if '"level": <int 1-5>' in prompt:
+        return "resume", json.dumps({"skills": [
+            {"skillID": sid, "skillName": name, "level": rng.randint(1, 5), "evidence": "resume"}
+            for sid, name in _pick(catalog, prompt, rng, 3, 8)
+        ]})
+    if '"skills"' in prompt:
+        return "skill_extraction", json.dumps({"skills": [
+            {"skillID": sid, "skillName": name, "reason": "The document describes this work."}
+            for sid, name in _pick(catalog, prompt, rng, 5, 10)
+        ]})
+    return "other", json.dumps({"ok": True})
+
+
+class StandinState:
+    def __init__(self, latency: Callable[[random.Random], float], error_rate: float,
+                 rate_limit_rate: float, rpm: int, seed: Optional[int]):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rpm = rpm
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.tokens = float(rpm)
+        self.refilled = time.monotonic()
+        self.counts: Dict[str, int] = {}
+        self.in_flight = self.peak_in_flight = 0
+
+    def count(self, key: str) -> None:
+        with self.lock:
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def take_token(self) -> bool:
+        if self.rpm <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rpm, self.tokens + (now - self.refilled) * self.rpm / 60.0)
+            self.refilled = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"counts": dict(self.counts), "inFlight": self.in_flight, "peakInFlight": self.peak_in_flight}
+
+
+def make_handler(state: StandinState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def log_message(self, fmt, *args):
+            pass
+
+        def _send(self, status: int, body: Dict, headers: Optional[Dict[str, str]] = None) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(data)
+            state.count(f"status_{status}")
+
+        def _stream(self, req: Dict, content: str, duration: float) -> None:
+            cid = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+            pieces = [content[i:i + 24] for i in range(0, len(content), 24)] or [""]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            for i, piece in enumerate(pieces + [None]):
+                delta = {"content": piece} if piece is not None else {}
+                if i == 0:
+                    delta["role"] = "assistant"
+                chunk = {
+                    "id": cid, "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": req.get("model", "standin"),
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": None if piece is not None else "stop"}],
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                if piece is not None and i < len(pieces) - 1:
+                    time.sleep(duration / len(pieces))
+            self.wfile.write(b"data: [DONE]\n\n")
+            self.wfile.flush()
+            state.count("status_200")
+            state.count("streamed")
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/stats":
+                return self._send(200, state.stats())
+            if self.path.rstrip("/") in ("/v1/models", "/models"):
+                return self._send(200, {"object": "list", "data": [{"id": "standin", "object": "model"}]})
+            self._send(404, {"error": {"message": "not found"}})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+                return self._send(404, {"error": {"message": "not found"}})
+            try:
+                req = json.loads(body or b"{}")
+                prompt = "\n".join(str(m.get("content", "")) for m in req.get("messages", []) if m.get("role") == "user")
+            except Exception:
+                return self._send(400, {"error": {"message": "invalid JSON body", "type": "invalid_request_error"}})
+
+            with state.lock:
+                state.in_flight += 1
+                state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+                roll = state.rng.random()
+                delay = max(0.0, state.latency(state.rng))
+                seed = state.rng.random()
+            try:
+                if not state.take_token() or roll < state.rate_limit_rate:
+                    return self._send(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                                      {"Retry-After": "1"})
+                if req.get("stream"):
+                    time.sleep(delay * 0.3)
+                else:
+                    time.sleep(delay)
+                if roll < state.rate_limit_rate + state.error_rate:
+                    return self._send(500, {"error": {"message": "The server had an error", "type": "server_error"}})
+                kind, content = respond(prompt, random.Random(seed))
+                state.count(kind)
+                if req.get("stream"):
+                    return self._stream(req, content, delay * 0.7)
+                prompt_tokens, completion_tokens = (len(prompt) + 3) // 4, (len(content) + 3) // 4
+                self._send(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": req.get("model", "standin"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                              "total_tokens": prompt_tokens + completion_tokens},
+                })
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+    return Handler
+
+
+def serve(host: str = "127.0.0.1", port: int = 8089, latency: str = "lognormal:0.8,0.5",
+          error_rate: float = 0.0, rate_limit_rate: float = 0.0, rpm: int = 0,
+          seed: Optional[int] = None) -> ThreadingHTTPServer:
+    """Start the server on a background thread and return it (call .shutdown() to stop)."""
+    state = StandinState(parse_latency(latency), error_rate, rate_limit_rate, rpm, seed)
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8089)
+    ap.add_argument("--latency", default="lognormal:0.8,0.5", help="fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    ap.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with 429")
+    ap.add_argument("--rpm", type=int, default=0, help="token-bucket requests/minute (0 = unlimited)")
+    ap.add_argument("--seed", type=int)
+    args = ap.parse_args()
+
+    server = serve(args.host, args.port, args.latency, args.error_rate, args.rate_limit_rate, args.rpm, args.seed)
+    print(f"OpenAI stand-in listening on http://{args.host}:{server.server_port}/v1 (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
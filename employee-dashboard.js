@@ -407,12 +407,15 @@ if (!employeeId) {
         body: formData,
       });
 
-      const data = await res.json();
+      const queued = await res.json();
 
-      if (!res.ok || !data.success) {
-        throw new Error(data.error || "Failed to process resume");
+      if (!res.ok || !queued.success) {
+        throw new Error(queued.error || "Failed to process resume");
       }
 
+      // Processing runs in the background; poll the job until it finishes
+      const data = await pollResumeJob(queued.statusUrl || `/api/resume-jobs/${queued.jobID}`);
+
       // Merge new skills into existing skillsData
       const newSkills = data.skills || [];
       let addedCount = 0;
@@ -469,6 +472,52 @@ if (!employeeId) {
     }
   });
 
+  const RESUME_STAGE_LABELS = {
+    queued: "Waiting for a free worker...",
+    parsing: "Reading PDF...",
+    extracting: "Extracting skills from resume using AI...",
+    assessing: "Assessing proficiency levels...",
+  };
+
+  // Give up on a job after this long, or after this many failed status checks in a row
+  const RESUME_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+  const RESUME_POLL_MAX_ERRORS = 5;
+
+  // Poll a resume job until it succeeds (returns the job) or fails / times out (throws)
+  async function pollResumeJob(statusUrl) {
+    const deadline = Date.now() + RESUME_POLL_TIMEOUT_MS;
+    let delay = 1000;
+    let errors = 0;
+    while (Date.now() < deadline) {
+      await new Promise((resolve) => setTimeout(resolve, delay));
+      delay = Math.min(delay * 1.5, 4000);
+
+      let res, job;
+      try {
+        res = await fetch(statusUrl);
+        job = await res.json();
+      } catch (err) {
+        // network blip or a non-JSON error page: retry a few times before giving up
+        if (++errors >= RESUME_POLL_MAX_ERRORS) {
+          throw new Error("Lost connection while checking resume status. Please try again.");
+        }
+        continue;
+      }
+      errors = 0;
+      if (!res.ok || !job.success) {
+        throw new Error(job.error || "Failed to check resume status");
+      }
+      if (job.status === "succeeded") return job;
+      if (job.status === "failed") {
+        throw new Error(job.error || "Failed to process resume");
+      }
+
+      processResumeBtn.textContent = `🔄 Analyzing resume... ${job.progress}%`;
+      showResumeStatus("info", RESUME_STAGE_LABELS[job.stage] || "Processing resume...");
+    }
+    throw new Error("Resume processing is taking longer than expected. Please check back later or try again.");
+  }
+
   function showResumeStatus(type, message) {
     resumeStatus.style.display = "block";
     resumeStatus.textContent = message;
@@ -0,0 +1,168 @@
+# llm_cache.py
+"""
+Persistent, content-addressed cache for LLM responses.
+
+The same PRD or resume is often sent more than once. Responses are stored in
+a small SQLite file next to employees.db, keyed by a SHA-256 of
+(provider, model, temperature, full prompt), so any change to the prompt
+(including the catalog embedded in it) is a different key.
+
+  - TTL: entries older than LLM_CACHE_TTL_SECONDS are treated as misses and deleted
+  - size bound: past LLM_CACHE_MAX_ENTRIES, least recently used entries are evicted
+  - stats(): hits / misses / stores / evictions / expirations for this process,
+    plus the current entry count
+
+Config (env):
+  LLM_CACHE_PATH          default: llm_cache.db next to EMPLOYEE_DB_PATH
+  LLM_CACHE_TTL_SECONDS   default 7 days
+  LLM_CACHE_MAX_ENTRIES   default 5000; 0 disables the cache
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+
+
+def _default_path() -> str:
+    db_path = os.getenv("EMPLOYEE_DB_PATH", "employees.db")
+    return os.getenv("LLM_CACHE_PATH") or os.path.join(os.path.dirname(os.path.abspath(db_path)), "llm_cache.db")
+
+
+class LLMResponseCache:
+    def __init__(self, path: str, ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+        if self.enabled:
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS LLMResponseCache (
+                        key TEXT PRIMARY KEY,
+                        provider TEXT NOT NULL,
+                        model TEXT NOT NULL,
+                        response TEXT NOT NULL,
+                        created_at REAL NOT NULL,
+                        last_access REAL NOT NULL,
+                        hits INTEGER NOT NULL DEFAULT 0
+                    )
+                """)
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_access ON LLMResponseCache(last_access)")
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            conn.execute("PRAGMA journal_mode = WAL")
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, prompt: str) -> str:
+        payload = json.dumps([provider, model, float(temperature), prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, count: bool = True) -> Optional[str]:
+        """Cached reply or None; count=False keeps polling lookups out of the hit/miss stats."""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM LLMResponseCache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                if count:
+                    self._count("misses")
+                return None
+            if self.ttl_seconds > 0 and now - row[1] > self.ttl_seconds:
+                conn.execute("DELETE FROM LLMResponseCache WHERE key = ?", (key,))
+                self._count("expired")
+                if count:
+                    self._count("misses")
+                return None
+            conn.execute(
+                "UPDATE LLMResponseCache SET last_access = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+        if count:
+            self._count("hits")
+        return row[0]
+
+    def put(self, key: str, provider: str, model: str, response: str) -> None:
+        if not self.enabled:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT OR REPLACE INTO LLMResponseCache(key, provider, model, response, created_at, last_access, hits)
+                VALUES (?, ?, ?, ?, ?, ?, 0)
+            """, (key, provider, model, response, now, now))
+            over = conn.execute("SELECT COUNT(*) FROM LLMResponseCache").fetchone()[0] - self.max_entries
+            if over > 0:
+                conn.execute("""
+                    DELETE FROM LLMResponseCache WHERE key IN (
+                        SELECT key FROM LLMResponseCache ORDER BY last_access LIMIT ?
+                    )
+                """, (over,))
+                self._count("evictions", over)
+        self._count("stores")
+
+    def purge_expired(self) -> int:
+        if not self.enabled or self.ttl_seconds <= 0:
+            return 0
+        with self._connect() as conn:
+            n = conn.execute(
+                "DELETE FROM LLMResponseCache WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+        self._count("expired", n)
+        return n
+
+    def stats(self) -> Dict:
+        entries = 0
+        if self.enabled:
+            with self._connect() as conn:
+                entries = conn.execute("SELECT COUNT(*) FROM LLMResponseCache").fetchone()[0]
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            "path": self.path,
+            "enabled": self.enabled,
+            "entries": entries,
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl_seconds,
+            "hitRate": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+            **counters,
+        }
+
+
+_CACHE: Optional[LLMResponseCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """Process-wide cache (created on first use from the env config)."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = LLMResponseCache(_default_path())
+        return _CACHE
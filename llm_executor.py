@@ -0,0 +1,157 @@
+# llm_executor.py
+"""
+Bounded-concurrency executor for LLM provider calls.
+
+Provider calls block for seconds, so they run on small per-provider thread
+pools instead of the request thread doing them one after another:
+
+  - each provider ("openai", "anthropic", "gemini", ...) gets its own pool,
+    sized by its per-provider limit
+  - a global semaphore caps how many calls are in flight across ALL
+    providers and all Flask request threads
+
+Callers fan out independent calls with submit() and gather the futures, so
+wall-clock time is roughly the slowest single call. Functions run here must
+not submit to the executor themselves (a pool thread waiting on its own pool
+can deadlock); pass the raw provider call, e.g. ai_helper.call_openai.
+Optional extra calls (hedged requests) use try_submit(), which only starts
+the call if a slot is free right now.
+
+Config (env):
+  LLM_MAX_CONCURRENCY            global cap (default 8)
+  LLM_MAX_CONCURRENCY_<PROVIDER> per-provider cap, e.g. LLM_MAX_CONCURRENCY_OPENAI (default 4)
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+DEFAULT_PROVIDER_CONCURRENCY = 4
+
+
+def _provider_limit(provider: str) -> int:
+    return max(1, int(os.getenv(f"LLM_MAX_CONCURRENCY_{provider.upper()}", str(DEFAULT_PROVIDER_CONCURRENCY))))
+
+
+class LLMExecutor:
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 provider_limits: Optional[Dict[str, int]] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self._provider_limits = dict(provider_limits or {})
+        self._global = threading.BoundedSemaphore(self.max_concurrency)
+        self._pools: Dict[str, ThreadPoolExecutor] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _pool(self, provider: str) -> ThreadPoolExecutor:
+        with self._lock:
+            pool = self._pools.get(provider)
+            if pool is None:
+                limit = self._provider_limits.get(provider) or _provider_limit(provider)
+                self._provider_limits[provider] = limit
+                pool = self._pools[provider] = ThreadPoolExecutor(
+                    max_workers=limit, thread_name_prefix=f"llm-{provider}"
+                )
+                self._stats[provider] = {"submitted": 0, "completed": 0, "failed": 0,
+                                         "in_flight": 0, "peak_in_flight": 0}
+            self._stats[provider]["submitted"] += 1
+            return pool
+
+    @contextmanager
+    def _tracked(self, provider: str, held: bool = False):
+        """Run under a global slot (acquired here unless the caller already `held` one)."""
+        if not held:
+            self._global.acquire()
+        try:
+            st = self._stats[provider]
+            with self._lock:
+                st["in_flight"] += 1
+                st["peak_in_flight"] = max(st["peak_in_flight"], st["in_flight"])
+            ok = False
+            try:
+                yield
+                ok = True
+            finally:
+                with self._lock:
+                    st["in_flight"] -= 1
+                    st["completed" if ok else "failed"] += 1
+        finally:
+            self._global.release()
+
+    def _run(self, provider: str, fn: Callable, args: tuple, kwargs: dict, held: bool = False) -> Any:
+        with self._tracked(provider, held):
+            return fn(*args, **kwargs)
+
+    @contextmanager
+    def slot(self, provider: str):
+        """
+        Hold a global slot for a call made on the caller's own thread (e.g. a
+        streamed reply consumed chunk by chunk). Counts toward the global cap
+        and the provider's stats, but not its pool size.
+        """
+        self._pool(provider)
+        with self._tracked(provider):
+            yield
+
+    def submit(self, provider: str, fn: Callable, *args, **kwargs) -> Future:
+        """Queue fn(*args, **kwargs) under `provider`'s limit; returns a Future."""
+        return self._pool(provider).submit(self._run, provider, fn, args, kwargs)
+
+    def try_submit(self, provider: str, fn: Callable, *args, **kwargs) -> Optional[Future]:
+        """
+        submit(), but only if a global slot and a provider worker are free
+        right now; None otherwise. For optional extra calls (hedged requests)
+        that must never queue behind, or push past, the configured limits.
+        """
+        if not self._global.acquire(blocking=False):
+            return None
+        try:
+            pool = self._pool(provider)
+            with self._lock:
+                st = self._stats[provider]
+                if st["in_flight"] >= self._provider_limits[provider]:
+                    st["submitted"] -= 1
+                    self._global.release()
+                    return None
+            return pool.submit(self._run, provider, fn, args, kwargs, True)
+        except Exception:
+            self._global.release()
+            raise
+
+    def call(self, provider: str, fn: Callable, *args, **kwargs) -> Any:
+        """submit() and wait; exceptions propagate to the caller."""
+        return self.submit(provider, fn, *args, **kwargs).result()
+
+    def gather(self, futures: List[Future]) -> List[Any]:
+        """Results in order; a failed call yields its exception instead of raising."""
+        out: List[Any] = []
+        for f in futures:
+            try:
+                out.append(f.result())
+            except Exception as e:
+                out.append(e)
+        return out
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "providers": {
+                    p: {"limit": self._provider_limits[p], **st} for p, st in self._stats.items()
+                },
+            }
+
+
+_EXECUTOR: Optional[LLMExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_llm_executor() -> LLMExecutor:
+    """Process-wide executor (created on first use from the env config)."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = LLMExecutor()
+        return _EXECUTOR
@@ -0,0 +1,643 @@
+# llm_gateway.py
+"""
+LLM provider gateway.
+
+One place where the web app talks to model providers:
+
+  - long-lived clients per provider (HTTP keep-alive / TLS sessions are
+    reused instead of building a new client for every call)
+  - a deadline per call: each attempt gets min(LLM_ATTEMPT_TIMEOUT, time left)
+  - retries with exponential backoff and full jitter, only for transient
+    errors (timeouts, connection errors, 429, 5xx)
+  - a circuit breaker per provider: after LLM_BREAKER_THRESHOLD consecutive
+    failures the provider is skipped for LLM_BREAKER_COOLDOWN seconds, then
+    one trial call decides whether it closes again
+  - failover: providers are tried in LLM_PROVIDERS order, skipping ones with
+    no API key or an open breaker
+  - hedging (opt-in): if the first provider has not answered by its
+    LLM_HEDGE_PERCENTILE latency, the same prompt also goes to the next one,
+    but only if the LLM executor has a slot free (a hedge never exceeds
+    LLM_MAX_CONCURRENCY); the first valid reply wins and the other call is
+    cancelled before its next attempt or backoff
+  - stats(): per-provider calls, failures, retries, latency p50/p95, breaker
+    state, plus hedge rate and the latency hedging saved
+
+Config (env):
+  LLM_PROVIDERS           comma list, default "openai,anthropic,gemini"
+  OPENAI_BASE_URL         OpenAI-compatible endpoint instead of api.openai.com
+  LLM_CALL_DEADLINE       seconds for the whole call incl. retries (default 60)
+  LLM_ATTEMPT_TIMEOUT     seconds per attempt (default 30)
+  LLM_MAX_RETRIES         retries per provider (default 2)
+  LLM_BREAKER_THRESHOLD   consecutive failures that open the breaker (default 5)
+  LLM_BREAKER_COOLDOWN    seconds the breaker stays open (default 30)
+  LLM_HEDGE               "1" to hedge slow calls (default off)
+  LLM_HEDGE_PERCENTILE    primary latency percentile that triggers the hedge (default 0.95)
+  LLM_HEDGE_DELAY         hedge delay in seconds until the primary has enough samples (default 3)
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from llm_executor import LLMExecutor, get_llm_executor
+
+SYSTEM_PROMPT = "Respond in strict JSON only. No commentary."
+
+LLM_PROVIDERS = [p.strip().lower() for p in os.getenv("LLM_PROVIDERS", "openai,anthropic,gemini").split(",") if p.strip()]
+LLM_CALL_DEADLINE = float(os.getenv("LLM_CALL_DEADLINE", "60"))
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+LLM_HEDGE = os.getenv("LLM_HEDGE", "0") == "1"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "3"))
+
+_BACKOFF_BASE = 0.5
+_BACKOFF_CAP = 8.0
+_LATENCY_WINDOW = 200
+_HEDGE_MIN_SAMPLES = 20
+
+
+class LLMCancelledError(RuntimeError):
+    """A hedged call was cancelled because another call already answered."""
+
+
+class LLMInvalidReplyError(RuntimeError):
+    """A provider kept answering with replies the caller's `validate` rejected."""
+
+
+class LLMUnavailableError(RuntimeError):
+    """Every configured provider failed or was skipped."""
+
+
+# ==============================================================
+# Provider adapters (one long-lived client each)
+# ==============================================================
+class _Provider:
+    name = ""
+    key_env = ""
+
+    def __init__(self):
+        self._client = None
+        self._lock = threading.Lock()
+
+    def configured(self) -> bool:
+        return bool(os.getenv(self.key_env))
+
+    def model(self) -> str:
+        raise NotImplementedError
+
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                self._client = self._make_client()
+            return self._client
+
+    def _make_client(self):
+        raise NotImplementedError
+
+    def complete(self, prompt: str, temperature: float, timeout: float) -> str:
+        raise NotImplementedError
+
+    def stream(self, prompt: str, temperature: float, timeout: float) -> Iterator[str]:
+        """Reply text in chunks; providers without streaming yield it whole."""
+        yield self.complete(prompt, temperature, timeout)
+
+
+class _OpenAIProvider(_Provider):
+    name, key_env = "openai", "OPENAI_API_KEY"
+
+    def model(self) -> str:
+        return os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+
+    def _make_client(self):
+        from openai import OpenAI
+        # retries are handled by the gateway, not the SDK; OPENAI_BASE_URL points
+        # at a compatible server (e.g. benchmarks/openai_standin.py)
+        return OpenAI(api_key=os.getenv(self.key_env), base_url=os.getenv("OPENAI_BASE_URL") or None, max_retries=0)
+
+    def complete(self, prompt: str, temperature: float, timeout: float) -> str:
+        resp = self.client().chat.completions.create(
+            model=self.model(),
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=temperature,
+            timeout=timeout,
+        )
+        return (resp.choices[0].message.content or "").strip()
+
+    def stream(self, prompt: str, temperature: float, timeout: float) -> Iterator[str]:
+        chunks = self.client().chat.completions.create(
+            model=self.model(),
+            messages=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=temperature,
+            timeout=timeout,
+            stream=True,
+        )
+        for chunk in chunks:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+class _AnthropicProvider(_Provider):
+    name, key_env = "anthropic", "ANTHROPIC_API_KEY"
+
+    def model(self) -> str:
+        return os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-20240620")
+
+    def _make_client(self):
+        import anthropic
+        return anthropic.Anthropic(api_key=os.getenv(self.key_env), max_retries=0)
+
+    def complete(self, prompt: str, temperature: float, timeout: float) -> str:
+        resp = self.client().messages.create(
+            model=self.model(),
+            max_tokens=1200,
+            temperature=temperature,
+            system=SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": prompt}],
+            timeout=timeout,
+        )
+        return "\n".join(b.text for b in resp.content if getattr(b, "type", None) == "text").strip()
+
+    def stream(self, prompt: str, temperature: float, timeout: float) -> Iterator[str]:
+        with self.client().messages.stream(
+            model=self.model(),
+            max_tokens=1200,
+            temperature=temperature,
+            system=SYSTEM_PROMPT,
+            messages=[{"role": "user", "content": prompt}],
+            timeout=timeout,
+        ) as s:
+            yield from s.text_stream
+
+
+class _GeminiProvider(_Provider):
+    name, key_env = "gemini", "GOOGLE_API_KEY"
+
+    def model(self) -> str:
+        return os.getenv("GOOGLE_GEMINI_MODEL", "gemini-1.5-pro")
+
+    def _make_client(self):
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv(self.key_env))
+        return genai.GenerativeModel(self.model(), system_instruction=SYSTEM_PROMPT)
+
+    def complete(self, prompt: str, temperature: float, timeout: float) -> str:
+        resp = self.client().generate_content(
+            prompt,
+            generation_config={"temperature": temperature},
+            request_options={"timeout": timeout},
+        )
+        return (getattr(resp, "text", "") or "").strip()
+
+    def stream(self, prompt: str, temperature: float, timeout: float) -> Iterator[str]:
+        resp = self.client().generate_content(
+            prompt,
+            generation_config={"temperature": temperature},
+            request_options={"timeout": timeout},
+            stream=True,
+        )
+        for chunk in resp:
+            text = getattr(chunk, "text", "")
+            if text:
+                yield text
+
+
+_PROVIDER_TYPES = {p.name: p for p in (_OpenAIProvider, _AnthropicProvider, _GeminiProvider)}
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Timeouts, connection errors, rate limits and 5xx are worth retrying."""
+    status = getattr(exc, "status_code", None) or getattr(exc, "code", None)
+    if isinstance(status, int):
+        return status == 429 or status >= 500
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    name = type(exc).__name__.lower()
+    return any(w in name for w in ("timeout", "connection", "ratelimit", "unavailable", "overloaded"))
+
+
+# ==============================================================
+# Circuit breaker + stats
+# ==============================================================
+class _ProviderState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.state = "closed"            # closed | open | half_open
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.calls = self.successes = self.failures = self.retries = self.timeouts = 0
+        self.short_circuited = 0
+        self.latencies = deque(maxlen=_LATENCY_WINDOW)  # seconds, successful attempts
+
+    def allow(self, now: float) -> bool:
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and now - self.opened_at >= LLM_BREAKER_COOLDOWN:
+                self.state = "half_open"
+                self.trial_in_flight = False
+            if self.state == "half_open" and not self.trial_in_flight:
+                self.trial_in_flight = True  # exactly one trial call
+                return True
+            self.short_circuited += 1
+            return False
+
+    def record_success(self, latency: float) -> None:
+        with self.lock:
+            self.successes += 1
+            self.latencies.append(latency)
+            self.consecutive_failures = 0
+            self.state = "closed"
+            self.trial_in_flight = False
+
+    def record_failure(self, now: float, timeout: bool, transient: bool) -> None:
+        with self.lock:
+            self.failures += 1
+            self.timeouts += timeout
+            self.trial_in_flight = False
+            if not transient:
+                # a bad request says nothing about provider health
+                if self.state == "half_open":
+                    self.state = "closed"
+                return
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= LLM_BREAKER_THRESHOLD:
+                self.state = "open"
+                self.opened_at = now
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            lat = sorted(self.latencies)
+        pick = lambda q: round(lat[min(len(lat) - 1, int(q * len(lat)))] * 1000.0, 1) if lat else None
+        return {
+            "state": self.state,
+            "calls": self.calls,
+            "successes": self.successes,
+            "failures": self.failures,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "shortCircuited": self.short_circuited,
+            "consecutiveFailures": self.consecutive_failures,
+            "latencyP50Ms": pick(0.50),
+            "latencyP95Ms": pick(0.95),
+        }
+
+    def latency_quantile(self, q: float) -> Optional[float]:
+        """Seconds, or None while there are too few samples to trust."""
+        with self.lock:
+            lat = sorted(self.latencies)
+        if len(lat) < _HEDGE_MIN_SAMPLES:
+            return None
+        return lat[min(len(lat) - 1, int(q * len(lat)))]
+
+
+class _HedgeStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = self.hedged = self.primary_wins = self.hedge_wins = self.abandoned = 0
+        self.no_slot = 0  # hedges skipped because the executor was at its limit
+        self.saved = deque(maxlen=_LATENCY_WINDOW)  # seconds the winning hedge beat the primary by
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            saved = sorted(self.saved)
+            return {
+                "enabled": LLM_HEDGE,
+                "requests": self.requests,
+                "hedged": self.hedged,
+                "skippedNoSlot": self.no_slot,
+                "hedgeRate": round(self.hedged / self.requests, 3) if self.requests else 0.0,
+                "primaryWins": self.primary_wins,
+                "hedgeWins": self.hedge_wins,
+                "abandoned": self.abandoned,
+                "savedMsTotal": round(sum(saved) * 1000.0, 1),
+                "savedMsP50": round(saved[len(saved) // 2] * 1000.0, 1) if saved else None,
+            }
+
+
+# ==============================================================
+# Gateway
+# ==============================================================
+class LLMReply(NamedTuple):
+    text: str
+    provider: str  # the provider that answered (may differ from the first after failover/hedging)
+    model: str
+
+
+class LLMStream:
+    """
+    Chunks of a streamed reply. provider/model stay None until a provider
+    starts answering, then name the one that did (may differ from the first
+    after failover).
+    """
+
+    def __init__(self):
+        self.provider: Optional[str] = None
+        self.model: Optional[str] = None
+        self._chunks: Iterator[str] = iter(())
+
+    def __iter__(self) -> Iterator[str]:
+        return self._chunks
+
+
+class LLMGateway:
+    def __init__(self, providers: Optional[List[str]] = None, sleep: Callable[[float], None] = time.sleep,
+                 executor: Optional[LLMExecutor] = None):
+        names = providers or LLM_PROVIDERS
+        unknown = [n for n in names if n not in _PROVIDER_TYPES]
+        if unknown:
+            raise ValueError(f"Unknown LLM provider(s): {', '.join(unknown)}")
+        self.providers: Dict[str, _Provider] = {n: _PROVIDER_TYPES[n]() for n in names}
+        self._state = {n: _ProviderState() for n in names}
+        self._sleep = sleep
+        self.hedge = LLM_HEDGE
+        self._hedge_stats = _HedgeStats()
+        self._executor = executor
+        self._primary_pool: Optional[ThreadPoolExecutor] = None
+        self._primary_lock = threading.Lock()
+
+    def complete(self, prompt: str, temperature: float = 0.4, deadline: Optional[float] = None,
+                 validate: Optional[Callable[[str], bool]] = None) -> str:
+        """
+        Text of the first successful reply, trying providers in order.
+        `validate` (e.g. "parses as JSON") decides which replies count: a
+        rejected reply is retried like a transient error, then fails over.
+        With hedging on, a slow provider is raced against the next one.
+        Raises LLMUnavailableError with every provider's last error otherwise.
+        """
+        return self.complete_reply(prompt, temperature, deadline, validate).text
+
+    def complete_reply(self, prompt: str, temperature: float = 0.4, deadline: Optional[float] = None,
+                       validate: Optional[Callable[[str], bool]] = None) -> LLMReply:
+        """complete(), plus which provider and model produced the reply."""
+        end = time.monotonic() + (deadline or LLM_CALL_DEADLINE)
+        if self.hedge and len(self.providers) > 1:
+            return self._complete_hedged(prompt, temperature, end, validate)
+        errors: List[str] = []
+        for name, provider in self.providers.items():
+            if not provider.configured():
+                errors.append(f"{name}: {provider.key_env} not set")
+                continue
+            state = self._state[name]
+            if not state.allow(time.monotonic()):
+                errors.append(f"{name}: circuit open")
+                continue
+            try:
+                text = self._call_with_retries(provider, state, prompt, temperature, end, validate=validate)
+                return LLMReply(text, name, provider.model())
+            except Exception as e:
+                errors.append(f"{name}: {type(e).__name__}: {e}")
+            if time.monotonic() >= end:
+                break
+        raise LLMUnavailableError("All LLM providers failed — " + "; ".join(errors))
+
+    def _primary_executor(self) -> ThreadPoolExecutor:
+        """
+        Runs the first leg of a hedged call while the caller waits; it stands
+        in for the caller's own thread (and executor slot), so it is sized
+        like the executor.
+        """
+        with self._primary_lock:
+            if self._primary_pool is None:
+                self._primary_pool = ThreadPoolExecutor(
+                    max_workers=self._llm_executor().max_concurrency, thread_name_prefix="llm-primary"
+                )
+            return self._primary_pool
+
+    def _llm_executor(self) -> LLMExecutor:
+        return self._executor or get_llm_executor()
+
+    def _complete_hedged(self, prompt: str, temperature: float, end: float,
+                         validate: Optional[Callable[[str], bool]]) -> LLMReply:
+        errors: List[str] = []
+        candidates = list(self.providers.items())
+        stats = self._hedge_stats
+        with stats.lock:
+            stats.requests += 1
+
+        def launch(hedge: bool):
+            """
+            Start the next usable provider; (name, future, cancel event) or None.
+            A hedge (extra concurrent call) only starts if the executor has a slot free.
+            """
+            while candidates:
+                name, provider = candidates[0]
+                if not provider.configured():
+                    errors.append(f"{name}: {provider.key_env} not set")
+                    candidates.pop(0)
+                    continue
+                state = self._state[name]
+                if not state.allow(time.monotonic()):
+                    errors.append(f"{name}: circuit open")
+                    candidates.pop(0)
+                    continue
+                cancel = threading.Event()
+                args = (self._call_with_retries, provider, state, prompt, temperature, end, cancel, validate)
+                if not hedge:
+                    candidates.pop(0)
+                    return name, self._primary_executor().submit(*args), cancel
+                fut = self._llm_executor().try_submit(name, *args)
+                if fut is None:
+                    with state.lock:
+                        state.trial_in_flight = False  # allow() may have reserved a half-open trial
+                    with stats.lock:
+                        stats.no_slot += 1
+                    return None  # still a candidate if the primary fails
+                candidates.pop(0)
+                return name, fut, cancel
+            return None
+
+        first = launch(hedge=False)
+        if first is None:
+            raise LLMUnavailableError("All LLM providers failed — " + "; ".join(errors))
+        legs = [first]
+        delay = self._state[first[0]].latency_quantile(LLM_HEDGE_PERCENTILE) or LLM_HEDGE_DELAY
+        hedge_at = time.monotonic() + delay
+        hedged = False
+
+        while legs:
+            now = time.monotonic()
+            if now >= end:
+                break
+            done, _ = wait([f for _n, f, _c in legs], timeout=(end if hedged else min(hedge_at, end)) - now,
+                           return_when=FIRST_COMPLETED)
+            if not done:
+                if not hedged:
+                    hedged = True
+                    leg = launch(hedge=True)
+                    if leg is not None:
+                        legs.append(leg)
+                        with stats.lock:
+                            stats.hedged += 1
+                continue
+            for leg in [l for l in legs if l[1] in done]:
+                legs.remove(leg)
+                name, fut, _cancel = leg
+                try:
+                    text = fut.result()
+                except Exception as e:
+                    errors.append(f"{name}: {type(e).__name__}: {e}")
+                    continue
+                self._finish_hedge(leg is not first, legs, first[1])
+                return LLMReply(text, name, self.providers[name].model())
+            if not legs:
+                # everything in flight failed: fail over to the next provider right away
+                hedged = True
+                leg = launch(hedge=False)
+                if leg is not None:
+                    legs.append(leg)
+        for _name, fut, cancel in legs:
+            cancel.set()
+            fut.cancel()
+        raise LLMUnavailableError("All LLM providers failed — " + "; ".join(errors or ["deadline exceeded"]))
+
+    def _finish_hedge(self, hedge_won: bool, losers: List, primary: Future) -> None:
+        stats = self._hedge_stats
+        won_at = time.monotonic()
+        with stats.lock:
+            if hedge_won:
+                stats.hedge_wins += 1
+            else:
+                stats.primary_wins += 1
+            stats.abandoned += len(losers)
+
+        def _record_saving(f: Future) -> None:
+            # the abandoned primary still finishes in the background; how much later is what hedging saved
+            if not f.cancelled() and f.exception() is None:
+                with stats.lock:
+                    stats.saved.append(time.monotonic() - won_at)
+
+        for _name, fut, cancel in losers:
+            cancel.set()  # stops it before its next attempt or backoff
+            if not fut.cancel() and hedge_won and fut is primary:
+                fut.add_done_callback(_record_saving)
+
+    def stream(self, prompt: str, temperature: float = 0.4, deadline: Optional[float] = None) -> Iterator[str]:
+        """
+        Reply text in chunks as the provider produces it. Providers are tried
+        in order until one starts streaming (no retries: a failed stream fails
+        over at once); a failure after the first chunk propagates, since the
+        caller has already consumed part of the reply.
+        """
+        return iter(self.stream_reply(prompt, temperature, deadline))
+
+    def stream_reply(self, prompt: str, temperature: float = 0.4, deadline: Optional[float] = None) -> "LLMStream":
+        """stream(), plus which provider and model are producing the chunks."""
+        reply = LLMStream()
+        reply._chunks = self._stream(prompt, temperature, deadline, reply)
+        return reply
+
+    def _stream(self, prompt: str, temperature: float, deadline: Optional[float],
+                reply: "LLMStream") -> Iterator[str]:
+        end = time.monotonic() + (deadline or LLM_CALL_DEADLINE)
+        errors: List[str] = []
+        for name, provider in self.providers.items():
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            if not provider.configured():
+                errors.append(f"{name}: {provider.key_env} not set")
+                continue
+            state = self._state[name]
+            if not state.allow(time.monotonic()):
+                errors.append(f"{name}: circuit open")
+                continue
+            with state.lock:
+                state.calls += 1
+            t0 = time.monotonic()
+            started = False
+            try:
+                for chunk in provider.stream(prompt, temperature, min(LLM_ATTEMPT_TIMEOUT, remaining)):
+                    if not started:
+                        started = True
+                        reply.provider, reply.model = name, provider.model()
+                    yield chunk
+            except GeneratorExit:
+                with state.lock:
+                    state.trial_in_flight = False  # caller stopped reading; not a provider failure
+                raise
+            except Exception as e:
+                state.record_failure(time.monotonic(), "timeout" in type(e).__name__.lower(), _is_transient(e))
+                if started:
+                    raise
+                errors.append(f"{name}: {type(e).__name__}: {e}")
+                continue
+            state.record_success(time.monotonic() - t0)
+            return
+        raise LLMUnavailableError("All LLM providers failed — " + "; ".join(errors))
+
+    def _call_with_retries(self, provider: _Provider, state: _ProviderState,
+                           prompt: str, temperature: float, end: float,
+                           cancel: Optional[threading.Event] = None,
+                           validate: Optional[Callable[[str], bool]] = None) -> str:
+        attempt = 0
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise LLMCancelledError("cancelled: another call already answered")
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("LLM call deadline exceeded")
+            with state.lock:
+                state.calls += 1
+            t0 = time.monotonic()
+            try:
+                text = provider.complete(prompt, temperature, min(LLM_ATTEMPT_TIMEOUT, remaining))
+            except Exception as e:
+                transient = _is_transient(e)
+                state.record_failure(time.monotonic(), "timeout" in type(e).__name__.lower(), transient)
+                if not transient or attempt >= LLM_MAX_RETRIES or state.state == "open":
+                    raise
+                attempt += 1
+                with state.lock:
+                    state.retries += 1
+                # full jitter: sleep uniformly in [0, min(cap, base * 2^attempt)]
+                backoff = random.uniform(0, min(_BACKOFF_CAP, _BACKOFF_BASE * (2 ** attempt)))
+                if cancel is not None and cancel.is_set():
+                    raise LLMCancelledError("cancelled: another call already answered")
+                self._sleep(min(backoff, max(0.0, end - time.monotonic())))
+                continue
+            state.record_success(time.monotonic() - t0)
+            if validate is not None and not validate(text):
+                # the provider is up (no breaker change), but this reply can't be used: ask again
+                if attempt >= LLM_MAX_RETRIES:
+                    raise LLMInvalidReplyError(f"reply rejected by validation after {attempt + 1} attempt(s)")
+                attempt += 1
+                with state.lock:
+                    state.retries += 1
+                continue
+            return text
+
+    def stats(self) -> Dict:
+        return {
+            "providers": {
+                name: {"configured": p.configured(), "model": p.model(), **self._state[name].snapshot()}
+                for name, p in self.providers.items()
+            },
+            "order": list(self.providers),
+            "hedging": self._hedge_stats.snapshot(),
+        }
+
+
+_GATEWAY: Optional[LLMGateway] = None
+_GATEWAY_LOCK = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Process-wide gateway (created on first use from the env config)."""
+    global _GATEWAY
+    with _GATEWAY_LOCK:
+        if _GATEWAY is None:
+            _GATEWAY = LLMGateway()
+        return _GATEWAY
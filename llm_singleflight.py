@@ -0,0 +1,161 @@
+# llm_singleflight.py
+"""
+Single-flight coalescing of identical in-flight LLM calls.
+
+When the same prompt is requested again while a call for it is still
+running (several managers uploading the same PRD at once), the later
+requests wait for that call instead of starting their own:
+
+  - within a process: callers with the same key get the same Future
+  - across worker processes: the leader holds a lease row in the response
+    cache's SQLite file (LLMInflight); other processes see the lease, poll the
+    response cache until the leader's reply lands there, and use it. A lease
+    that expires (leader crashed) or is released without a stored reply lets
+    the next waiter take over.
+
+Cross-process sharing needs the response cache (llm_cache.py); with the
+cache disabled only in-process coalescing applies.
+
+Config (env):
+  LLM_LEASE_SECONDS   how long a lease is honoured (default 90, above LLM_CALL_DEADLINE)
+"""
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from llm_cache import LLMResponseCache, get_llm_cache
+
+LLM_LEASE_SECONDS = float(os.getenv("LLM_LEASE_SECONDS", "90"))
+_POLL_INTERVAL = 0.1
+
+
+class SingleFlight:
+    def __init__(self, cache: LLMResponseCache, lease_seconds: float = LLM_LEASE_SECONDS,
+                 poll_interval: float = _POLL_INTERVAL):
+        self.cache = cache
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        # leaders (and cross-process waiters) run here, not on the LLM executor,
+        # so waiting never holds one of its slots
+        self._pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-singleflight")
+        self._counters = {"leaders": 0, "sharedInProcess": 0, "sharedAcrossProcesses": 0, "leaseTakeovers": 0}
+        if cache.enabled:
+            with self._connect() as conn:
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS LLMInflight (
+                        key TEXT PRIMARY KEY,
+                        owner TEXT NOT NULL,
+                        expires_at REAL NOT NULL
+                    )
+                """)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.cache.path, timeout=5)
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def do(self, key: str, fn: Callable[[], str]) -> Future:
+        """
+        Future for fn()'s reply, shared by every caller asking for `key` while
+        it is in flight. fn must store its reply in the response cache under
+        `key` for other processes to pick it up.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self._counters["sharedInProcess"] += 1
+                return future
+            future = self._pool.submit(self._lead, key, fn)
+            self._inflight[key] = future
+        future.add_done_callback(lambda f: self._forget(key, f))
+        return future
+
+    def _forget(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _lead(self, key: str, fn: Callable[[], str]) -> str:
+        if not self.cache.enabled:
+            self._count("leaders")
+            return fn()
+        waited = False
+        while True:
+            if self._acquire(key):
+                try:
+                    if waited:
+                        self._count("leaseTakeovers")
+                    cached = self.cache.get(key, count=False)  # a leader may have finished just now
+                    if cached is not None:
+                        self._count("sharedAcrossProcesses")
+                        return cached
+                    self._count("leaders")
+                    return fn()
+                finally:
+                    self._release(key)
+            # another process is calling the provider: wait for its reply
+            waited = True
+            while self._held_elsewhere(key):
+                cached = self.cache.get(key, count=False)
+                if cached is not None:
+                    self._count("sharedAcrossProcesses")
+                    return cached
+                time.sleep(self.poll_interval)
+            cached = self.cache.get(key, count=False)
+            if cached is not None:
+                self._count("sharedAcrossProcesses")
+                return cached
+
+    def _acquire(self, key: str) -> bool:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM LLMInflight WHERE key = ? AND expires_at < ?", (key, now))
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO LLMInflight(key, owner, expires_at) VALUES (?, ?, ?)",
+                (key, self.owner, now + self.lease_seconds)
+            )
+            return cur.rowcount == 1
+
+    def _release(self, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM LLMInflight WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def _held_elsewhere(self, key: str) -> bool:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM LLMInflight WHERE key = ? AND expires_at >= ?", (key, time.time())
+            ).fetchone()
+        return row is not None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"inFlight": len(self._inflight), "leaseSeconds": self.lease_seconds, **self._counters}
+
+
+_SINGLEFLIGHT: Optional[SingleFlight] = None
+_SINGLEFLIGHT_LOCK = threading.Lock()
+
+
+def get_llm_singleflight() -> SingleFlight:
+    """Process-wide single-flight layer over the process-wide response cache."""
+    global _SINGLEFLIGHT
+    with _SINGLEFLIGHT_LOCK:
+        if _SINGLEFLIGHT is None:
+            _SINGLEFLIGHT = SingleFlight(get_llm_cache())
+        return _SINGLEFLIGHT
@@ -0,0 +1,133 @@
+# org_search.py
+"""
+Org-wide candidate search.
+
+Team recommendations normally score only the manager's department. In org
+mode every department is scored as its own shard on a process pool, and each
+shard sends back only a shortlist instead of its full candidate list:
+
+  - its top k by matchScore (covers every "highly qualified" pick), and
+  - its bottom 2k by matchScore among people not at capacity (covers every
+    "lower-qualified" pick, even after up to k of them went to the top).
+
+Running ai_helper._select_team over the merged shortlists, in department
+order, picks the same team as running it over every employee in the org,
+so the parent only ever touches O(departments x k) candidates. Coverage mode
+also keeps each shard's k best holders of every required skill.
+"""
+import heapq
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import ai_helper
+
+ORG_SEARCH_WORKERS = int(os.getenv("ORG_SEARCH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    """Long-lived pool, so workers keep their postings index and score cache warm."""
+    global _POOL
+    if ORG_SEARCH_WORKERS <= 1:
+        return None
+    with _POOL_LOCK:
+        if _POOL is None:
+            # spawn, not fork: forking the threaded server can copy a held lock into the child
+            _POOL = ProcessPoolExecutor(
+                max_workers=ORG_SEARCH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _POOL
+
+
+def _shortlist(
+    candidates: List[Dict],
+    k: int,
+    levels: Optional[Dict[int, List[Optional[int]]]] = None,
+) -> List[int]:
+    """Indexes (in department order) of everyone the team pickers could choose."""
+    n = len(candidates)
+    keep = set(heapq.nlargest(k, range(n), key=lambda i: candidates[i]["matchScore"]))
+    keep.update(heapq.nsmallest(
+        2 * k,
+        (i for i in range(n) if not candidates[i]["atCapacity"]),
+        key=lambda i: (candidates[i]["matchScore"], -i),
+    ))
+    if levels is not None:
+        holders = [i for i in range(n) if candidates[i]["id"] in levels]
+        num_skills = len(next(iter(levels.values()))) if levels else 0
+        for j in range(num_skills):
+            keep.update(heapq.nlargest(
+                k,
+                (i for i in holders if levels[candidates[i]["id"]][j] is not None),
+                key=lambda i: levels[candidates[i]["id"]][j] * candidates[i]["loadPenaltyMultiplier"],
+            ))
+    return sorted(keep)
+
+
+def _department_shortlist(
+    db_path: str,
+    department_id: int,
+    top_ids: List[int],
+    id_to_name: Dict[int, str],
+    k: int,
+    coverage: bool,
+) -> List[Dict]:
+    """Pool worker: score one department and return its shortlist."""
+    conn = ai_helper._conn(db_path)
+    try:
+        candidates = ai_helper.score_department_candidates(conn, department_id, top_ids, id_to_name, db_path)
+        levels = ai_helper._required_skill_levels(conn, top_ids, db_path) if coverage else None
+    finally:
+        conn.close()
+    return [
+        dict(candidates[i], departmentId=department_id)  # copy; the cached dicts stay untouched
+        for i in _shortlist(candidates, k, levels)
+    ]
+
+
+def search_org_candidates(
+    conn,
+    top_ids: List[int],
+    id_to_name: Dict[int, str],
+    k: int,
+    selection_mode: str = "priority",
+) -> List[Dict]:
+    """
+    Merged shortlists from every department, in department order, each
+    candidate tagged with departmentId and departmentName.
+    """
+    departments = {
+        r["depID"]: r["departmentname"]
+        for r in conn.execute("SELECT depID, departmentname FROM Departments")
+    }
+    dept_ids = [
+        r["department"]
+        for r in conn.execute("""
+            SELECT DISTINCT department FROM Employees
+            WHERE department IS NOT NULL
+            ORDER BY department
+        """)
+    ]
+    coverage = (selection_mode or "priority").strip().lower() == "coverage"
+    args = (top_ids, id_to_name, max(0, k), coverage)
+    db_path = os.path.abspath(ai_helper.DB_PATH)
+
+    pool = _get_pool() if len(dept_ids) > 1 else None
+    if pool is not None:
+        futures = [pool.submit(_department_shortlist, db_path, d, *args) for d in dept_ids]
+        shards = [f.result() for f in futures]
+    else:
+        shards = [_department_shortlist(db_path, d, *args) for d in dept_ids]
+
+    merged: List[Dict] = []
+    for shard in shards:
+        for c in shard:
+            c["departmentName"] = departments.get(c["departmentId"], "")
+            merged.append(c)
+    return merged
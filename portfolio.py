@@ -0,0 +1,227 @@
+# portfolio.py
+"""
+Multi-project portfolio allocation.
+
+Staffs several projects in one call instead of one project at a time, so a
+greedy pick for the first project can't starve the later ones. The joint
+assignment is solved as a min-cost max-flow problem:
+
+    source --(teamSize)--> project --(1, -weight)--> employee --(capacity)--> sink
+
+  weight   = project priority weight x employee's baseMatchScore for that
+             project's skills (same scoring as get_ai_team_recommendations)
+  capacity = MAX_ACTIVE_ASSIGNMENTS (ai_pdf_app) - employee's active assignments
+
+The solver fills as many seats as possible, and among those assignments
+maximizes the total weighted skill fit. No one is placed above the cap.
+"""
+import heapq
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+import ai_helper
+
+PRIORITY_WEIGHTS = {"critical": 4, "high": 3, "medium": 2, "low": 1}
+
+# Only the best N positive-fit candidates per project become edges; keeps the
+# graph small on large departments while leaving room to trade people around.
+CANDIDATES_PER_PROJECT = int(os.getenv("PORTFOLIO_CANDIDATES_PER_PROJECT", "40"))
+
+_INF = float("inf")
+
+
+# ==============================================================
+# Min-cost max-flow (successive shortest paths, Dijkstra + potentials)
+# ==============================================================
+class _FlowGraph:
+    def __init__(self, n: int):
+        self.adj: List[List[int]] = [[] for _ in range(n)]
+        self.to: List[int] = []
+        self.cap: List[int] = []
+        self.cost: List[int] = []
+
+    def add_edge(self, u: int, v: int, cap: int, cost: int) -> int:
+        """Adds u->v and its residual v->u; returns the forward edge id (reverse is id ^ 1)."""
+        eid = len(self.to)
+        self.adj[u].append(eid)
+        self.to.append(v); self.cap.append(cap); self.cost.append(cost)
+        self.adj[v].append(eid + 1)
+        self.to.append(u); self.cap.append(0); self.cost.append(-cost)
+        return eid
+
+    def min_cost_max_flow(self, s: int, t: int, potential: List[int]) -> Tuple[int, int]:
+        """
+        `potential` must make every reduced cost non-negative on the initial
+        graph (shortest distances from s work). Returns (flow, cost).
+        """
+        n = len(self.adj)
+        h = list(potential)
+        flow = cost = 0
+        while True:
+            dist = [_INF] * n
+            prev_edge = [-1] * n
+            dist[s] = 0
+            heap = [(0, s)]
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                hu = h[u]
+                for e in self.adj[u]:
+                    if self.cap[e] <= 0:
+                        continue
+                    v = self.to[e]
+                    nd = d + self.cost[e] + hu - h[v]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        prev_edge[v] = e
+                        heapq.heappush(heap, (nd, v))
+            if dist[t] == _INF:
+                return flow, cost
+
+            for v in range(n):
+                if dist[v] < _INF:
+                    h[v] += dist[v]
+
+            push = _INF
+            v = t
+            while v != s:
+                e = prev_edge[v]
+                push = min(push, self.cap[e])
+                v = self.to[e ^ 1]
+            v = t
+            while v != s:
+                e = prev_edge[v]
+                self.cap[e] -= push
+                self.cap[e ^ 1] += push
+                v = self.to[e ^ 1]
+            flow += push
+            cost += push * (h[t] - h[s])
+
+
+def solve_assignment(
+    team_sizes: List[int],
+    weights: List[Dict[int, float]],
+    capacity: Dict[int, int],
+) -> Tuple[List[List[int]], float]:
+    """
+    Pure solver (no DB). weights[p] = {empID: weight > 0} for project p;
+    capacity = {empID: seats left}. Returns (empIDs per project, total weight).
+    """
+    emp_ids = sorted({e for w in weights for e in w if capacity.get(e, 0) > 0})
+    node_of = {e: len(team_sizes) + 1 + i for i, e in enumerate(emp_ids)}
+    source, sink = 0, len(team_sizes) + len(emp_ids) + 1
+    graph = _FlowGraph(sink + 1)
+
+    # Exact shortest distances on the initial DAG double as starting potentials
+    potential = [0] * (sink + 1)
+    pair_edges: List[Tuple[int, int, int]] = []  # (edge id, project, empID)
+    for p, size in enumerate(team_sizes):
+        if size <= 0:
+            continue
+        graph.add_edge(source, p + 1, size, 0)
+        for e, w in weights[p].items():
+            if e not in node_of or w <= 0:
+                continue
+            c = -int(round(w * 100))  # integer costs keep Dijkstra exact
+            pair_edges.append((graph.add_edge(p + 1, node_of[e], 1, c), p, e))
+            potential[node_of[e]] = min(potential[node_of[e]], c)
+    for e, node in node_of.items():
+        graph.add_edge(node, sink, capacity[e], 0)
+        potential[sink] = min(potential[sink], potential[node])
+
+    graph.min_cost_max_flow(source, sink, potential)
+
+    teams: List[List[int]] = [[] for _ in team_sizes]
+    total = 0.0
+    for eid, p, e in pair_edges:
+        if graph.cap[eid] == 0:  # saturated -> assigned
+            teams[p].append(e)
+            total += weights[p][e]
+    return teams, total
+
+
+# ==============================================================
+# Portfolio allocation (department scoped)
+# ==============================================================
+def allocate_portfolio(
+    projects: List[Dict],
+    department_id: int,
+    manager_id: Optional[int] = None,
+) -> Dict:
+    """
+    projects: [{"name", "skills": [names], "teamSize", "priority"}, ...]
+
+    Scores each project's candidates with the normal recommendation scorer,
+    then assigns everyone jointly under the MAX_ACTIVE_ASSIGNMENTS cap.
+    """
+    conn = ai_helper._conn(ai_helper.DB_PATH)
+    try:
+        catalog = ai_helper._load_skill_catalog(conn, department_id, manager_id, required=True)
+        id_to_name = {r["skillID"]: r["skillName"] for r in catalog}
+
+        specs = []
+        for i, proj in enumerate(projects):
+            skill_ids = ai_helper._resolve_skill_ids(proj.get("skills") or [], catalog)[:5]
+            priority = (proj.get("priority") or "Medium").strip()
+            specs.append({
+                "name": proj.get("name") or f"Project {i + 1}",
+                "priority": priority,
+                "teamSize": max(0, int(proj.get("teamSize", 4))),
+                "skill_ids": skill_ids,
+                "weight": PRIORITY_WEIGHTS.get(priority.lower(), PRIORITY_WEIGHTS["medium"]),
+            })
+
+        # Per-project candidate pools (scored lists come from the versioned cache)
+        by_id: Dict[int, Dict[int, Dict]] = {}
+        weights: List[Dict[int, float]] = []
+        for p, spec in enumerate(specs):
+            pool: List[Dict] = []
+            if spec["skill_ids"]:
+                candidates = ai_helper.score_department_candidates(
+                    conn, department_id, spec["skill_ids"], id_to_name
+                )
+                pool = heapq.nlargest(
+                    CANDIDATES_PER_PROJECT,
+                    (c for c in candidates if c["baseMatchScore"] > 0),
+                    key=lambda c: c["baseMatchScore"],
+                )
+            by_id[p] = {c["id"]: c for c in pool}
+            weights.append({c["id"]: spec["weight"] * c["baseMatchScore"] for c in pool})
+
+        # Seats left per employee under the active-assignment cap
+        active = ai_helper.get_org_snapshot(ai_helper.DB_PATH, conn).active_counts()
+        cap_limit = ai_helper.ai_pdf_app.MAX_ACTIVE_ASSIGNMENTS
+        capacity = {
+            e: max(0, cap_limit - active.get(e, 0))
+            for w in weights for e in w
+        }
+
+        t0 = time.perf_counter()
+        teams, total = solve_assignment([s["teamSize"] for s in specs], weights, capacity)
+        solve_ms = (time.perf_counter() - t0) * 1000.0
+
+        out_projects = []
+        for p, spec in enumerate(specs):
+            team = sorted((by_id[p][e] for e in teams[p]), key=lambda c: -c["baseMatchScore"])
+            out_projects.append({
+                "name": spec["name"],
+                "priority": spec["priority"],
+                "teamSize": spec["teamSize"],
+                "skills": [{"skillID": sid, "skillName": id_to_name.get(sid, "")} for sid in spec["skill_ids"]],
+                "team": team,
+                "unfilledSlots": spec["teamSize"] - len(team),
+            })
+
+        return {
+            "projects": out_projects,
+            "seatsRequested": sum(s["teamSize"] for s in specs),
+            "seatsFilled": sum(len(t) for t in teams),
+            "totalWeightedFit": round(total, 1),
+            "maxActiveAssignments": cap_limit,
+            "solveMs": round(solve_ms, 2),
+            "department_id": department_id,
+        }
+    finally:
+        conn.close()
@@ -0,0 +1,263 @@
+# resume_jobs.py
+"""
+Background resume-processing jobs.
+
+The upload endpoint only stores the PDF and returns 202 with a job ID; a
+small worker pool does the slow part (PDF parsing, skill extraction,
+proficiency assessment) and records progress in the ResumeJobs table, which
+the status endpoint reads. Jobs live in SQLite next to the app data, so a
+restart picks queued or interrupted jobs back up.
+
+Several server processes can share one database: a worker claims a job with
+a conditional UPDATE (queued -> running), so each job runs once, and keeps
+its updatedAt fresh while it runs. A 'running' job whose heartbeat is older
+than RESUME_JOB_LEASE_SECONDS is treated as orphaned and requeued.
+
+Config (env):
+  RESUME_JOB_WORKERS       worker threads (default 2)
+  RESUME_JOB_MAX_ATTEMPTS  runs before an interrupted job is marked failed (default 3)
+  RESUME_JOB_TTL_SECONDS   finished jobs older than this are purged on start (default 7 days)
+  RESUME_JOB_LEASE_SECONDS heartbeat age after which a running job counts as orphaned (default 120)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+RESUME_JOB_WORKERS = int(os.getenv("RESUME_JOB_WORKERS", "2"))
+RESUME_JOB_MAX_ATTEMPTS = int(os.getenv("RESUME_JOB_MAX_ATTEMPTS", "3"))
+RESUME_JOB_TTL_SECONDS = int(os.getenv("RESUME_JOB_TTL_SECONDS", str(7 * 24 * 3600)))
+RESUME_JOB_LEASE_SECONDS = float(os.getenv("RESUME_JOB_LEASE_SECONDS", "120"))
+MAX_RESUME_PAGES = 10
+
+FINISHED = ("succeeded", "failed")
+
+
+class ResumeJobError(RuntimeError):
+    """A job failed for a reason worth showing to the user."""
+
+
+def extract_resume_text(pdf_bytes: bytes) -> str:
+    from ai_helper import extract_pdf_text
+    return extract_pdf_text(pdf_bytes, MAX_RESUME_PAGES).text
+
+
+def assess_resume(conn, emp_id: int, manager_id: Optional[int], resume_text: str,
+                  on_stage=lambda stage, progress: None) -> List[Dict]:
+    """Skills found in a resume, each with an AI-assessed level (0-10) and evidence."""
+    from ai_helper import extract_skills_from_text, assess_skill_proficiencies
+
+    emp = conn.execute("SELECT department FROM Employees WHERE empID = ?", (emp_id,)).fetchone()
+    if not emp:
+        raise ResumeJobError("Employee not found")
+
+    on_stage("extracting", 30)
+    extracted_skills = extract_skills_from_text(resume_text, conn, emp["department"], manager_id=manager_id)
+
+    ids = [int(s["skillID"]) for s in extracted_skills]
+    skill_rows = {}
+    if ids:
+        for r in conn.execute(f"""
+            SELECT s.skillID, s.skillName, sc.skillCategoryname
+            FROM Skills s
+            LEFT JOIN SkillCategories sc ON s.skillCategoryID = sc.skillCategoryID
+            WHERE s.skillID IN ({",".join("?" * len(ids))})
+        """, ids):
+            skill_rows[r["skillID"]] = r
+    known = [
+        {"skillID": s["skillID"], "skillName": skill_rows[int(s["skillID"])]["skillName"], "reason": s.get("reason", "")}
+        for s in extracted_skills if int(s["skillID"]) in skill_rows
+    ]
+
+    on_stage("assessing", 60)
+    assessments = assess_skill_proficiencies(resume_text, known)
+
+    skills_with_details = []
+    for skill in known:
+        skill_row = skill_rows[int(skill["skillID"])]
+        assessed = assessments[int(skill["skillID"])]
+        skills_with_details.append({
+            "skillID": skill_row["skillID"],
+            "skillName": skill_row["skillName"],
+            "categoryName": skill_row["skillCategoryname"],
+            "level": assessed["level"],  # AI-assessed level
+            "levelReasoning": assessed["reasoning"],
+            "evidence": skill.get("reason") or "Extracted from resume"
+        })
+    return skills_with_details
+
+
+class ResumeJobQueue:
+    def __init__(self, db_path: str, workers: int = RESUME_JOB_WORKERS):
+        self.db_path = db_path
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="resume-job")
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ResumeJobs (
+                    jobID TEXT PRIMARY KEY,
+                    empID INTEGER NOT NULL,
+                    managerID INTEGER,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    stage TEXT NOT NULL DEFAULT 'queued',
+                    progress INTEGER NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    pdf BLOB,
+                    result TEXT,
+                    error TEXT,
+                    createdAt REAL NOT NULL,
+                    updatedAt REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_resume_jobs_status ON ResumeJobs(status)")
+        self._recover()
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _update(self, job_id: str, **fields) -> None:
+        fields["updatedAt"] = time.time()
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE ResumeJobs SET {cols} WHERE jobID = ?", (*fields.values(), job_id))
+
+    def _recover(self) -> None:
+        """
+        Purge old finished jobs, requeue running jobs whose worker stopped
+        heartbeating, and pick up queued ones. Jobs another live worker is
+        running keep a fresh heartbeat and are left alone.
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM ResumeJobs WHERE status IN (%s) AND updatedAt < ?" % ",".join("?" * len(FINISHED)),
+                (*FINISHED, now - RESUME_JOB_TTL_SECONDS)
+            )
+            conn.execute(
+                "UPDATE ResumeJobs SET status = 'queued', stage = 'queued' WHERE status = 'running' AND updatedAt < ?",
+                (now - RESUME_JOB_LEASE_SECONDS,)
+            )
+            pending = [r["jobID"] for r in conn.execute(
+                "SELECT jobID FROM ResumeJobs WHERE status = 'queued' ORDER BY createdAt"
+            )]
+        for job_id in pending:
+            self._pool.submit(self._run, job_id)  # _run's claim skips jobs another worker took first
+
+    def _requeue_if_orphaned(self, job_id: str) -> None:
+        with self._connect() as conn:
+            requeued = conn.execute(
+                "UPDATE ResumeJobs SET status = 'queued', stage = 'queued' "
+                "WHERE jobID = ? AND status = 'running' AND updatedAt < ?",
+                (job_id, time.time() - RESUME_JOB_LEASE_SECONDS)
+            ).rowcount
+        if requeued:
+            self._pool.submit(self._run, job_id)
+
+    def _claim(self, job_id: str) -> Optional[sqlite3.Row]:
+        """queued -> running for this worker only; None if someone else has it (or it is done)."""
+        with self._connect() as conn:
+            claimed = conn.execute("""
+                UPDATE ResumeJobs SET status = 'running', stage = 'parsing', progress = 10,
+                                      attempts = attempts + 1, updatedAt = ?
+                WHERE jobID = ? AND status = 'queued' AND attempts < ?
+            """, (time.time(), job_id, RESUME_JOB_MAX_ATTEMPTS)).rowcount
+            if not claimed:
+                conn.execute("""
+                    UPDATE ResumeJobs SET status = 'failed', stage = 'failed', pdf = NULL,
+                                          error = 'Job was interrupted too many times', updatedAt = ?
+                    WHERE jobID = ? AND status = 'queued' AND attempts >= ?
+                """, (time.time(), job_id, RESUME_JOB_MAX_ATTEMPTS))
+                return None
+            return conn.execute("SELECT * FROM ResumeJobs WHERE jobID = ?", (job_id,)).fetchone()
+
+    def _heartbeat(self, job_id: str, stop: threading.Event) -> None:
+        while not stop.wait(RESUME_JOB_LEASE_SECONDS / 3):
+            with self._connect() as conn:
+                conn.execute(
+                    "UPDATE ResumeJobs SET updatedAt = ? WHERE jobID = ? AND status = 'running'",
+                    (time.time(), job_id)
+                )
+
+    def submit(self, emp_id: int, manager_id: Optional[int], pdf_bytes: bytes) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO ResumeJobs(jobID, empID, managerID, pdf, createdAt, updatedAt)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (job_id, emp_id, manager_id, pdf_bytes, now, now))
+        self._pool.submit(self._run, job_id)
+        return job_id
+
+    def _run(self, job_id: str) -> None:
+        job = self._claim(job_id)
+        if job is None:
+            return
+        stop = threading.Event()
+        threading.Thread(target=self._heartbeat, args=(job_id, stop), daemon=True,
+                         name=f"resume-job-heartbeat-{job_id[:8]}").start()
+        try:
+            self._process(job)
+        finally:
+            stop.set()
+
+    def _process(self, job: sqlite3.Row) -> None:
+        job_id = job["jobID"]
+        try:
+            resume_text = extract_resume_text(job["pdf"])
+            if not resume_text:
+                raise ResumeJobError("Could not extract text from PDF")
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            try:
+                skills = assess_resume(
+                    conn, job["empID"], job["managerID"], resume_text,
+                    on_stage=lambda stage, progress: self._update(job_id, stage=stage, progress=progress),
+                )
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Resume job {job_id} failed: {e}")
+            self._update(job_id, status="failed", stage="failed", pdf=None, error=str(e))
+            return
+        self._update(job_id, status="succeeded", stage="done", progress=100, pdf=None,
+                     result=json.dumps(skills))
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as conn:
+            row = conn.execute("""
+                SELECT jobID, empID, managerID, status, stage, progress, result, error, createdAt, updatedAt
+                FROM ResumeJobs WHERE jobID = ?
+            """, (job_id,)).fetchone()
+        if row is None:
+            return None
+        if row["status"] == "running" and row["updatedAt"] < time.time() - RESUME_JOB_LEASE_SECONDS:
+            self._requeue_if_orphaned(job_id)  # its worker died; run it here instead of waiting for a restart
+        job = dict(row)
+        job["skills"] = json.loads(job.pop("result")) if job["result"] else None
+        return job
+
+
+_QUEUES: Dict[str, ResumeJobQueue] = {}
+_QUEUES_LOCK = threading.Lock()
+
+
+def get_resume_jobs(db_path: str) -> ResumeJobQueue:
+    """Process-wide queue for a database (started, and recovered, on first use)."""
+    key = os.path.abspath(db_path)
+    with _QUEUES_LOCK:
+        queue = _QUEUES.get(key)
+        if queue is None:
+            queue = _QUEUES[key] = ResumeJobQueue(key)
+        return queue
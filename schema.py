@@ -180,6 +180,18 @@ def init_db():
         )
     """)
 
+    # -----------------------------
+    # Data version (recommendation cache invalidation)
+    # -----------------------------
+    db.execute("""
+        CREATE TABLE IF NOT EXISTS DataVersion (
+            scope TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    db.executemany("INSERT OR IGNORE INTO DataVersion (scope, version) VALUES (?, 0)",
+                   [("skills",), ("employees",), ("projects",)])
+
 # initiali
     db.commit()
     print("✅ Database schema initialized successfully.")
@@ -374,7 +386,8 @@ def insert_dummy_data():
 def reset_database():
     db = get_db()
     tables = ["Departments", "Managers", "Teams", "Employees", "SkillCategories",
-              "Skills", "ManagerSkills", "EmployeeSkills", "Projects", "ProjectSkills", "ProjectAssignment"]
+              "Skills", "ManagerSkills", "EmployeeSkills", "Projects", "ProjectSkills", "ProjectAssignment",
+              "DataVersion"]
     for t in tables:
         db.execute(f"DROP TABLE IF EXISTS {t}")
     db.commit()
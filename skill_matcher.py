@@ -0,0 +1,181 @@
+# skill_matcher.py
+"""
+Local, deterministic skill matcher (LLM pre-pass).
+
+Builds an Aho-Corasick automaton over the normalized names (and aliases) of
+a skill catalog and scans document text once, in time linear in the text.
+Matching is word-level: the text is split into tokens and the automaton
+walks token by token, so "Git" never matches inside "digital" and
+"UX/UI Design" matches "ux / ui design".
+
+Each hit carries a confidence: multi-word names and names written with the
+catalog's capitalization count 1.0; a single-word name found only in other
+casing ("react", "excel", "testing") counts 0.5, since those are also
+everyday words. A skill's score sums its hits (for ranking); `best` is its
+strongest single hit (for confidence).
+"""
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9+#.]*")
+
+# Other names for the SAME skill, keyed by normalized catalog name. Related but
+# distinct skills (PostgreSQL for SQL, AWS for cloud administration) don't belong
+# here: a hit counts as that skill being named outright.
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "javascript": ["js", "ecmascript"],
+    "kubernetes": ["k8s"],
+    "seo": ["search engine optimization"],
+    "apache kafka": ["kafka"],
+    "adobe photoshop": ["photoshop"],
+    "adobe illustrator": ["illustrator"],
+    "api development": ["rest api", "rest apis", "api design", "restful api", "restful apis"],
+    "ux/ui design": ["ui/ux design", "ux design", "ui design", "user experience design"],
+    "excel": ["microsoft excel", "ms excel"],
+    "wordpress": ["word press"],
+    "erp systems": ["erp"],
+    "email campaigns": ["email marketing"],
+}
+
+
+def _tokens(text: str) -> List[Tuple[str, int, int]]:
+    """[(token, start, end)] with trailing sentence dots dropped ("Python." -> "Python")."""
+    out = []
+    for m in _TOKEN_RE.finditer(text):
+        tok = m.group(0).rstrip(".")
+        if tok:
+            out.append((tok, m.start(), m.start() + len(tok)))
+    return out
+
+
+def normalize(name: str) -> Tuple[str, ...]:
+    return tuple(t.lower() for t, _s, _e in _tokens(name))
+
+
+@dataclass
+class SkillHit:
+    skillID: int
+    skillName: str
+    count: int = 0
+    score: float = 0.0   # sum of hit weights (ranking)
+    best: float = 0.0    # weight of the strongest single hit (confidence)
+    first_pos: int = 0
+    snippets: List[str] = field(default_factory=list)
+
+
+class SkillMatcher:
+    """Word-level Aho-Corasick automaton over one skill catalog."""
+
+    MAX_SNIPPETS = 2
+    SNIPPET_RADIUS = 60
+
+    def __init__(self, skills: Iterable[Tuple[int, str]], aliases: Optional[Dict[str, List[str]]] = None):
+        aliases = SKILL_ALIASES if aliases is None else aliases
+        self.skills: Dict[int, str] = {}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # per state: (skillID, pattern length in tokens, exact-case form or None)
+        self._out: List[List[Tuple[int, int, Optional[Tuple[str, ...]]]]] = [[]]
+
+        for sid, name in skills:
+            self.skills[sid] = name
+            key = normalize(name)
+            patterns = {key}
+            # "Search Engine Optimization (SEO)" -> also "SEO" and the bare name
+            paren = re.search(r"\(([^)]+)\)", name)
+            if paren:
+                patterns.add(normalize(paren.group(1)))
+                patterns.add(normalize(name[:paren.start()]))
+            for alias in aliases.get(" ".join(key), ()):
+                patterns.add(normalize(alias))
+            exact = tuple(t for t, _s, _e in _tokens(name))
+            for pat in patterns:
+                if pat:
+                    # case only matters for single everyday words typed as the catalog name
+                    self._insert(pat, sid, exact if len(pat) == 1 and pat == key else None)
+        self._build_failure_links()
+
+    def _insert(self, pattern: Tuple[str, ...], sid: int, exact: Optional[Tuple[str, ...]]) -> None:
+        state = 0
+        for tok in pattern:
+            nxt = self._goto[state].get(tok)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][tok] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((sid, len(pattern), exact))
+
+    def _build_failure_links(self) -> None:
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for tok, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and tok not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(tok, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text: str) -> List[SkillHit]:
+        """Hits sorted by score (desc), then first appearance."""
+        toks = _tokens(text)
+        hits: Dict[int, SkillHit] = {}
+        counted_at: Dict[int, int] = {}  # skillID -> token index of its last counted hit
+        state = 0
+        for i, (tok, _start, end) in enumerate(toks):
+            low = tok.lower()
+            while state and low not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(low, 0)
+            for sid, length, exact in self._out[state]:
+                if counted_at.get(sid) == i:
+                    continue  # "Apache Kafka" also ends the alias "Kafka"; count once
+                counted_at[sid] = i
+                first = toks[i - length + 1]
+                weight = 1.0 if exact is None or (tok,) == exact else 0.5
+                hit = hits.get(sid)
+                if hit is None:
+                    hit = hits[sid] = SkillHit(sid, self.skills[sid], first_pos=first[1])
+                hit.count += 1
+                hit.score += weight
+                hit.best = max(hit.best, weight)
+                if len(hit.snippets) < self.MAX_SNIPPETS:
+                    hit.snippets.append(self._snippet(text, first[1], end))
+        return sorted(hits.values(), key=lambda h: (-h.score, h.first_pos))
+
+    def _snippet(self, text: str, start: int, end: int) -> str:
+        lo = max(0, start - self.SNIPPET_RADIUS)
+        hi = min(len(text), end + self.SNIPPET_RADIUS)
+        body = " ".join(text[lo:hi].split())
+        return ("…" if lo > 0 else "") + body + ("…" if hi < len(text) else "")
+
+
+_MATCHERS: "OrderedDict[tuple, SkillMatcher]" = OrderedDict()
+_MATCHERS_LOCK = threading.Lock()
+_MAX_MATCHERS = 32
+
+
+def get_skill_matcher(skills: Sequence[Tuple[int, str]]) -> SkillMatcher:
+    """Matcher for a catalog, reused while the catalog (IDs + names) is unchanged."""
+    key = tuple(sorted((int(sid), name) for sid, name in skills))
+    with _MATCHERS_LOCK:
+        matcher = _MATCHERS.get(key)
+        if matcher is not None:
+            _MATCHERS.move_to_end(key)
+            return matcher
+    matcher = SkillMatcher(key)
+    with _MATCHERS_LOCK:
+        _MATCHERS[key] = matcher
+        while len(_MATCHERS) > _MAX_MATCHERS:
+            _MATCHERS.popitem(last=False)
+    return matcher
@@ -0,0 +1,195 @@
+# skill_matrix.py
+"""
+Vectorized team scoring.
+
+Loads one department's proficiencies into a dense employee x skill matrix
+(plus a workload vector) with three bulk queries, then scores every employee
+against the required skills in a single NumPy operation. The candidate dicts
+it returns have exactly the same fields and values as the per-employee loop
+in ai_helper.get_ai_team_recommendations.
+
+load_department_matrix_from_snapshot builds just the required columns from
+the shared OrgSnapshot (ai_pdf_app) without touching the database.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+try:
+    import numpy as np
+except Exception:
+    np = None  # ai_helper falls back to the per-employee loop
+
+# Workload penalty by active project count: 0, 1, 2, 3+
+WORKLOAD_MULTIPLIERS = (1.0, 0.9, 0.75, 0.5)
+
+
+def numpy_available() -> bool:
+    return np is not None
+
+
+@dataclass
+class DepartmentSkillMatrix:
+    department_id: int
+    employees: list          # rows/dicts: empID, firstname, lastname, title, email
+    skill_col: Dict[int, int]  # skillID -> column index
+    prof: "np.ndarray"       # float64 [n_emp, n_skill], 0 where not held
+    held: "np.ndarray"       # bool    [n_emp, n_skill], True if an EmployeeSkills row exists
+    active: "np.ndarray"     # int64   [n_emp], project assignment count
+
+
+def load_department_matrix(conn, department_id: int) -> DepartmentSkillMatrix:
+    """
+    Builds the dense matrix for one department in three queries
+    (employees, their skills, their assignment counts).
+    """
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+
+    employees = _load_employees(conn, department_id)
+    row_of = {e["empID"]: i for i, e in enumerate(employees)}
+
+    skill_rows = conn.execute("""
+        SELECT es.empID, es.skillID, es.profiencylevel
+        FROM EmployeeSkills es
+        JOIN Employees e ON e.empID = es.empID
+        JOIN Skills s ON s.skillID = es.skillID
+        WHERE e.department = ?
+    """, (department_id,)).fetchall()
+
+    skill_col: Dict[int, int] = {}
+    for r in skill_rows:
+        if r["skillID"] not in skill_col:
+            skill_col[r["skillID"]] = len(skill_col)
+
+    prof = np.zeros((len(employees), len(skill_col)), dtype=np.float64)
+    held = np.zeros((len(employees), len(skill_col)), dtype=bool)
+    if skill_rows:
+        rows = np.fromiter((row_of[r["empID"]] for r in skill_rows), dtype=np.int64, count=len(skill_rows))
+        cols = np.fromiter((skill_col[r["skillID"]] for r in skill_rows), dtype=np.int64, count=len(skill_rows))
+        levels = np.fromiter((r["profiencylevel"] or 0 for r in skill_rows), dtype=np.float64, count=len(skill_rows))
+        prof[rows, cols] = levels
+        held[rows, cols] = True
+
+    active = _load_workload(conn, department_id, row_of)
+    return DepartmentSkillMatrix(department_id, employees, skill_col, prof, held, active)
+
+
+def load_department_matrix_from_snapshot(
+    snapshot,
+    department_id: int,
+    required_ids: Sequence[int],
+) -> DepartmentSkillMatrix:
+    """
+    Same matrix, but only the required skill columns, read from an
+    OrgSnapshot (ai_pdf_app) instead of the database: no queries at all.
+    """
+    if np is None:
+        raise RuntimeError("numpy is not installed")
+
+    emp = snapshot.employees
+    rows = snapshot.department_rows(department_id)
+    employees = [
+        {
+            "empID": emp.emp_ids[r],
+            "firstname": emp.firstname[r],
+            "lastname": emp.lastname[r],
+            "title": emp.title[r],
+            "email": emp.email[r],
+        }
+        for r in rows
+    ]
+    row_of = {e["empID"]: i for i, e in enumerate(employees)}
+    skill_col = {sid: j for j, sid in enumerate(required_ids)}
+
+    prof = np.zeros((len(employees), len(skill_col)), dtype=np.float64)
+    held = np.zeros((len(employees), len(skill_col)), dtype=bool)
+    for sid, j in skill_col.items():
+        for emp_id, level in snapshot.postings(sid):
+            i = row_of.get(emp_id)
+            if i is not None:  # postings are org-wide; keep this department's rows
+                prof[i, j] = level
+                held[i, j] = True
+
+    active = np.fromiter(
+        (snapshot.assignment_count(e["empID"]) for e in employees),
+        dtype=np.int64, count=len(employees),
+    )
+    return DepartmentSkillMatrix(department_id, employees, skill_col, prof, held, active)
+
+
+def _load_employees(conn, department_id: int) -> list:
+    return conn.execute("""
+        SELECT empID, firstname, lastname, title, email
+        FROM Employees
+        WHERE department = ?
+    """, (department_id,)).fetchall()
+
+
+def _load_workload(conn, department_id: int, row_of: Dict[int, int]) -> "np.ndarray":
+    active = np.zeros(len(row_of), dtype=np.int64)
+    for r in conn.execute("""
+        SELECT pa.empID, COUNT(p.projectID) AS cnt
+        FROM ProjectAssignment pa
+        JOIN Projects p ON p.projectID = pa.projectID
+        JOIN Employees e ON e.empID = pa.empID
+        WHERE e.department = ?
+        GROUP BY pa.empID
+    """, (department_id,)):
+        active[row_of[r["empID"]]] = r["cnt"]
+    return active
+
+
+def score_candidates(
+    matrix: DepartmentSkillMatrix,
+    required_ids: Sequence[int],
+    id_to_name: Dict[int, str],
+) -> List[Dict]:
+    """
+    Scores every employee in `matrix` against `required_ids` (in order).
+    Required skills nobody in the department holds contribute 0, exactly as
+    a missing skill does in the loop.
+    """
+    n_emp = len(matrix.employees)
+    total_required = len(required_ids)
+    if n_emp == 0 or total_required == 0:
+        return []
+
+    # Gather required columns; skills nobody holds become an all-zero column
+    prof = np.zeros((n_emp, total_required), dtype=np.float64)
+    held = np.zeros((n_emp, total_required), dtype=bool)
+    for j, sid in enumerate(required_ids):
+        col = matrix.skill_col.get(sid)
+        if col is not None:
+            prof[:, j] = matrix.prof[:, col]
+            held[:, j] = matrix.held[:, col]
+
+    # One pass over the [n_emp, k] block scores every candidate
+    skill_sums = (prof / 10.0).sum(axis=1)
+    matched_counts = held.sum(axis=1)
+    matched_prof_sums = (prof * held).sum(axis=1)
+    multipliers = np.asarray(WORKLOAD_MULTIPLIERS)[np.minimum(matrix.active, 3)]
+
+    names = [id_to_name.get(sid, "") for sid in required_ids]
+    candidates = []
+    for i, emp in enumerate(matrix.employees):
+        matched = int(matched_counts[i])
+        active_projects = int(matrix.active[i])
+        multiplier = float(multipliers[i])
+        base_score = round((float(skill_sums[i]) / total_required) * 100.0, 2)
+        avg_prof = float(matched_prof_sums[i]) / matched if matched else 0.0
+
+        candidates.append({
+            "id": emp["empID"],
+            "name": f"{emp['firstname']} {emp['lastname']}",
+            "title": emp["title"] or "N/A",
+            "email": emp["email"],
+            "matchScore": round(base_score * multiplier, 1),
+            "baseMatchScore": base_score,
+            "loadPenaltyMultiplier": round(multiplier, 2),
+            "activeProjectCount": active_projects,
+            "atCapacity": active_projects >= 3,
+            "coveragePercent": round(matched / total_required * 100.0, 1),
+            "avgProficiency": round(avg_prof, 2),
+            "skillsMatched": [names[j] for j in range(total_required) if held[i, j]],
+        })
+    return candidates
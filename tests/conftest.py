@@ -0,0 +1,36 @@
+# tests/conftest.py
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Point every module-level path (DB, LLM cache, PDF text cache) at a scratch
+# copy before anything imports ai_helper, so tests never touch the checkout.
+_SCRATCH = tempfile.mkdtemp(prefix="skills-tests-")
+os.environ["EMPLOYEE_DB_PATH"] = os.path.join(_SCRATCH, "employees.db")
+os.environ["LLM_CACHE_PATH"] = os.path.join(_SCRATCH, "llm_cache.db")
+os.environ["PDF_TEXT_CACHE_PATH"] = os.path.join(_SCRATCH, "pdf_text_cache.db")
+shutil.copy(os.path.join(ROOT, "employees.db"), os.environ["EMPLOYEE_DB_PATH"])
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Fresh copy of the sample employees.db."""
+    path = str(tmp_path / "employees.db")
+    shutil.copy(os.path.join(ROOT, "employees.db"), path)
+    return path
+
+
+@pytest.fixture
+def conn(db_path):
+    c = sqlite3.connect(db_path)
+    c.row_factory = sqlite3.Row
+    yield c
+    c.close()
@@ -0,0 +1,70 @@
+# tests/test_chunking.py
+"""_chunk_document: paragraph-aligned chunks with a hard size cap and chunk limit."""
+import random
+
+import pytest
+
+import ai_helper
+
+
+def _words(parts):
+    return " ".join(" ".join(parts).split())
+
+
+def _document(n_paragraphs, seed=3, words=(20, 400)):
+    rng = random.Random(seed)
+    vocab = ["python", "api", "latency", "design", "kafka", "figma", "requirement", "users"]
+    return "\n\n".join(
+        " ".join(rng.choice(vocab) for _ in range(rng.randint(*words))) for _ in range(n_paragraphs)
+    )
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(ai_helper, "PRD_CHUNK_MAX_CHARS", 2000)
+    monkeypatch.setattr(ai_helper, "PRD_MAX_CHUNKS", 6)
+
+
+def test_short_document_is_one_chunk(limits):
+    assert ai_helper._chunk_document("Build a REST API.", chunk_chars=1000) == (["Build a REST API."], [])
+
+
+def test_chunks_respect_size_and_keep_all_text(limits):
+    text = _document(12, words=(20, 120))
+    chunks, dropped = ai_helper._chunk_document(text, chunk_chars=1000)
+    assert dropped == []
+    assert 1 < len(chunks) <= 6
+    assert all(len(c) <= 2000 for c in chunks)
+    assert _words(chunks) == _words([text])
+
+
+def test_chunks_follow_paragraph_breaks(limits):
+    paras = ["p%d " % i + "word " * 30 for i in range(20)]
+    chunks, _ = ai_helper._chunk_document("\n\n".join(p.strip() for p in paras), chunk_chars=500)
+    for chunk in chunks:
+        for para in chunk.split("\n\n"):
+            assert para.startswith("p")  # no paragraph was cut in the middle
+
+
+def test_oversized_document_hits_the_cap_and_reports_the_rest(limits):
+    text = _document(200, seed=5)
+    chunks, dropped = ai_helper._chunk_document(text, chunk_chars=1000)
+    assert len(chunks) == 6
+    assert dropped
+    assert all(len(c) <= 2000 for c in chunks + dropped)
+    assert _words(chunks + dropped) == _words([text])
+
+
+def test_paragraph_without_spaces_is_hard_cut(limits):
+    text = "x" * 7000
+    chunks, dropped = ai_helper._chunk_document(text, chunk_chars=1000)
+    assert all(len(c) <= 2000 for c in chunks + dropped)
+    assert "".join(chunks + dropped) == text
+
+
+def test_chunk_chars_above_the_cap_is_honoured(limits):
+    # an explicit chunk size larger than PRD_CHUNK_MAX_CHARS raises the cap to it
+    text = _document(40, seed=9)
+    chunks, dropped = ai_helper._chunk_document(text, chunk_chars=4000)
+    assert all(len(c) <= 4000 for c in chunks + dropped)
+    assert _words(chunks + dropped) == _words([text])
@@ -0,0 +1,78 @@
+# tests/test_llm_cache.py
+"""LLMResponseCache: content-addressed keys, TTL expiry, LRU eviction."""
+from types import SimpleNamespace
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMResponseCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_key_covers_provider_model_temperature_and_prompt():
+    key = LLMResponseCache.make_key("openai", "gpt-4o-mini", 0.4, "prompt")
+    assert key == LLMResponseCache.make_key("openai", "gpt-4o-mini", 0.4, "prompt")
+    assert key != LLMResponseCache.make_key("anthropic", "gpt-4o-mini", 0.4, "prompt")
+    assert key != LLMResponseCache.make_key("openai", "gpt-4o", 0.4, "prompt")
+    assert key != LLMResponseCache.make_key("openai", "gpt-4o-mini", 0.0, "prompt")
+    assert key != LLMResponseCache.make_key("openai", "gpt-4o-mini", 0.4, "prompt ")
+
+
+def test_get_put_and_counters(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "c.db"), ttl_seconds=60, max_entries=10)
+    assert cache.get("k") is None
+    cache.put("k", "openai", "m", '{"a": 1}')
+    assert cache.get("k") == '{"a": 1}'
+    assert cache.get("k", count=False) == '{"a": 1}'
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["stores"], stats["entries"]) == (1, 1, 1, 1)
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = LLMResponseCache(str(tmp_path / "c.db"), ttl_seconds=60, max_entries=10)
+    cache.put("k", "openai", "m", "v")
+    clock[0] += 59
+    assert cache.get("k") == "v"
+    clock[0] += 2  # TTL counts from the store, not from the last read
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 1
+    assert cache.stats()["entries"] == 0
+
+
+def test_purge_expired(tmp_path, clock):
+    cache = LLMResponseCache(str(tmp_path / "c.db"), ttl_seconds=60, max_entries=10)
+    cache.put("old", "openai", "m", "v")
+    clock[0] += 30
+    cache.put("new", "openai", "m", "v")
+    clock[0] += 31
+    assert cache.purge_expired() == 1
+    assert cache.get("new") == "v"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = LLMResponseCache(str(tmp_path / "c.db"), ttl_seconds=0, max_entries=3)
+    for k in ("a", "b", "c"):
+        clock[0] += 1
+        cache.put(k, "openai", "m", k)
+    clock[0] += 1
+    assert cache.get("a") == "a"  # "a" is now the most recently used
+    clock[0] += 1
+    cache.put("d", "openai", "m", "d")
+
+    assert cache.get("b") is None
+    assert [cache.get(k) for k in ("a", "c", "d")] == ["a", "c", "d"]
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["entries"] == 3
+
+
+def test_zero_max_entries_disables_the_cache(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "c.db"), max_entries=0)
+    cache.put("k", "openai", "m", "v")
+    assert cache.get("k") is None
+    assert not (tmp_path / "c.db").exists()
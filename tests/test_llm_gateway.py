@@ -0,0 +1,224 @@
+# tests/test_llm_gateway.py
+"""LLMGateway: retries, circuit breaker, failover, hedging (providers are in-memory fakes)."""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import llm_gateway
+from llm_executor import LLMExecutor
+from llm_gateway import LLMGateway, LLMUnavailableError
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+class FakeProvider(llm_gateway._Provider):
+    """Plays back a script of replies/exceptions, then repeats the last entry."""
+    key_env = "FAKE_API_KEY"
+
+    def __init__(self, name, *script, configured=True, delay=0.0):
+        super().__init__()
+        self.name = name
+        self.script = list(script)
+        self.calls = 0
+        self.delay = delay
+        self._configured = configured
+
+    def configured(self):
+        return self._configured
+
+    def model(self):
+        return f"{self.name}-model"
+
+    def complete(self, prompt, temperature, timeout):
+        step = self.script[min(self.calls, len(self.script) - 1)]
+        self.calls += 1
+        time.sleep(self.delay)
+        if isinstance(step, BaseException):
+            raise step
+        return step
+
+
+def make_gateway(*providers, hedge=False, executor=None):
+    gw = LLMGateway(["openai"], sleep=lambda _s: None, executor=executor)
+    gw.hedge = hedge
+    gw.providers = {p.name: p for p in providers}
+    gw._state = {p.name: llm_gateway._ProviderState() for p in providers}
+    return gw
+
+
+@pytest.fixture(autouse=True)
+def fast_breaker(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_MAX_RETRIES", 2)
+    monkeypatch.setattr(llm_gateway, "LLM_BREAKER_THRESHOLD", 3)
+    monkeypatch.setattr(llm_gateway, "LLM_BREAKER_COOLDOWN", 30.0)
+
+
+def test_transient_errors_are_retried():
+    a = FakeProvider("a", TimeoutError("slow"), ConnectionError("reset"), "ok")
+    gw = make_gateway(a)
+    reply = gw.complete_reply("p")
+    assert reply == ("ok", "a", "a-model")
+    assert a.calls == 3
+    assert gw.stats()["providers"]["a"]["retries"] == 2
+
+
+def test_bad_requests_are_not_retried_and_do_not_open_the_breaker():
+    a = FakeProvider("a", BadRequest("400"))
+    b = FakeProvider("b", "from b")
+    gw = make_gateway(a, b)
+    for _ in range(5):
+        assert gw.complete("p") == "from b"
+    assert a.calls == 5
+    assert gw._state["a"].state == "closed"
+
+
+def test_failover_reports_the_provider_that_answered():
+    a = FakeProvider("a", TimeoutError("slow"))
+    b = FakeProvider("b", "from b")
+    gw = make_gateway(a, b)
+    assert gw.complete_reply("p") == ("from b", "b", "b-model")
+    assert a.calls == 3  # first try + LLM_MAX_RETRIES
+
+
+def test_invalid_reply_is_retried():
+    a = FakeProvider("a", "not json", '{"ok": 1}')
+    gw = make_gateway(a)
+    assert gw.complete_reply("p", validate=lambda t: t.startswith("{")) == ('{"ok": 1}', "a", "a-model")
+    assert a.calls == 2
+    assert gw.stats()["providers"]["a"]["retries"] == 1
+
+
+def test_invalid_replies_fail_over_without_opening_the_breaker():
+    a = FakeProvider("a", "not json")
+    b = FakeProvider("b", '{"from": "b"}')
+    gw = make_gateway(a, b)
+    for _ in range(2):
+        assert gw.complete_reply("p", validate=lambda t: t.startswith("{")).provider == "b"
+    assert a.calls == 6
+    assert gw._state["a"].state == "closed"
+
+
+def test_unconfigured_providers_are_skipped():
+    a = FakeProvider("a", "never", configured=False)
+    b = FakeProvider("b", "from b")
+    assert make_gateway(a, b).complete("p") == "from b"
+    assert a.calls == 0
+
+
+def test_breaker_opens_then_half_opens_after_cooldown(monkeypatch):
+    a = FakeProvider("a", TimeoutError("down"))
+    b = FakeProvider("b", "from b")
+    gw = make_gateway(a, b)
+    clock = [100.0]
+    monkeypatch.setattr(llm_gateway, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+
+    gw.complete("p")
+    assert gw._state["a"].state == "open"
+    assert a.calls == 3  # retries stop as soon as the breaker opens
+
+    gw.complete("p")
+    assert a.calls == 3  # short-circuited while open
+    assert gw.stats()["providers"]["a"]["shortCircuited"] == 1
+
+    clock[0] += 31
+    a.script = ["recovered"]
+    a.calls = 0
+    assert gw.complete_reply("p").provider == "a"  # one trial call closes it again
+    assert gw._state["a"].state == "closed"
+
+
+def test_failed_trial_reopens_the_breaker(monkeypatch):
+    a = FakeProvider("a", TimeoutError("down"))
+    b = FakeProvider("b", "from b")
+    gw = make_gateway(a, b)
+    clock = [100.0]
+    monkeypatch.setattr(llm_gateway, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    gw.complete("p")
+    clock[0] += 31
+    a.calls = 0
+    gw.complete("p")
+    assert a.calls == 1
+    assert gw._state["a"].state == "open"
+
+
+def test_all_providers_failing_raises_with_every_error():
+    a = FakeProvider("a", BadRequest("bad a"))
+    b = FakeProvider("b", BadRequest("bad b"))
+    with pytest.raises(LLMUnavailableError) as exc:
+        make_gateway(a, b).complete("p")
+    assert "a: BadRequest: bad a" in str(exc.value)
+    assert "b: BadRequest: bad b" in str(exc.value)
+
+
+def test_deadline_stops_retries(monkeypatch):
+    a = FakeProvider("a", TimeoutError("slow"))
+    gw = make_gateway(a)
+    clock = [0.0]
+    monkeypatch.setattr(llm_gateway, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    gw._sleep = lambda s: clock.__setitem__(0, clock[0] + 10)
+    with pytest.raises(LLMUnavailableError):
+        gw.complete("p", deadline=5)
+    assert a.calls == 1
+
+
+def test_stream_reports_the_provider_that_answered():
+    a = FakeProvider("a", ConnectionError("down"))
+    b = FakeProvider("b", "from b")
+    reply = make_gateway(a, b).stream_reply("p")
+    assert (reply.provider, reply.model) == (None, None)  # nothing started yet
+    assert "".join(reply) == "from b"
+    assert (reply.provider, reply.model) == ("b", "b-model")
+
+
+# ==============================================================
+# Hedging
+# ==============================================================
+@pytest.fixture
+def quick_hedge(monkeypatch):
+    monkeypatch.setattr(llm_gateway, "LLM_HEDGE_DELAY", 0.05)
+
+
+def test_hedge_wins_when_the_primary_is_slow(quick_hedge):
+    a = FakeProvider("a", "from a", delay=0.5)
+    b = FakeProvider("b", "from b")
+    gw = make_gateway(a, b, hedge=True, executor=LLMExecutor(max_concurrency=4))
+    assert gw.complete_reply("p").provider == "b"
+    hedging = gw.stats()["hedging"]
+    assert (hedging["hedged"], hedging["hedgeWins"]) == (1, 1)
+
+
+def test_no_hedge_without_a_free_executor_slot(quick_hedge):
+    a = FakeProvider("a", "from a", delay=0.2)
+    b = FakeProvider("b", "from b")
+    executor = LLMExecutor(max_concurrency=1)
+    gw = make_gateway(a, b, hedge=True, executor=executor)
+    with executor.slot("other"):  # the only slot is taken
+        assert gw.complete_reply("p").provider == "a"
+    assert b.calls == 0
+    assert gw.stats()["hedging"]["skippedNoSlot"] == 1
+
+
+def test_skipped_hedge_provider_is_still_used_for_failover(quick_hedge):
+    a = FakeProvider("a", BadRequest("bad a"), delay=0.2)
+    b = FakeProvider("b", "from b")
+    executor = LLMExecutor(max_concurrency=1)
+    gw = make_gateway(a, b, hedge=True, executor=executor)
+    with executor.slot("other"):
+        assert gw.complete_reply("p").provider == "b"
+
+
+def test_losing_leg_stops_retrying(quick_hedge):
+    a = FakeProvider("a", "from a", delay=0.3)
+    b = FakeProvider("b", TimeoutError("slow"), delay=0.1)
+    backoff = threading.Event()
+    gw = make_gateway(a, b, hedge=True, executor=LLMExecutor(max_concurrency=4))
+    gw._sleep = lambda _s: backoff.wait(0.5)  # hold the hedge in backoff until the primary wins
+
+    assert gw.complete_reply("p").provider == "a"
+    backoff.set()
+    time.sleep(0.3)
+    assert b.calls == 1
@@ -0,0 +1,119 @@
+# tests/test_llm_singleflight.py
+"""SingleFlight: identical in-flight calls share one provider call."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from llm_cache import LLMResponseCache
+from llm_singleflight import SingleFlight
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMResponseCache(str(tmp_path / "llm_cache.db"), ttl_seconds=0, max_entries=100)
+
+
+class BlockingCall:
+    """fn() for SingleFlight.do that waits until released and stores its reply."""
+
+    def __init__(self, cache, key, reply="reply"):
+        self.cache, self.key, self.reply = cache, key, reply
+        self.calls = 0
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+        self.started.set()
+        assert self.release.wait(5)
+        self.cache.put(self.key, "openai", "m", self.reply)
+        return self.reply
+
+
+def test_same_key_in_one_process_shares_one_call(cache):
+    sf = SingleFlight(cache)
+    fn = BlockingCall(cache, "k")
+    with ThreadPoolExecutor(max_workers=8) as callers:
+        futures = list(callers.map(lambda _i: sf.do("k", fn), range(8)))
+        assert fn.started.wait(5)
+        fn.release.set()
+        assert {f.result(timeout=5) for f in futures} == {"reply"}
+    assert fn.calls == 1
+    assert len({id(f) for f in futures}) == 1
+    stats = sf.stats()
+    assert (stats["leaders"], stats["sharedInProcess"], stats["inFlight"]) == (1, 7, 0)
+
+
+def test_different_keys_do_not_share(cache):
+    sf = SingleFlight(cache)
+    a, b = BlockingCall(cache, "a", "A"), BlockingCall(cache, "b", "B")
+    fa, fb = sf.do("a", a), sf.do("b", b)
+    a.release.set()
+    b.release.set()
+    assert (fa.result(timeout=5), fb.result(timeout=5)) == ("A", "B")
+    assert (a.calls, b.calls) == (1, 1)
+
+
+def test_reply_stored_by_a_finished_leader_is_reused(cache):
+    sf = SingleFlight(cache)
+    fn = BlockingCall(cache, "k")
+    fn.release.set()
+    assert sf.do("k", fn).result(timeout=5) == "reply"
+    assert sf.do("k", fn).result(timeout=5) == "reply"
+    assert fn.calls == 1
+
+
+def test_errors_reach_every_waiter_and_release_the_lease(cache):
+    sf = SingleFlight(cache)
+    gate = threading.Event()
+
+    def boom():
+        gate.wait(5)
+        raise RuntimeError("provider down")
+
+    futures = [sf.do("k", boom) for _ in range(3)]
+    gate.set()
+    for f in futures:
+        with pytest.raises(RuntimeError, match="provider down"):
+            f.result(timeout=5)
+    assert not sf._held_elsewhere("k")
+
+
+def test_other_process_waits_for_the_leaders_reply(cache):
+    # two SingleFlight instances over one cache file stand in for two worker processes
+    leader, follower = SingleFlight(cache, poll_interval=0.01), SingleFlight(cache, poll_interval=0.01)
+    fn = BlockingCall(cache, "k", "shared")
+    never = BlockingCall(cache, "k", "duplicate")
+
+    lead = leader.do("k", fn)
+    assert fn.started.wait(5)
+    follow = follower.do("k", never)
+    fn.release.set()
+
+    assert lead.result(timeout=5) == "shared"
+    assert follow.result(timeout=5) == "shared"
+    assert never.calls == 0
+    assert follower.stats()["sharedAcrossProcesses"] == 1
+
+
+def test_expired_lease_is_taken_over(cache):
+    crashed = SingleFlight(cache, lease_seconds=-1)  # its lease is already expired
+    assert crashed._acquire("k")
+    survivor = SingleFlight(cache, poll_interval=0.01)
+    fn = BlockingCall(cache, "k", "fresh")
+    fn.release.set()
+    assert survivor.do("k", fn).result(timeout=5) == "fresh"
+    assert fn.calls == 1
+
+
+def test_disabled_cache_still_coalesces_in_process(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "off.db"), max_entries=0)
+    sf = SingleFlight(cache)
+    fn = BlockingCall(cache, "k")
+    futures = [sf.do("k", fn) for _ in range(4)]
+    fn.release.set()
+    assert [f.result(timeout=5) for f in futures] == ["reply"] * 4
+    assert fn.calls == 1
@@ -0,0 +1,108 @@
+# tests/test_pdf_text.py
+"""extract_pdf_text: page limits, skipped pages, and the content-addressed text cache."""
+import pytest
+from pypdf.errors import PdfReadError
+
+import ai_helper
+
+ai_pdf_app = ai_helper.ai_pdf_app
+
+
+def _make_pdf(pages):
+    """Minimal PDF with one line of Helvetica text per page."""
+    n = len(pages)
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(n))
+    objs = ["<< /Type /Catalog /Pages 2 0 R >>", f"<< /Type /Pages /Kids [{kids}] /Count {n} >>"]
+    font_id = 3 + 2 * n
+    for i, text in enumerate(pages):
+        objs.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                    f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>")
+        body = f"BT /F1 10 Tf 40 750 Td ({text}) Tj ET"
+        objs.append(f"<< /Length {len(body)} >>\nstream\n{body}\nendstream")
+    objs.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    out, offsets = b"%PDF-1.4\n", []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode()
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{o:010d} 00000 n \n".encode() for o in offsets)
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return out
+
+
+PAGES = [f"Page {i} Python Docker Kubernetes" for i in range(1, 7)]
+
+
+@pytest.fixture(autouse=True)
+def text_cache(tmp_path, monkeypatch):
+    cache = ai_pdf_app.PdfTextCache(str(tmp_path / "pdf_text_cache.db"))
+    monkeypatch.setattr(ai_pdf_app, "_PDF_TEXT_CACHE", cache)
+    return cache
+
+
+@pytest.fixture
+def pdf_pool():
+    yield
+    pool = ai_pdf_app._PDF_POOL
+    if pool is not None:
+        ai_pdf_app._reset_pdf_pool(pool)
+
+
+def test_extracts_every_page_in_order():
+    result = ai_helper.extract_pdf_text(_make_pdf(PAGES), in_process=True)
+    assert (result.pages, result.total_pages, result.cached, result.skipped_pages) == (6, 6, False, [])
+    assert [line.strip() for line in result.text.split("\n\n")] == PAGES
+
+
+def test_max_pages_limits_what_is_read():
+    result = ai_helper.extract_pdf_text(_make_pdf(PAGES), max_pages=2, in_process=True)
+    assert (result.pages, result.total_pages) == (2, 6)
+    assert "Page 3" not in result.text
+
+
+def test_repeat_upload_is_served_from_the_cache(text_cache):
+    data = _make_pdf(PAGES)
+    first = ai_helper.extract_pdf_text(data, in_process=True)
+    second = ai_helper.extract_pdf_text(data, in_process=True)
+    assert not first.cached and second.cached
+    assert second.text == first.text
+    assert text_cache.stats()["hits"] == 1
+
+
+def test_cached_entry_serves_fewer_pages_but_not_more(text_cache):
+    data = _make_pdf(PAGES)
+    ai_helper.extract_pdf_text(data, max_pages=3, in_process=True)
+
+    fewer = ai_helper.extract_pdf_text(data, max_pages=2, in_process=True)
+    assert fewer.cached and fewer.pages == 2
+
+    more = ai_helper.extract_pdf_text(data, max_pages=5, in_process=True)
+    assert not more.cached and more.pages == 5
+
+
+def test_pages_over_the_text_limit_are_skipped_and_not_cached(text_cache, monkeypatch):
+    monkeypatch.setattr(ai_pdf_app, "PDF_MAX_TEXT_CHARS", len(PAGES[0]) * 2 + 10)
+    data = _make_pdf(PAGES)
+    result = ai_helper.extract_pdf_text(data, in_process=True)
+
+    assert result.pages == 6  # skipped pages keep their slot, empty
+    assert [s["page"] for s in result.skipped_pages] == [3, 4, 5, 6]
+    assert {s["reason"] for s in result.skipped_pages} == {"text limit"}
+    assert "Page 2" in result.text and "Page 3" not in result.text
+    assert text_cache.stats()["stores"] == 0
+    assert not ai_helper.extract_pdf_text(data, in_process=True).cached
+
+
+def test_unreadable_file_is_an_error():
+    with pytest.raises(PdfReadError):
+        ai_helper.extract_pdf_text(b"not a pdf", in_process=True)
+
+
+def test_process_pool_matches_in_process(pdf_pool, text_cache):
+    data = _make_pdf(PAGES * 3)
+    pooled = ai_helper.extract_pdf_text(data)
+    text_cache.max_bytes = 0  # force a second parse
+    local = ai_helper.extract_pdf_text(data, in_process=True)
+    assert pooled.text == local.text
+    assert (pooled.pages, pooled.skipped_pages) == (18, [])
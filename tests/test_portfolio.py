@@ -0,0 +1,112 @@
+# tests/test_portfolio.py
+"""Min-cost max-flow portfolio solver: feasible, capped, and optimal on small cases."""
+import itertools
+import random
+import sqlite3
+
+import pytest
+
+import ai_helper
+import portfolio
+
+
+def _check_feasible(teams, team_sizes, weights, capacity):
+    load = {}
+    for p, team in enumerate(teams):
+        assert len(team) <= team_sizes[p]
+        assert len(set(team)) == len(team), "an employee was placed twice on one project"
+        for e in team:
+            assert weights[p].get(e, 0) > 0
+            load[e] = load.get(e, 0) + 1
+    for e, n in load.items():
+        assert n <= capacity.get(e, 0), f"employee {e} placed above their cap"
+
+
+def _brute_force(team_sizes, weights, capacity):
+    """(seats filled, total weight) of the best assignment, by enumeration."""
+    pairs = [(p, e) for p, w in enumerate(weights) for e in w if w[e] > 0 and capacity.get(e, 0) > 0]
+    best = (0, 0.0)
+    for mask in itertools.product((0, 1), repeat=len(pairs)):
+        chosen = [pr for pr, on in zip(pairs, mask) if on]
+        per_project = [sum(1 for p, _e in chosen if p == q) for q in range(len(team_sizes))]
+        if any(n > team_sizes[q] for q, n in enumerate(per_project)):
+            continue
+        load = {}
+        for _p, e in chosen:
+            load[e] = load.get(e, 0) + 1
+        if any(n > capacity[e] for e, n in load.items()):
+            continue
+        score = (len(chosen), round(sum(weights[p][e] for p, e in chosen), 6))
+        best = max(best, score)
+    return best
+
+
+def test_solver_matches_brute_force_on_small_cases():
+    rng = random.Random(7)
+    for _ in range(60):
+        n_proj, n_emp = rng.randint(1, 3), rng.randint(1, 4)
+        team_sizes = [rng.randint(0, 3) for _ in range(n_proj)]
+        weights = [
+            {e: rng.choice([0, rng.randint(1, 40) / 2]) for e in range(n_emp)}
+            for _ in range(n_proj)
+        ]
+        capacity = {e: rng.randint(0, 2) for e in range(n_emp)}
+
+        teams, total = portfolio.solve_assignment(team_sizes, weights, capacity)
+
+        _check_feasible(teams, team_sizes, weights, capacity)
+        filled, best_total = _brute_force(team_sizes, weights, capacity)
+        assert sum(len(t) for t in teams) == filled
+        assert total == pytest.approx(best_total)
+
+
+def test_solver_trades_people_instead_of_starving_a_project():
+    # A greedy pick would put employee 1 on project 0 and leave project 1 empty
+    weights = [{1: 10.0, 2: 9.0}, {1: 8.0}]
+    teams, total = portfolio.solve_assignment([1, 1], weights, {1: 1, 2: 1})
+    assert teams == [[2], [1]]
+    assert total == 17.0
+
+
+def test_solver_respects_zero_capacity():
+    teams, total = portfolio.solve_assignment([2], [{1: 5.0, 2: 3.0}], {1: 0, 2: 1})
+    assert teams == [[2]]
+    assert total == 3.0
+
+
+def test_allocate_portfolio_stays_under_active_cap(db_path, monkeypatch):
+    monkeypatch.setattr(ai_helper, "DB_PATH", db_path)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    skills = [r["skillName"] for r in conn.execute(
+        "SELECT skillName FROM Skills WHERE skillCategoryID = 1 ORDER BY skillID LIMIT 6"
+    )]
+    projects = [
+        {"name": "A", "skills": skills[:3], "teamSize": 4, "priority": "Critical"},
+        {"name": "B", "skills": skills[2:5], "teamSize": 4, "priority": "Low"},
+        {"name": "C", "skills": skills[4:6], "teamSize": 3},
+    ]
+
+    result = portfolio.allocate_portfolio(projects, department_id=1)
+
+    cap = result["maxActiveAssignments"]
+    active = ai_helper.get_org_snapshot(db_path, conn).active_counts()
+    conn.close()
+    placed = {}
+    for proj in result["projects"]:
+        ids = [c["id"] for c in proj["team"]]
+        assert len(ids) == len(set(ids))
+        assert len(ids) + proj["unfilledSlots"] == proj["teamSize"]
+        for e in ids:
+            placed[e] = placed.get(e, 0) + 1
+    assert placed, "expected at least one seat to be filled"
+    for e, n in placed.items():
+        assert active.get(e, 0) + n <= cap
+    assert result["seatsFilled"] == sum(placed.values())
+    assert result["seatsRequested"] == 11
+
+
+def test_allocate_portfolio_without_catalog_raises(db_path, monkeypatch):
+    monkeypatch.setattr(ai_helper, "DB_PATH", db_path)
+    with pytest.raises(RuntimeError, match="No skills found"):
+        portfolio.allocate_portfolio([{"skills": ["Python"]}], department_id=999)
@@ -0,0 +1,129 @@
+# tests/test_resume_jobs.py
+"""ResumeJobQueue: each job runs once, even with several workers on one database."""
+import sqlite3
+import threading
+import time
+
+import pytest
+
+import resume_jobs
+from resume_jobs import ResumeJobQueue
+
+
+@pytest.fixture
+def processed(monkeypatch):
+    """Replaces the slow parts with a counter; returns {empID: runs}."""
+    runs = {}
+    lock = threading.Lock()
+
+    def fake_extract(pdf_bytes):
+        return pdf_bytes.decode()
+
+    def fake_assess(conn, emp_id, manager_id, text, on_stage=lambda s, p: None):
+        with lock:
+            runs[emp_id] = runs.get(emp_id, 0) + 1
+        on_stage("assessing", 60)
+        time.sleep(0.05)
+        return [{"skillID": 1, "skillName": text}]
+
+    monkeypatch.setattr(resume_jobs, "extract_resume_text", fake_extract)
+    monkeypatch.setattr(resume_jobs, "assess_resume", fake_assess)
+    return runs
+
+
+def _wait_finished(queue, job_id, timeout=5.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        job = queue.get(job_id)
+        if job["status"] in resume_jobs.FINISHED:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def _insert(db_path, job_id, status, attempts=0, updated_at=None):
+    now = time.time()
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        INSERT INTO ResumeJobs(jobID, empID, managerID, status, attempts, pdf, createdAt, updatedAt)
+        VALUES (?, 1, 1, ?, ?, ?, ?, ?)
+    """, (job_id, status, attempts, b"resume text", now, now if updated_at is None else updated_at))
+    conn.commit()
+    conn.close()
+
+
+def test_submitted_job_runs_and_succeeds(tmp_path, processed):
+    queue = ResumeJobQueue(str(tmp_path / "jobs.db"))
+    job = _wait_finished(queue, queue.submit(7, 1, b"Python"))
+    assert job["status"] == "succeeded"
+    assert job["skills"] == [{"skillID": 1, "skillName": "Python"}]
+    assert processed == {7: 1}
+
+
+def test_concurrent_runs_of_one_job_process_it_once(tmp_path, processed):
+    db = str(tmp_path / "jobs.db")
+    queue = ResumeJobQueue(db)
+    _insert(db, "j1", "queued")
+    threads = [threading.Thread(target=queue._run, args=("j1",)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert processed == {1: 1}
+    assert _wait_finished(queue, "j1")["status"] == "succeeded"
+
+
+def test_recovery_leaves_a_live_running_job_alone(tmp_path, processed):
+    db = str(tmp_path / "jobs.db")
+    ResumeJobQueue(db)
+    _insert(db, "live", "running", attempts=1)  # heartbeat is fresh: another worker has it
+    second_worker = ResumeJobQueue(db)
+    time.sleep(0.2)
+    assert processed == {}
+    job = second_worker.get("live")
+    assert job["status"] == "running"
+
+
+def test_orphaned_running_job_is_requeued_once(tmp_path, processed, monkeypatch):
+    monkeypatch.setattr(resume_jobs, "RESUME_JOB_LEASE_SECONDS", 30)
+    db = str(tmp_path / "jobs.db")
+    ResumeJobQueue(db)
+    _insert(db, "orphan", "running", attempts=1, updated_at=time.time() - 60)
+    workers = [ResumeJobQueue(db) for _ in range(3)]  # several processes starting at once
+    job = _wait_finished(workers[0], "orphan")
+    assert job["status"] == "succeeded"
+    assert processed == {1: 1}
+
+
+def test_status_poll_requeues_an_orphaned_job(tmp_path, processed, monkeypatch):
+    monkeypatch.setattr(resume_jobs, "RESUME_JOB_LEASE_SECONDS", 30)
+    db = str(tmp_path / "jobs.db")
+    queue = ResumeJobQueue(db)
+    _insert(db, "orphan", "running", attempts=1, updated_at=time.time() - 60)
+    assert _wait_finished(queue, "orphan")["status"] == "succeeded"
+    assert processed == {1: 1}
+
+
+def test_job_out_of_attempts_fails(tmp_path, processed):
+    db = str(tmp_path / "jobs.db")
+    ResumeJobQueue(db)
+    _insert(db, "tired", "queued", attempts=resume_jobs.RESUME_JOB_MAX_ATTEMPTS)
+    job = _wait_finished(ResumeJobQueue(db), "tired")
+    assert job["status"] == "failed"
+    assert job["error"] == "Job was interrupted too many times"
+    assert processed == {}
+
+
+def test_running_job_keeps_its_heartbeat_fresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(resume_jobs, "RESUME_JOB_LEASE_SECONDS", 0.3)
+    release = threading.Event()
+    monkeypatch.setattr(resume_jobs, "extract_resume_text", lambda pdf: "text")
+    monkeypatch.setattr(resume_jobs, "assess_resume", lambda *a, **k: release.wait(5) and [])
+    queue = ResumeJobQueue(str(tmp_path / "jobs.db"))
+    job_id = queue.submit(1, 1, b"x")
+    time.sleep(0.1)
+    started = queue.get(job_id)["updatedAt"]
+    time.sleep(0.5)
+    assert queue.get(job_id)["updatedAt"] > started
+    release.set()
+    assert _wait_finished(queue, job_id)["status"] == "succeeded"
@@ -0,0 +1,75 @@
+# tests/test_scoring.py
+"""The matrix and SQL scorers must return exactly what the per-employee loop does."""
+import random
+
+import pytest
+
+import ai_helper
+import skill_matrix
+
+DEPARTMENTS = [1, 2, 3, 4, 5]
+
+needs_numpy = pytest.mark.skipif(not skill_matrix.numpy_available(), reason="numpy not installed")
+
+
+def _skill_names(conn):
+    return {r["skillID"]: r["skillName"] for r in conn.execute("SELECT skillID, skillName FROM Skills")}
+
+
+def _samples(names, seed, n=20):
+    rng = random.Random(seed)
+    ids = sorted(names)
+    return [rng.sample(ids, rng.randint(1, 6)) for _ in range(n)]
+
+
+@pytest.mark.parametrize("department_id", DEPARTMENTS)
+def test_sql_scorer_matches_loop(conn, department_id):
+    names = _skill_names(conn)
+    for top_ids in _samples(names, department_id):
+        expected = ai_helper._score_candidates_loop(conn, department_id, top_ids)
+        assert ai_helper._score_candidates_sql(conn, department_id, top_ids, names) == expected
+
+
+@needs_numpy
+@pytest.mark.parametrize("department_id", DEPARTMENTS)
+def test_matrix_scorer_matches_loop(conn, department_id):
+    names = _skill_names(conn)
+    matrix = skill_matrix.load_department_matrix(conn, department_id)
+    for top_ids in _samples(names, department_id):
+        expected = ai_helper._score_candidates_loop(conn, department_id, top_ids)
+        assert skill_matrix.score_candidates(matrix, top_ids, names) == expected
+
+
+@needs_numpy
+@pytest.mark.parametrize("department_id", DEPARTMENTS)
+def test_snapshot_matrix_matches_loop(db_path, conn, department_id):
+    names = _skill_names(conn)
+    snapshot = ai_helper.get_org_snapshot(db_path, conn)
+    for top_ids in _samples(names, 100 + department_id):
+        expected = ai_helper._score_candidates_loop(conn, department_id, top_ids)
+        matrix = skill_matrix.load_department_matrix_from_snapshot(snapshot, department_id, top_ids)
+        assert skill_matrix.score_candidates(matrix, top_ids, names) == expected
+
+
+def test_scorers_agree_on_missing_levels(conn):
+    # NULL proficiency counts as 0 but the skill is still "held" for coverage
+    conn.execute("UPDATE EmployeeSkills SET profiencylevel = NULL WHERE rowid % 7 = 0")
+    conn.commit()
+    names = _skill_names(conn)
+    for department_id in DEPARTMENTS:
+        matrix = skill_matrix.load_department_matrix(conn, department_id) if skill_matrix.numpy_available() else None
+        for top_ids in _samples(names, 200 + department_id, n=10):
+            expected = ai_helper._score_candidates_loop(conn, department_id, top_ids)
+            assert ai_helper._score_candidates_sql(conn, department_id, top_ids, names) == expected
+            if matrix is not None:
+                assert skill_matrix.score_candidates(matrix, top_ids, names) == expected
+
+
+def test_skills_nobody_holds_score_zero(conn):
+    names = _skill_names(conn)
+    unheld = conn.execute("SELECT MAX(skillID) + 1 FROM Skills").fetchone()[0]
+    names[unheld] = "Nonexistent Skill"
+    top_ids = [unheld]
+    loop = ai_helper._score_candidates_loop(conn, 1, top_ids)
+    assert loop and all(c["baseMatchScore"] == 0 for c in loop)
+    assert ai_helper._score_candidates_sql(conn, 1, top_ids, names) == loop
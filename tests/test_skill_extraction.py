@@ -0,0 +1,40 @@
+# tests/test_skill_extraction.py
+"""_plan_skill_extraction: matcher skips and catalog pruning are reported separately."""
+import ai_helper
+
+
+def _catalog_names(conn, n):
+    return [r["skillName"] for r in conn.execute(
+        "SELECT skillName FROM Skills WHERE skillCategoryID = 1 ORDER BY skillID LIMIT ?", (n,)
+    )]
+
+
+def test_matcher_skip_is_not_counted_as_pruning(conn):
+    names = _catalog_names(conn, ai_helper.SKILL_MATCH_SKIP_LLM_MIN + 1)
+    text = "The team needs " + ", ".join(names) + "."
+    pruning_before = ai_helper.catalog_prune_stats()
+    matcher_before = ai_helper.skill_matcher_stats()
+
+    local, prompt, report = ai_helper._plan_skill_extraction(text, conn, 1, None)
+
+    assert local is not None and prompt == ""
+    assert report["llmSkipped"] is True
+    assert "tokensSaved" not in report
+    assert ai_helper.catalog_prune_stats() == pruning_before
+    assert ai_helper.skill_matcher_stats()["llmSkipped"] == matcher_before["llmSkipped"] + 1
+
+
+def test_model_path_records_pruning(conn):
+    text = "A vague document about improving things."
+    before = ai_helper.catalog_prune_stats()["requests"]
+    matcher_before = ai_helper.skill_matcher_stats()
+
+    local, prompt, report = ai_helper._plan_skill_extraction(text, conn, 1, None)
+
+    assert local is None and prompt
+    assert report["llmSkipped"] is False
+    assert report["tokensSaved"] == report["promptTokensFull"] - report["promptTokensSent"]
+    assert ai_helper.catalog_prune_stats()["requests"] == before + 1
+    after = ai_helper.skill_matcher_stats()
+    assert (after["documents"], after["llmSkipped"]) == (matcher_before["documents"] + 1,
+                                                         matcher_before["llmSkipped"])
@@ -0,0 +1,85 @@
+# tests/test_skill_matcher.py
+"""Word-level Aho-Corasick matcher: token boundaries, aliases, confidence."""
+from skill_matcher import SkillMatcher, get_skill_matcher, normalize
+
+CATALOG = [
+    (1, "Git"),
+    (2, "JavaScript"),
+    (3, "Kubernetes"),
+    (4, "UX/UI Design"),
+    (5, "Search Engine Optimization (SEO)"),
+    (6, "Apache Kafka"),
+    (7, "React"),
+    (8, "SQL"),
+    (9, "C++"),
+]
+
+
+def _ids(hits):
+    return {h.skillID for h in hits}
+
+
+def test_no_match_inside_longer_words():
+    m = SkillMatcher(CATALOG)
+    assert _ids(m.scan("Our digital legitimate gitlab workflow")) == set()
+    assert _ids(m.scan("We use Git daily.")) == {1}
+
+
+def test_sentence_punctuation_does_not_hide_a_match():
+    m = SkillMatcher(CATALOG)
+    assert _ids(m.scan("Strong with Git. Also SQL, and C++!")) == {1, 8, 9}
+
+
+def test_multi_word_names_tolerate_spacing_and_case():
+    m = SkillMatcher(CATALOG)
+    assert _ids(m.scan("Experience in ux / ui design and apache   kafka")) == {4, 6}
+
+
+def test_aliases_map_to_the_catalog_skill():
+    m = SkillMatcher(CATALOG)
+    hits = {h.skillID: h for h in m.scan("Built k8s operators in JS; ran Kafka; improved SEO")}
+    assert set(hits) == {2, 3, 5, 6}
+    assert hits[2].skillName == "JavaScript"
+
+
+def test_related_skills_are_not_aliases():
+    # PostgreSQL is not SQL, AWS is not a named skill here
+    m = SkillMatcher(CATALOG)
+    assert _ids(m.scan("PostgreSQL on AWS")) == set()
+
+
+def test_alias_and_full_name_ending_together_count_once():
+    m = SkillMatcher(CATALOG)
+    (hit,) = m.scan("Apache Kafka")
+    assert hit.count == 1
+
+
+def test_everyday_single_words_get_low_confidence_unless_cased():
+    m = SkillMatcher(CATALOG)
+    (lower,) = m.scan("we react quickly to incidents")
+    assert lower.best == 0.5
+    (cased,) = m.scan("we react quickly, and build UIs in React")
+    assert cased.count == 2
+    assert cased.score == 1.5
+    assert cased.best == 1.0
+
+
+def test_hits_sorted_by_score_then_position():
+    m = SkillMatcher(CATALOG)
+    hits = m.scan("SQL then Git then Git then SQL then Git")
+    assert [h.skillID for h in hits] == [1, 8]
+    hits = m.scan("SQL then Git")
+    assert [h.skillID for h in hits] == [8, 1]
+
+
+def test_snippets_are_capped():
+    m = SkillMatcher(CATALOG)
+    (hit,) = m.scan(" ".join(["Git"] * 10))
+    assert hit.count == 10
+    assert len(hit.snippets) == SkillMatcher.MAX_SNIPPETS
+
+
+def test_normalize_and_matcher_reuse():
+    assert normalize("UX/UI Design") == ("ux", "ui", "design")
+    assert get_skill_matcher(CATALOG) is get_skill_matcher(list(reversed(CATALOG)))
+    assert get_skill_matcher(CATALOG) is not get_skill_matcher(CATALOG[:3])
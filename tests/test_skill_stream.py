@@ -0,0 +1,70 @@
+# tests/test_skill_stream.py
+"""stream_skills_from_text: only OPENAI_MODEL's own replies are cached under the OpenAI key."""
+import json
+
+import pytest
+
+import ai_helper
+import llm_gateway
+from llm_cache import LLMResponseCache
+
+
+class ScriptedProvider(llm_gateway._Provider):
+    key_env = "FAKE_API_KEY"
+
+    def __init__(self, name, model, reply):
+        super().__init__()
+        self.name, self._model, self.reply = name, model, reply
+
+    def configured(self):
+        return True
+
+    def model(self):
+        return self._model
+
+    def complete(self, prompt, temperature, timeout):
+        if isinstance(self.reply, BaseException):
+            raise self.reply
+        return self.reply
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.db"), ttl_seconds=0, max_entries=100)
+    monkeypatch.setattr(ai_helper, "get_llm_cache", lambda: cache)
+    monkeypatch.setattr(ai_helper, "SKILL_MATCHER_ENABLED", False)  # always ask the model
+    return cache
+
+
+def _use_providers(monkeypatch, *providers):
+    gw = llm_gateway.LLMGateway(["openai"], sleep=lambda _s: None)
+    gw.providers = {p.name: p for p in providers}
+    gw._state = {p.name: llm_gateway._ProviderState() for p in providers}
+    monkeypatch.setattr(ai_helper, "get_llm_gateway", lambda: gw)
+
+
+def _reply(conn):
+    row = conn.execute("SELECT skillID, skillName FROM Skills WHERE skillCategoryID = 1 LIMIT 1").fetchone()
+    return json.dumps({"skills": [{"skillID": row["skillID"], "skillName": row["skillName"], "reason": "r"}]})
+
+
+def _run(conn):
+    events = list(ai_helper.stream_skills_from_text("Build a small internal tool.", conn, 1, manager_id=None))
+    return dict(events)["done"]["skills"]
+
+
+def test_failover_reply_is_streamed_but_not_cached(conn, cache, monkeypatch):
+    _use_providers(
+        monkeypatch,
+        ScriptedProvider("openai", ai_helper._openai_model(), ConnectionError("down")),
+        ScriptedProvider("anthropic", "claude-test", _reply(conn)),
+    )
+    assert len(_run(conn)) == 1
+    assert cache.stats()["stores"] == 0
+    assert cache.stats()["entries"] == 0
+
+
+def test_openai_reply_is_cached(conn, cache, monkeypatch):
+    _use_providers(monkeypatch, ScriptedProvider("openai", ai_helper._openai_model(), _reply(conn)))
+    assert len(_run(conn)) == 1
+    assert cache.stats()["stores"] == 1